@@ -3,9 +3,10 @@
 Script to process AgilePracticeGuide.md and add bullet points to definitions that are missing them.
 """
 
-import os
 import re
 
+from atomic_write import atomic_write
+
 def add_missing_bullets(input_file, output_file):
     """
     Process the input file and add bullet points to lines that are missing them 
@@ -41,18 +42,14 @@ def add_missing_bullets(input_file, output_file):
             processed_lines.append(line)
 
     # Write the processed content to the output file
-    with open(output_file, 'w', encoding='utf-8') as outfile:
+    with atomic_write(output_file) as outfile:
         outfile.writelines(processed_lines)
 
 def main():
     input_file = "/Users/dustinober/Projects/PMP_Practice_Static/data/txt/AgilePracticeGuide.md"
-    temp_output_file = "/Users/dustinober/Projects/PMP_Practice_Static/data/txt/AgilePracticeGuide.md.tmp"
     
     # Process the file to add missing bullet points
-    add_missing_bullets(input_file, temp_output_file)
-    
-    # Replace the original file with the processed one
-    os.replace(temp_output_file, input_file)
+    add_missing_bullets(input_file, input_file)
     
     print(f"Processed {input_file} and added missing bullet points to definitions.")
 
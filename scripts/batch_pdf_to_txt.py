@@ -1,44 +1,186 @@
 #!/usr/bin/env python3
-import fitz  # PyMuPDF
+"""
+Export PDFs to plain text with `=== PAGE N ===` markers for RAG/graph pipelines.
+
+Sources may be PDF files, directories or glob patterns. Each document is
+streamed to its .txt page by page (through a temporary file that replaces the
+output when complete), so memory stays flat on very large PDFs, and several
+documents are exported concurrently with --jobs.
+
+Usage:
+  python scripts/batch_pdf_to_txt.py references/ -o data/txt --jobs 4
+  python scripts/batch_pdf_to_txt.py "references/*Guide*.pdf"
+"""
+from collections import Counter
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+import glob
+import os
 import sys
 import argparse
+from typing import Iterator
+
+from atomic_write import atomic_write
+from conversion_manifest import ConversionManifest
+from page_text_cache import PageTextCache, iter_page_texts, pdf_page_count
 
+DEFAULT_SOURCE = "data/txt/AgilePracticeGuide.pdf"
+PAGES_PER_READ = 64
 
-def pdf_to_text(pdf_path: Path) -> str:
+
+def iter_page_sections(pdf_path: Path, cache: PageTextCache | None = None) -> Iterator[str]:
     """
-    Extract text from a PDF file using PyMuPDF, with page markers.
+    Yield the text of a PDF page by page, each page under its `=== PAGE N ===` marker.
+
+    Pages are read in windows of PAGES_PER_READ, so neither the document nor a
+    fully cached copy of it is ever held in memory at once.
     """
-    doc = fitz.open(pdf_path)
-    parts = []
-    for page_num, page in enumerate(doc, start=1):
+    page_count = pdf_page_count(pdf_path, cache)
+    for first_page in range(1, page_count + 1, PAGES_PER_READ):
+        last_page = min(first_page + PAGES_PER_READ - 1, page_count)
         # "text" preserves reading order reasonably well
-        text = page.get_text("text")
-        text = text.replace("\r", "\n")
-        parts.append(f"=== PAGE {page_num} ===\n{text.strip()}\n")
-    doc.close()
-    return "\n\n".join(parts)
+        for page_num, text in iter_page_texts(pdf_path, "text", cache, first_page, last_page):
+            text = text.replace("\r", "\n")
+            yield f"=== PAGE {page_num} ===\n{text.strip()}\n"
+
+
+def pdf_to_text(pdf_path: Path, cache: PageTextCache | None = None) -> str:
+    """
+    Extract text from a PDF file using PyMuPDF, with page markers.
+
+    Page text comes from the shared page-text cache when another script has
+    already extracted this PDF.
+    """
+    return "\n\n".join(iter_page_sections(pdf_path, cache))
 
 
-def convert_one(pdf_path: Path, out_dir: Path) -> Path:
+def write_pdf_text(pdf_path: Path, out_path: Path, cache: PageTextCache | None = None) -> int:
+    """
+    Stream the marked-up text of a PDF into out_path. Returns the number of pages.
+
+    Pages are written as they are extracted to a temporary file next to
+    out_path, which replaces it (fsynced) only once the whole document is written.
+    """
+    pages = 0
+    with atomic_write(out_path) as f:
+        for section in iter_page_sections(pdf_path, cache):
+            if pages:
+                f.write("\n\n")
+            f.write(section)
+            pages += 1
+    return pages
+
+
+def output_path_for(pdf_path: Path, out_dir: Path) -> Path:
+    return (out_dir / pdf_path.name).with_suffix(".txt")
+
+
+def convert_one(
+    pdf_path: Path,
+    out_dir: Path,
+    cache: PageTextCache | None = None,
+    manifest: ConversionManifest | None = None,
+    force: bool = False,
+) -> Path:
     """
     Convert a single PDF to a .txt file in out_dir.
+
+    With a manifest, a .txt that is up to date with its PDF is kept as is
+    unless force is set.
     """
     pdf_path = pdf_path.resolve()
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    out_path = (out_dir / pdf_path.name).with_suffix(".txt")
+    out_path = output_path_for(pdf_path, out_dir)
+    if manifest is not None and not force and manifest.is_up_to_date(pdf_path, out_path):
+        print(f"Up to date: {pdf_path.name} -> {out_path.name}")
+        return out_path
 
-    print(f"Extracting: {pdf_path.name} -> {out_path.name}")
-    text = pdf_to_text(pdf_path)
-    out_path.write_text(text, encoding="utf-8")
+    # One write, so lines from concurrent workers don't run together
+    sys.stdout.write(f"Extracting: {pdf_path.name} -> {out_path.name}\n")
+    sys.stdout.flush()
+    write_pdf_text(pdf_path, out_path, cache)
 
+    if manifest is not None:
+        manifest.record(pdf_path, out_path)
     return out_path
 
 
+def collect_pdfs(sources: list[str]) -> list[Path]:
+    """
+    Expand PDF files, directories (their *.pdf) and glob patterns into a
+    de-duplicated list of PDFs, in argument order.
+    """
+    pdfs: list[Path] = []
+    for source in sources:
+        path = Path(source).expanduser()
+        if path.is_dir():
+            matches = sorted(p for p in path.glob("*.pdf") if p.is_file())
+        elif glob.has_magic(source):
+            matches = sorted(Path(p) for p in glob.glob(str(path), recursive=True) if p.lower().endswith(".pdf"))
+        else:
+            matches = [path]
+        pdfs.extend(match.resolve() for match in matches)
+    return list(dict.fromkeys(pdfs))
+
+
+def export_all(
+    pdfs: list[Path],
+    out_dir: Path,
+    cache: PageTextCache | None,
+    manifest: ConversionManifest,
+    force: bool,
+    jobs: int,
+) -> list[tuple[Path, Path | None, str | None]]:
+    """
+    Export every PDF, up to `jobs` documents at a time in worker processes.
+
+    Up-to-date checks and manifest updates stay in this process. Returns
+    (pdf, txt_or_none, error_or_none) per PDF, in input order.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    results: dict[Path, tuple[Path, Path | None, str | None]] = {}
+    todo = []
+    for pdf_path in pdfs:
+        out_path = output_path_for(pdf_path, out_dir)
+        if not force and manifest.is_up_to_date(pdf_path, out_path):
+            print(f"Up to date: {pdf_path.name} -> {out_path.name}")
+            results[pdf_path] = (pdf_path, out_path, None)
+        else:
+            todo.append(pdf_path)
+
+    if jobs <= 1 or len(todo) <= 1:
+        for pdf_path in todo:
+            try:
+                results[pdf_path] = (pdf_path, convert_one(pdf_path, out_dir, cache, manifest, force=True), None)
+            except Exception as e:
+                results[pdf_path] = (pdf_path, None, str(e))
+    else:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(todo))) as pool:
+            futures = {pool.submit(convert_one, pdf_path, out_dir, cache): pdf_path for pdf_path in todo}
+            for future in as_completed(futures):
+                pdf_path = futures[future]
+                try:
+                    out_path = future.result()
+                except Exception as e:
+                    results[pdf_path] = (pdf_path, None, str(e))
+                    continue
+                manifest.record(pdf_path, out_path)
+                results[pdf_path] = (pdf_path, out_path, None)
+
+    return [results[pdf_path] for pdf_path in pdfs]
+
+
 def main():
     parser = argparse.ArgumentParser(
-        description="Convert AgilePracticeGuide.pdf to plain text for RAG/graph pipelines."
+        description="Convert PDFs to plain text with page markers for RAG/graph pipelines."
+    )
+    parser.add_argument(
+        "sources",
+        nargs="*",
+        default=[DEFAULT_SOURCE],
+        help=f"PDF files, directories of PDFs or glob patterns (default: {DEFAULT_SOURCE}).",
     )
     parser.add_argument(
         "--out",
@@ -47,23 +189,65 @@ def main():
         default="data/txt",
         help="Output directory for .txt files (default: data/txt).",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="Documents exported concurrently (default: CPU count).",
+    )
+    parser.add_argument(
+        "--no-text-cache",
+        action="store_true",
+        help="Re-extract every page instead of using the shared .cache/page-text cache.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-export even when the .txt is up to date with its PDF.",
+    )
+    parser.add_argument(
+        "--hash",
+        action="store_true",
+        help="Also compare source content hashes, so PDFs whose mtime changed but bytes did not are skipped.",
+    )
 
     args = parser.parse_args()
 
-    pdf_path = Path("data/txt/AgilePracticeGuide.pdf").expanduser().resolve()
     out_dir = Path(args.out_dir).expanduser().resolve()
+    pdfs = collect_pdfs(args.sources)
 
-    if not pdf_path.exists() or not pdf_path.is_file():
+    missing = [pdf_path for pdf_path in pdfs if not pdf_path.is_file()]
+    for pdf_path in missing:
         print(f"PDF file does not exist: {pdf_path}", file=sys.stderr)
+    if missing or not pdfs:
+        if not pdfs:
+            print("No PDF files found.", file=sys.stderr)
         sys.exit(1)
 
-    try:
-        txt_path = convert_one(pdf_path, out_dir)
-        print(f"[OK]  {pdf_path.name} -> {txt_path}")
-    except Exception as e:
-        print(f"[FAIL] {pdf_path.name}: {e}", file=sys.stderr)
+    names = Counter(output_path_for(pdf_path, out_dir).name for pdf_path in pdfs)
+    clashes = sorted(name for name, count in names.items() if count > 1)
+    if clashes:
+        print(f"Several PDFs would be written to the same output: {', '.join(clashes)}", file=sys.stderr)
+        sys.exit(1)
+
+    manifest = ConversionManifest(out_dir, use_hash=args.hash)
+    with contextlib.nullcontext() if args.no_text_cache else PageTextCache() as cache:
+        try:
+            results = export_all(pdfs, out_dir, cache, manifest, args.force, args.jobs)
+        finally:
+            manifest.save()
+
+    failed = False
+    for pdf_path, txt_path, error in results:
+        if error is None:
+            print(f"[OK]  {pdf_path.name} -> {txt_path}")
+        else:
+            print(f"[FAIL] {pdf_path.name}: {error}", file=sys.stderr)
+            failed = True
+    if failed:
         sys.exit(1)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Benchmark the glossary continuation joiner (join_glossary_lines_v2.py).
+
+Generates a synthetic glossary of wrapped "Term. definition" entries and times
+the original readlines() implementation, kept below as the baseline, against
+the streaming join-glossary stage of clean_text_pipeline.py, both in memory
+(the transform alone) and file to file. Each stage reports the best of
+--repeat runs and the peak Python allocation of one traced run.
+
+The default corpus is plain entries, on which both implementations must agree
+(checked). --page-breaks and --bullets add '=== PAGE N ===' breaks inside
+entries and '- ' bulleted entries, which only the new joiner handles, so their
+outputs are expected to differ there.
+
+Usage:
+  python scripts/bench-glossary-join.py --entries 100000
+  python scripts/bench-glossary-join.py --entries 100000 --page-breaks --bullets --json
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import tempfile
+import textwrap
+import time
+import tracemalloc
+from pathlib import Path
+
+from clean_text_pipeline import join_glossary_entries, run_pipeline
+
+WORDS = (
+    'project stakeholder agile scrum risk value team sprint backlog charter schedule budget '
+    'quality scope procurement communication governance benefits iteration kanban retrospective '
+    'increment velocity estimate baseline variance milestone dependency deliverable'
+).split()
+
+
+def legacy_join_glossary_continuation_lines(lines):
+    """join_glossary_continuation_lines() as it was before streaming, minus the file I/O."""
+    in_glossary = False
+    processed_lines = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped_line = line.strip()
+        if stripped_line == "# Definitions":
+            in_glossary = True
+            processed_lines.append(line)
+            i += 1
+            continue
+        if in_glossary:
+            is_new_entry = bool(re.match(r'^[A-Z][^.]*\. ', stripped_line))
+            if is_new_entry and i + 1 < len(lines):
+                current_line = stripped_line
+                j = i + 1
+                while j < len(lines):
+                    next_line = lines[j].strip()
+                    if not next_line:
+                        j += 1
+                        continue
+                    elif re.match(r'^[A-Z][^.]*\. ', next_line):
+                        break
+                    else:
+                        current_line += ' ' + next_line
+                        j += 1
+                processed_lines.append(current_line + '\n')
+                i = j
+            else:
+                processed_lines.append(line)
+                i += 1
+        else:
+            processed_lines.append(line)
+            i += 1
+    return processed_lines
+
+
+def legacy_join_file(input_file, output_file):
+    with open(input_file, 'r', encoding='utf-8') as infile:
+        lines = infile.readlines()
+    processed_lines = legacy_join_glossary_continuation_lines(lines)
+    with open(output_file, 'w', encoding='utf-8') as outfile:
+        outfile.writelines(processed_lines)
+
+
+def build_glossary(entries, seed, page_breaks=False, bullets=False, entries_per_page=25):
+    """Return the lines of a synthetic text with a '# Definitions' glossary of wrapped entries."""
+    rng = random.Random(seed)
+    lines = ['Agile Practice Guide\n', '\n', 'Annex\n', '# Definitions\n']
+    page = 1
+    for n in range(entries):
+        term = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))).capitalize()
+        definition = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 40)))
+        wrapped = textwrap.wrap(f'{term}. {definition}.', 72)
+        if bullets and rng.random() < 0.2:
+            wrapped[0] = '- ' + wrapped[0]
+        if page_breaks and n % entries_per_page == entries_per_page - 1 and len(wrapped) > 1:
+            # The entry runs onto the next page
+            page += 1
+            wrapped.insert(1, f'=== PAGE {page} ===')
+            wrapped.insert(2, str(page))
+        lines.extend(line + '\n' for line in wrapped)
+        if rng.random() < 0.3:
+            lines.append('\n')
+    return lines
+
+
+def time_best(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def traced_peak_kb(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def run_benchmark(args):
+    lines = build_glossary(args.entries, args.seed, args.page_breaks, args.bullets)
+    results = {
+        'entries': args.entries,
+        'lines': len(lines),
+        'pageBreaks': args.page_breaks,
+        'bullets': args.bullets,
+        'repeat': args.repeat,
+        'stages': {},
+    }
+
+    legacy_out = legacy_join_glossary_continuation_lines(lines)
+    new_out = list(join_glossary_entries(lines))
+    results['identicalOutput'] = legacy_out == new_out
+    if not (args.page_breaks or args.bullets) and legacy_out != new_out:
+        raise SystemExit('❌ Outputs differ on a plain glossary')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / 'glossary.txt'
+        source.write_text(''.join(lines), encoding='utf-8')
+        results['bytes'] = source.stat().st_size
+        legacy_target, new_target = Path(tmp) / 'legacy.txt', Path(tmp) / 'new.txt'
+
+        stages = {
+            'memoryLegacy': lambda: legacy_join_glossary_continuation_lines(lines),
+            'memoryStreaming': lambda: list(join_glossary_entries(lines)),
+            'fileLegacy': lambda: legacy_join_file(source, legacy_target),
+            'fileStreaming': lambda: run_pipeline(source, new_target, ['join-glossary']),
+        }
+        for name, fn in stages.items():
+            results['stages'][name] = {
+                'seconds': round(time_best(fn, args.repeat), 4),
+                'peakKb': round(traced_peak_kb(fn), 1),
+            }
+
+    for kind in ('memory', 'file'):
+        legacy, streaming = results['stages'][f'{kind}Legacy'], results['stages'][f'{kind}Streaming']
+        results[f'{kind}Speedup'] = round(legacy['seconds'] / streaming['seconds'], 2) if streaming['seconds'] else None
+    return results
+
+
+def print_results(results):
+    print(f"\n⏱  Glossary join: {results['entries']:,} entries, {results['lines']:,} lines, "
+          f"{results['bytes'] / (1024 * 1024):.1f} MB (best of {results['repeat']})\n")
+    print(f"{'stage':<18}{'seconds':>10}{'lines/s':>14}{'peak KB':>12}")
+    for name, stage in results['stages'].items():
+        rate = results['lines'] / stage['seconds'] if stage['seconds'] else 0
+        print(f"{name:<18}{stage['seconds']:>10.3f}{rate:>14,.0f}{stage['peakKb']:>12,.0f}")
+    print(f"\nSpeedup: {results['memorySpeedup']}x in memory, {results['fileSpeedup']}x file to file")
+    if results['identicalOutput']:
+        print('✓ Identical output')
+    else:
+        print('⚠️  Outputs differ (expected with --page-breaks/--bullets)')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the glossary continuation joiner on a synthetic glossary.')
+    parser.add_argument('--entries', type=int, default=100_000, help='Glossary entries to generate (default: 100000)')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per stage, best kept (default: 3)')
+    parser.add_argument('--seed', type=int, default=7, help='Corpus RNG seed (default: 7)')
+    parser.add_argument('--page-breaks', action='store_true', help='Break some entries across page markers')
+    parser.add_argument('--bullets', action='store_true', help="Bullet some entries with '- '")
+    parser.add_argument('--json', action='store_true', help='Print results JSON instead of a table')
+    args = parser.parse_args()
+
+    results = run_benchmark(args)
+    if args.json:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        print()
+    else:
+        print_results(results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark Ollama embedding clients against a local stub server.
+
+Starts an in-process HTTP server that mimics ``/api/embed`` (fixed per-request
+latency plus per-text cost, optional injected 503s) and compares:
+
+- the previous approach: one un-pooled ``requests.post`` per chunk
+- ``OllamaEmbedder`` with several batch size / concurrency settings
+
+No Ollama install or model download is needed.
+
+Usage:
+  python scripts/bench-ollama-embed.py --texts 400 --latency 0.02 --per-text 0.002
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from ollama_embed import OllamaEmbedder
+
+
+def make_handler(dim, latency, per_text, fail_rate):
+    class StubOllamaHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            payload = json.loads(body or b'{}')
+            texts = payload.get('input')
+            if texts is None:
+                texts = [payload.get('prompt', '')]
+            elif isinstance(texts, str):
+                texts = [texts]
+
+            time.sleep(latency + per_text * len(texts))
+            if fail_rate and random.random() < fail_rate:
+                self._reply(503, {'error': 'stub overloaded'})
+                return
+
+            embeddings = [[(hash(text) % 1000) / 1000.0] * dim for text in texts]
+            self._reply(200, {'model': payload.get('model'), 'embeddings': embeddings})
+
+        def _reply(self, status, data):
+            out = json.dumps(data).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(out)))
+            self.end_headers()
+            self.wfile.write(out)
+
+    return StubOllamaHandler
+
+
+def bench_sequential(url, texts, model):
+    """Baseline: one request per text, no session reuse."""
+    started = time.perf_counter()
+    for text in texts:
+        response = requests.post(f'{url}/api/embed', json={'model': model, 'prompt': text, 'stream': False}, timeout=60)
+        response.raise_for_status()
+    return time.perf_counter() - started, len(texts), 0
+
+
+def bench_pooled(url, texts, model, batch_size, concurrency):
+    with OllamaEmbedder(model, base_url=url, batch_size=batch_size, concurrency=concurrency, backoff=0.05) as embedder:
+        started = time.perf_counter()
+        vectors = embedder.embed(texts)
+        elapsed = time.perf_counter() - started
+        assert len(vectors) == len(texts)
+        return elapsed, embedder.requests_sent, embedder.retries_used
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Ollama embedding clients against a stub server.')
+    parser.add_argument('--texts', type=int, default=400, help='Number of texts to embed (default: 400)')
+    parser.add_argument('--dim', type=int, default=768, help='Stub embedding dimension (default: 768)')
+    parser.add_argument('--latency', type=float, default=0.02, help='Stub seconds per request (default: 0.02)')
+    parser.add_argument('--per-text', type=float, default=0.002, help='Stub seconds per text in a request (default: 0.002)')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='Fraction of requests answered with 503 (default: 0)')
+    parser.add_argument('--configs', default='1x1,16x1,16x4,32x8', help='Comma-separated BATCHxCONCURRENCY settings')
+    parser.add_argument('--skip-baseline', action='store_true', help='Skip the one-request-per-text baseline')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(args.dim, args.latency, args.per_text, args.fail_rate))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    texts = [f'chunk {i} ' + 'project management ' * 40 for i in range(args.texts)]
+    model = 'stub-embed'
+    results = []
+
+    if not args.skip_baseline:
+        elapsed, sent, retried = bench_sequential(url, texts, model)
+        results.append({'client': 'requests.post per chunk', 'batch': 1, 'concurrency': 1,
+                        'seconds': elapsed, 'requests': sent, 'retries': retried})
+
+    for config in args.configs.split(','):
+        batch_size, concurrency = (int(part) for part in config.lower().split('x'))
+        elapsed, sent, retried = bench_pooled(url, texts, model, batch_size, concurrency)
+        results.append({'client': 'OllamaEmbedder', 'batch': batch_size, 'concurrency': concurrency,
+                        'seconds': elapsed, 'requests': sent, 'retries': retried})
+
+    server.shutdown()
+
+    for row in results:
+        row['textsPerSec'] = args.texts / row['seconds'] if row['seconds'] > 0 else float('inf')
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    baseline = results[0]['seconds'] if not args.skip_baseline else None
+    print(f'\n{args.texts} texts, stub latency {args.latency * 1000:.0f} ms/request + {args.per_text * 1000:.1f} ms/text\n')
+    print(f"{'client':<26}{'batch':>6}{'conc':>6}{'sec':>9}{'texts/s':>10}{'reqs':>7}{'retries':>9}{'speedup':>9}")
+    for row in results:
+        speedup = f"{baseline / row['seconds']:.1f}x" if baseline else '-'
+        print(f"{row['client']:<26}{row['batch']:>6}{row['concurrency']:>6}{row['seconds']:>9.2f}"
+              f"{row['textsPerSec']:>10.1f}{row['requests']:>7}{row['retries']:>9}{speedup:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Benchmark the reference vectorization pipeline stage by stage.
+
+Generates a synthetic PDF corpus, then times each stage of
+vectorize-reference-pdfs.py on it: text extraction (sequential and with the
+process pool), normalize_text, chunk_text, embedding and serialization (JSON
+and every binary dtype). A deterministic hash-based fake embedding model
+stands in for sentence-transformers, so the benchmark runs offline and
+produces the same output sizes on every machine. The extraction pipeline is
+also timed through the shared page-text cache, cold and warm.
+
+Results (per-stage seconds, throughput, peak RSS, output bytes) are written as
+sorted JSON so two runs can be diffed or compared with --compare.
+
+Usage:
+  python scripts/bench-vectorize.py --docs 4 --pages 50 --output bench.json
+  python scripts/bench-vectorize.py --docs 4 --pages 50 --compare bench.json
+"""
+
+import argparse
+import contextlib
+import hashlib
+import importlib.util
+import io
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+WORDS = (
+    'project stakeholder agile scrum risk value team sprint backlog charter schedule budget '
+    'quality scope procurement communication governance benefits iteration kanban retrospective '
+    'increment velocity estimate baseline variance milestone dependency deliverable'
+).split()
+
+
+def load_vectorizer():
+    """Import vectorize-reference-pdfs.py (hyphenated, so not importable by name)."""
+    spec = importlib.util.spec_from_file_location('vectorize_reference_pdfs', SCRIPT_DIR / 'vectorize-reference-pdfs.py')
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class FakeEmbeddingModel:
+    """Deterministic stand-in for SentenceTransformer.encode()."""
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True, show_progress_bar=False):
+        vectors = np.empty((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            seed = int.from_bytes(hashlib.sha256(text.encode('utf-8')).digest()[:8], 'little')
+            vectors[row] = np.random.default_rng(seed).standard_normal(self.dim, dtype=np.float32)
+        return vectors
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_corpus(fitz, corpus_dir, docs, pages, words_per_page, seed):
+    """Write ``docs`` synthetic PDFs with ``pages`` pages of random domain words each."""
+    rng = random.Random(seed)
+    pdfs = []
+    for doc_index in range(docs):
+        doc = fitz.open()
+        for _ in range(pages):
+            page = doc.new_page()
+            words = []
+            for i in range(words_per_page):
+                word = rng.choice(WORDS)
+                # Sprinkle hyphenated line breaks so normalize_text has work to do
+                words.append(word[:3] + '-\n' + word[3:] if i % 97 == 0 and len(word) > 5 else word)
+            page.insert_textbox(fitz.Rect(36, 36, 576, 806), ' '.join(words), fontsize=6)
+        path = corpus_dir / f'synthetic-{doc_index + 1:02d}.pdf'
+        doc.save(path)
+        doc.close()
+        pdfs.append(path)
+    return pdfs
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name, **info):
+        started = time.perf_counter()
+        yield info
+        elapsed = time.perf_counter() - started
+        record = {'seconds': round(elapsed, 4), 'peakRssMb': round(peak_rss_mb(), 1)}
+        for key, value in info.items():
+            record[key] = value
+            if key.endswith('Count') and elapsed > 0:
+                record[key[:-len('Count')] + 'PerSec'] = round(value / elapsed, 1)
+        self.stages[name] = record
+
+
+def run_benchmark(args):
+    vectorizer = load_vectorizer()
+    fitz = vectorizer.fitz
+    from page_text_cache import PageTextCache
+    from vector_store import DTYPES, write_vector_store
+
+    timer = StageTimer()
+    with tempfile.TemporaryDirectory(prefix='bench-vectorize-') as tmp:
+        tmp = Path(tmp)
+        corpus_dir = tmp / 'corpus'
+        corpus_dir.mkdir()
+        out_dir = tmp / 'out'
+
+        with timer.stage('corpus', docCount=args.docs) as info:
+            pdfs = build_corpus(fitz, corpus_dir, args.docs, args.pages, args.words_per_page, args.seed)
+            info['pageCount'] = args.docs * args.pages
+
+        with timer.stage('extract') as info:
+            raw_pages = []
+            for pdf_path in pdfs:
+                with fitz.open(pdf_path) as doc:
+                    for page_number in range(len(doc)):
+                        raw_pages.append((pdf_path, page_number, doc.load_page(page_number).get_text() or ''))
+            info['pageCount'] = len(raw_pages)
+            info['chars'] = sum(len(text) for _, _, text in raw_pages)
+
+        with timer.stage('normalize') as info:
+            normalized = [(pdf_path, page_number, vectorizer.normalize_text(text)) for pdf_path, page_number, text in raw_pages]
+            info['pageCount'] = len(normalized)
+
+        with timer.stage('chunk') as info:
+            chunk_texts = []
+            for _, _, text in normalized:
+                chunk_texts.extend(vectorizer.chunk_text(text, args.chunk_size, args.overlap, args.min_words))
+            info['chunkCount'] = len(chunk_texts)
+
+        with timer.stage('extractPipeline', workers=args.workers) as info:
+            chunks_by_pdf = vectorizer.extract_all_chunks(
+                pdfs, args.chunk_size, args.overlap, args.min_words, None, args.workers, args.pages_per_task
+            )
+            chunks = [chunk for pdf_chunks in chunks_by_pdf.values() for chunk in pdf_chunks]
+            info['chunkCount'] = len(chunks)
+
+        # Same pipeline through the shared page-text cache: a cold run fills it, a warm run only reads it
+        text_cache = PageTextCache(tmp / 'page-text')
+        for name in ('extractPipelineCacheCold', 'extractPipelineCacheWarm'):
+            with timer.stage(name, workers=args.workers) as info:
+                cached_chunks = vectorizer.extract_all_chunks(
+                    pdfs, args.chunk_size, args.overlap, args.min_words, None, args.workers, args.pages_per_task, text_cache
+                )
+                info['chunkCount'] = sum(len(pdf_chunks) for pdf_chunks in cached_chunks.values())
+        text_cache.close()
+
+        model = FakeEmbeddingModel(args.dim)
+        embed_batch_fn = lambda texts: model.encode(texts, batch_size=len(texts))
+        with timer.stage('embed', batchSize=args.batch_size) as info:
+            with contextlib.redirect_stdout(io.StringIO()):
+                embeddings = vectorizer.vectorize_chunks(chunks, embed_batch_fn, args.batch_size)
+            info['chunkCount'] = len(embeddings)
+
+        with timer.stage('serializeJson') as info:
+            out_dir.mkdir()
+            with contextlib.redirect_stdout(io.StringIO()):
+                vectorizer.write_json(out_dir / 'chunks-metadata.json', chunks)
+                vectorizer.write_json(out_dir / 'embeddings.json', embeddings)
+            info['bytes'] = (out_dir / 'embeddings.json').stat().st_size
+            info['metadataBytes'] = (out_dir / 'chunks-metadata.json').stat().st_size
+
+        ids = [row['id'] for row in embeddings]
+        matrix = np.array([row['embedding'] for row in embeddings], dtype=np.float32)
+        for dtype in DTYPES:
+            with timer.stage(f'serializeBinary.{dtype}') as info:
+                manifest_path = write_vector_store(out_dir / dtype, ids, matrix, dtype=dtype)
+                info['bytes'] = (manifest_path.parent / 'embeddings.bin').stat().st_size
+                info['manifestBytes'] = manifest_path.stat().st_size
+
+    return {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'cpus': os.cpu_count(),
+        'config': {
+            'docs': args.docs,
+            'pages': args.pages,
+            'wordsPerPage': args.words_per_page,
+            'chunkSize': args.chunk_size,
+            'overlap': args.overlap,
+            'minWords': args.min_words,
+            'dim': args.dim,
+            'batchSize': args.batch_size,
+            'workers': args.workers,
+            'pagesPerTask': args.pages_per_task,
+            'seed': args.seed
+        },
+        'stages': timer.stages
+    }
+
+
+def print_results(results, baseline=None):
+    print(f"\n⏱  Vectorization benchmark @ {results['revision'] or 'working tree'} ({results['cpus']} CPUs)\n")
+    print(f"{'stage':<24}{'seconds':>10}{'throughput':>22}{'peak RSS MB':>13}{'bytes':>14}{'vs base':>10}")
+    for name, stage in results['stages'].items():
+        rate_key = next((key for key in stage if key.endswith('PerSec')), None)
+        throughput = f"{stage[rate_key]:,.1f} {rate_key[:-len('PerSec')]}s/s" if rate_key else ''
+        size = f"{stage['bytes']:,}" if 'bytes' in stage else ''
+        delta = ''
+        if baseline and name in baseline['stages'] and baseline['stages'][name]['seconds'] > 0:
+            delta = f"{stage['seconds'] / baseline['stages'][name]['seconds']:.2f}x"
+        print(f"{name:<24}{stage['seconds']:>10.3f}{throughput:>22}{stage['peakRssMb']:>13.1f}{size:>14}{delta:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark vectorize-reference-pdfs.py stages on a synthetic corpus.')
+    parser.add_argument('--docs', type=int, default=4, help='Synthetic PDFs to generate (default: 4)')
+    parser.add_argument('--pages', type=int, default=50, help='Pages per PDF (default: 50)')
+    parser.add_argument('--words-per-page', type=int, default=450, help='Words per page (default: 450)')
+    parser.add_argument('--chunk-size', type=int, default=300, help='Words per chunk (default: 300)')
+    parser.add_argument('--overlap', type=int, default=60, help='Word overlap (default: 60)')
+    parser.add_argument('--min-words', type=int, default=40, help='Minimum words per chunk (default: 40)')
+    parser.add_argument('--dim', type=int, default=384, help='Fake embedding dimension (default: 384)')
+    parser.add_argument('--batch-size', type=int, default=32, help='Embedding batch size (default: 32)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Extraction processes (default: CPU count)')
+    parser.add_argument('--pages-per-task', type=int, default=16, help='Pages per extraction task (default: 16)')
+    parser.add_argument('--seed', type=int, default=7, help='Corpus RNG seed (default: 7)')
+    parser.add_argument('--output', type=Path, help='Write results JSON here')
+    parser.add_argument('--compare', type=Path, help='Baseline results JSON to compare against')
+    parser.add_argument('--json', action='store_true', help='Print results JSON instead of a table')
+    args = parser.parse_args()
+
+    results = run_benchmark(args)
+    baseline = json.loads(args.compare.read_text(encoding='utf-8')) if args.compare else None
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, sort_keys=True) + '\n', encoding='utf-8')
+    if args.json:
+        print(json.dumps(results, indent=2, sort_keys=True))
+    else:
+        print_results(results, baseline)
+        if args.output:
+            print(f'\n✓ Wrote {args.output}')
+
+
+if __name__ == '__main__':
+    main()
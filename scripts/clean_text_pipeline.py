@@ -0,0 +1,567 @@
+#!/usr/bin/env python3
+"""
+Single-pass cleanup pipeline for extracted glossary text.
+
+The cleanup used to be a chain of scripts (clean_pages.py, clean_pages_new.py,
+join_continuation_lines.py, join_glossary_lines_v2.py, fix_definitions_v2.py,
+separate_and_add_bullets.py), each reading the whole file and rewriting it in
+place. Here every transform is a line stage: it is fed the lines (with their
+trailing newline, as readlines() returns them) one at a time and returns the
+output lines each one releases, holding back at most the line or entry it is
+still joining. Stages are chained lazily, so the input is read once and the
+result written once, in constant memory.
+
+Each stage reproduces the output of the script it replaces, except that the
+entry-splitting stages decide where one "Term. definition" entry ends and the
+next begins with definition_tokenizer.py (known flashcard terms or short
+title-case phrases, abbreviations such as "e.g." never split) rather than at any
+capitalized word after a period.
+
+With --jobs, a document with '=== PAGE N ===' markers (batch_pdf_to_txt.py) is
+cut into runs of pages that worker processes clean independently, starting
+from the state a stage would usually have at a page start. Whatever a stage
+carries across a page break (a line waiting to be joined, an open glossary
+entry) is then stitched sequentially: the parent replays each seam from the
+true state until the stages agree with the worker again and splices in the
+rest of its output, so the result is identical to a sequential run.
+
+Usage:
+  python scripts/clean_text_pipeline.py data/txt/AgilePracticeGuide.txt -o data/txt/AgilePracticeGuide.md
+  python scripts/clean_text_pipeline.py data/txt/PMBOK.txt -o data/txt/PMBOK.md --jobs 8
+  python scripts/clean_text_pipeline.py glossary.txt --stages strip-page-markers,join-glossary,add-bullets
+  python scripts/clean_text_pipeline.py notes.md --stages separate-entries --terms src/data/flashcards.json
+  python scripts/clean_text_pipeline.py --list-stages
+"""
+
+import argparse
+import io
+import itertools
+import os
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from atomic_write import atomic_write
+from definition_tokenizer import DefinitionTokenizer, default_tokenizer
+
+PAGE_MARKER = re.compile(r'^===\s*PAGE\s+\d+\s*===', re.IGNORECASE)
+NUMBER_ONLY = re.compile(r'^\d+$')
+ENTRY_START = re.compile(r'^[A-Z][^.]*\. ')
+CONTINUATION_BLOCKER = re.compile(r'^[\[\(#]')
+GLOSSARY_HEADING = '# Definitions'
+# Glossary line kinds, told apart by one match: a page break (marker or bare
+# page number) or an entry start, optionally bulleted
+GLOSSARY_LINE = re.compile(r'(?P<page>===\s*(?i:page)\s+\d+\s*===|\d+$)|(?P<entry>(?:- )?[A-Z][^.]*\. )')
+
+MIN_TASK_BYTES = 64 * 1024
+# Lines into a task within which a seam is expected to resynchronize
+SEAM_WINDOW = 256
+
+
+def _indentation(line):
+    return ' ' * (len(line) - len(line.lstrip()))
+
+
+class LineStage:
+    """
+    One cleanup transform, fed a line at a time.
+
+    feed() returns the output lines a line releases and finish() whatever is
+    still held at the end of the input. Stages that hold lines back expose
+    them through state() and restore(), so a stage can be resumed at a page seam.
+    """
+
+    def feed(self, line):
+        raise NotImplementedError
+
+    def finish(self):
+        return ()
+
+    def state(self):
+        return None
+
+    def restore(self, state):
+        pass
+
+    def run(self, lines):
+        """Lazily transform an iterable of lines."""
+        return itertools.chain.from_iterable(itertools.chain(map(self.feed, lines), self._finished()))
+
+    def _finished(self):
+        # Only called once the input is exhausted
+        yield self.finish()
+
+
+class PageMarkerStripper(LineStage):
+    """Drop '=== PAGE 76 ===' markers and number-only lines (clean_pages.py)."""
+
+    def feed(self, line):
+        stripped = line.strip()
+        if PAGE_MARKER.match(stripped) or NUMBER_ONLY.match(stripped):
+            return ()
+        return (line,)
+
+
+class ContinuationJoiner(LineStage):
+    """
+    Join a line that doesn't start a new sentence or term onto the line above
+    (join_continuation_lines.py).
+
+    A following line is a continuation unless it is blank, starts with a capital,
+    '[', '(', '#' or 'u' (a bullet glyph in the extracted text). A joined pair is
+    not joined again with the line after it.
+    """
+
+    def __init__(self):
+        self.current = None     # line waiting to see whether the next one continues it
+
+    def feed(self, line):
+        current = self.current
+        if current is None:
+            self.current = line
+            return ()
+        continuation = line.strip()
+        if (continuation and not continuation[0].isupper()
+                and not CONTINUATION_BLOCKER.match(continuation) and not continuation.startswith('u')):
+            self.current = None
+            return (current.rstrip('\n') + ' ' + continuation + '\n',)
+        self.current = line
+        return (current.rstrip('\n') + '\n',)
+
+    def finish(self):
+        current, self.current = self.current, None
+        return () if current is None else (current.rstrip('\n') + '\n',)
+
+    def state(self):
+        return self.current
+
+    def restore(self, state):
+        self.current = state
+
+
+class GlossaryEntryJoiner(LineStage):
+    """
+    Below the '# Definitions' heading, join every line up to the next
+    "Term. definition" entry onto that entry, dropping blank lines in between
+    (join_glossary_lines_v2.py).
+
+    Entries may already carry a '- ' bullet. Page markers and page numbers met
+    inside an entry that runs onto the next page are kept out of its text and
+    emitted right after the joined entry.
+    """
+
+    def __init__(self, in_glossary=False):
+        self.in_glossary = in_glossary
+        self.entry = None           # parts of the entry being joined
+        self.entry_line = None      # its original line, emitted untouched if nothing follows it
+        self.page_break = []
+
+    def feed(self, line):
+        stripped = line.strip()
+        kind = None
+        if self.in_glossary:
+            # One classification per line: 'blank', 'page', 'entry' or None (text)
+            if not stripped:
+                kind = 'blank'
+            else:
+                match = GLOSSARY_LINE.match(stripped)
+                kind = match.lastgroup if match else None
+
+        if self.entry is not None:
+            self.entry_line = None
+            if kind == 'blank':
+                return ()
+            if kind == 'page':
+                self.page_break.append(line)
+                return ()
+            if kind != 'entry':
+                self.entry.append(stripped)
+                return ()
+            # The next entry starts: release this one and any page break it spanned
+            output = [' '.join(self.entry) + '\n', *self.page_break]
+            self.entry, self.entry_line, self.page_break = [stripped], line, []
+            return output
+
+        if kind == 'entry':
+            self.entry, self.entry_line = [stripped], line
+            return ()
+        if stripped == GLOSSARY_HEADING:
+            self.in_glossary = True
+        return (line,)
+
+    def finish(self):
+        if self.entry is None:
+            return ()
+        output = [self.entry_line if self.entry_line is not None else ' '.join(self.entry) + '\n']
+        output.extend(self.page_break)
+        self.entry, self.entry_line, self.page_break = None, None, []
+        return output
+
+    def state(self):
+        entry = tuple(self.entry) if self.entry is not None else None
+        return self.in_glossary, entry, self.entry_line, tuple(self.page_break)
+
+    def restore(self, state):
+        self.in_glossary, entry, self.entry_line, page_break = state
+        self.entry = list(entry) if entry is not None else None
+        self.page_break = list(page_break)
+
+
+class EntrySeparator(LineStage):
+    """
+    Break lines holding several "Term. definition" entries before each later
+    entry, bulleting it (fix_separation.py).
+    """
+
+    def __init__(self, tokenizer=None):
+        self.tokenizer = tokenizer or default_tokenizer()
+
+    def feed(self, line):
+        pieces = self.tokenizer.split(line)
+        if len(pieces) == 1:
+            return (line,)
+        return [pieces[0] + '\n'] + ['- ' + piece + '\n' for piece in pieces[1:-1]] + ['- ' + pieces[-1]]
+
+
+class DefinitionSplitter(LineStage):
+    """
+    Separate combined "Term. definition" entries onto their own lines and
+    bullet every entry, leaving '# ' headings alone (separate_and_add_bullets.py).
+    """
+
+    keep_headings = True
+
+    def __init__(self, tokenizer=None):
+        self.tokenizer = tokenizer or default_tokenizer()
+
+    def feed(self, line):
+        stripped_line = line.lstrip()
+        if not stripped_line.strip() or (self.keep_headings and stripped_line.startswith('# ')):
+            return (line,)
+
+        pieces = self.tokenizer.split(stripped_line)
+        if len(pieces) > 1:
+            indentation = _indentation(line)
+            output = []
+            for piece in pieces:
+                piece = piece.strip()
+                if piece:
+                    output.append(indentation + (piece if piece.startswith('- ') else '- ' + piece) + '\n')
+            return output
+        if stripped_line.startswith('- '):
+            return (line,)
+        if ENTRY_START.match(stripped_line):
+            return (_indentation(line) + '- ' + stripped_line,)
+        return (line,)
+
+
+class DefinitionFixer(DefinitionSplitter):
+    """
+    Split lines holding several "Term. definition" entries and bullet every
+    entry (fix_definitions_v2.py).
+    """
+
+    keep_headings = False
+
+
+class BulletAdder(LineStage):
+    """Bullet "Term. definition" lines that lack one, leaving '# ' headings alone (add_bullets_simple.py)."""
+
+    def feed(self, line):
+        stripped_line = line.lstrip()
+        if (stripped_line.strip() and not stripped_line.startswith('# ')
+                and not stripped_line.startswith('- ') and ENTRY_START.match(stripped_line)):
+            return (_indentation(line) + '- ' + stripped_line,)
+        return (line,)
+
+
+def strip_page_markers(lines):
+    return PageMarkerStripper().run(lines)
+
+
+def join_continuations(lines):
+    return ContinuationJoiner().run(lines)
+
+
+def join_glossary_entries(lines):
+    return GlossaryEntryJoiner().run(lines)
+
+
+def separate_entries(lines, tokenizer=None):
+    return EntrySeparator(tokenizer).run(lines)
+
+
+def fix_definitions(lines, tokenizer=None):
+    return DefinitionFixer(tokenizer).run(lines)
+
+
+def split_definitions(lines, tokenizer=None):
+    return DefinitionSplitter(tokenizer).run(lines)
+
+
+def add_bullets(lines):
+    return BulletAdder().run(lines)
+
+
+STAGES = {
+    'strip-page-markers': PageMarkerStripper,
+    'join-continuations': ContinuationJoiner,
+    'join-glossary': GlossaryEntryJoiner,
+    'separate-entries': EntrySeparator,
+    'fix-definitions': DefinitionFixer,
+    'split-definitions': DefinitionSplitter,
+    'add-bullets': BulletAdder,
+}
+# Stages that split entries, and so take the known-terms tokenizer
+TOKENIZED_STAGES = frozenset({'separate-entries', 'fix-definitions', 'split-definitions'})
+
+# The order the standalone scripts were run in (clean_pages_new.py repeated clean_pages.py)
+DEFAULT_STAGES = ('strip-page-markers', 'join-continuations', 'join-glossary', 'fix-definitions', 'split-definitions')
+
+
+def make_stage(name, tokenizer=None, in_glossary=False):
+    if name in TOKENIZED_STAGES:
+        return STAGES[name](tokenizer)
+    if name == 'join-glossary':
+        return STAGES[name](in_glossary)
+    return STAGES[name]()
+
+
+class StageChain:
+    """The named stages in order, fed a line at a time, with their combined state."""
+
+    def __init__(self, stage_names, tokenizer=None, in_glossary=False):
+        self.stages = [make_stage(name, tokenizer, in_glossary) for name in stage_names]
+
+    def feed(self, line):
+        lines = (line,)
+        for stage in self.stages:
+            if len(lines) == 1:
+                lines = stage.feed(lines[0])
+            else:
+                lines = [output for line in lines for output in stage.feed(line)]
+            if not lines:
+                return ()
+        return lines
+
+    def finish(self):
+        output = []
+        for index, stage in enumerate(self.stages):
+            lines = stage.finish()
+            for later in self.stages[index + 1:]:
+                lines = [released for line in lines for released in later.feed(line)]
+            output.extend(lines)
+        return output
+
+    def state(self):
+        return tuple(stage.state() for stage in self.stages)
+
+    def restore(self, state):
+        for stage, stage_state in zip(self.stages, state):
+            stage.restore(stage_state)
+
+
+def build_pipeline(lines, stage_names=DEFAULT_STAGES, tokenizer=None):
+    """Chain the named stages over an iterable of lines, lazily."""
+    for name in stage_names:
+        lines = make_stage(name, tokenizer).run(lines)
+    return lines
+
+
+def _check_stages(stage_names):
+    unknown = [name for name in stage_names if name not in STAGES]
+    if unknown:
+        raise ValueError(f"Unknown stage(s): {', '.join(unknown)}. Available: {', '.join(STAGES)}")
+
+
+def run_pipeline(input_path, output_path=None, stage_names=DEFAULT_STAGES, tokenizer=None, jobs=1):
+    """
+    Stream input_path through the stages into output_path (default: in place).
+
+    Output goes through atomic_write, so the target is replaced only once the
+    new file is complete and fsynced. The entry-splitting stages use tokenizer
+    (default: the terms in src/data/flashcards.json). With jobs > 1, pages are
+    cleaned in that many worker processes (see run_pipeline_parallel). Returns
+    (lines_read, lines_written).
+    """
+    if jobs > 1:
+        return run_pipeline_parallel(input_path, output_path, stage_names, tokenizer, jobs)
+
+    input_path = Path(input_path)
+    output_path = Path(output_path) if output_path else input_path
+    _check_stages(stage_names)
+
+    lines_read = 0
+
+    def counted(lines):
+        nonlocal lines_read
+        for line in lines:
+            lines_read += 1
+            yield line
+
+    lines_written = 0
+    with open(input_path, 'r', encoding='utf-8') as infile, atomic_write(output_path) as outfile:
+        for line in build_pipeline(counted(infile), stage_names, tokenizer):
+            outfile.write(line)
+            lines_written += 1
+    return lines_read, lines_written
+
+
+def iter_page_tasks(lines, task_bytes):
+    """
+    Group lines into runs of whole pages of about task_bytes, cutting only
+    before '=== PAGE N ===' markers. Yields (lines, in_glossary), where
+    in_glossary tells whether the '# Definitions' heading came before the run.
+    """
+    task, size, in_glossary = [], 0, False
+    for line in lines:
+        if size >= task_bytes and line.startswith('===') and PAGE_MARKER.match(line.strip()):
+            yield task, in_glossary
+            if not in_glossary and GLOSSARY_HEADING in ''.join(task):
+                in_glossary = any(text.strip() == GLOSSARY_HEADING for text in task)
+            task, size = [], 0
+        task.append(line)
+        size += len(line)
+    if task:
+        yield task, in_glossary
+
+
+_worker_chain_args = None
+
+
+def _init_worker(stage_names, tokenizer):
+    global _worker_chain_args
+    _worker_chain_args = (stage_names, tokenizer)
+
+
+def _clean_task(text, in_glossary):
+    """
+    Run the stages over one run of pages from the state they usually have at
+    a page start. Returns the output text and line count, the (lines, chars)
+    output offsets and stage state after each of the first SEAM_WINDOW input
+    lines, and the final state.
+    """
+    chain = StageChain(*_worker_chain_args, in_glossary=in_glossary)
+    output, offsets, states = [], [], []
+    chars = 0
+    # One string each way pickles far faster than lists of lines
+    for index, line in enumerate(io.StringIO(text)):
+        released = chain.feed(line)
+        output.extend(released)
+        if index < SEAM_WINDOW:
+            chars += sum(map(len, released))
+            offsets.append((len(output), chars))
+            states.append(chain.state())
+    return ''.join(output), len(output), offsets, states, chain.state()
+
+
+def _stitch(chain, lines, in_glossary, result, stage_names, tokenizer):
+    """
+    Return the exact output of `lines` given the true state in `chain`, as
+    (text, line_count), using the worker's result where possible, and leave
+    chain in the state after them.
+    """
+    output, line_count, offsets, states, final_state = result
+    if chain.state() == StageChain(stage_names, tokenizer, in_glossary).state():
+        chain.restore(final_state)
+        return output, line_count
+
+    stitched = []
+    for index, line in enumerate(lines):
+        stitched.extend(chain.feed(line))
+        if index < len(states) and chain.state() == states[index]:
+            # Back in step with the worker: the rest of its output is exact
+            done_lines, done_chars = offsets[index]
+            chain.restore(final_state)
+            return ''.join(stitched) + output[done_chars:], len(stitched) + line_count - done_lines
+    # Never resynchronized: the seam was replayed through the whole run
+    return ''.join(stitched), len(stitched)
+
+
+def run_pipeline_parallel(input_path, output_path=None, stage_names=DEFAULT_STAGES, tokenizer=None, jobs=None):
+    """
+    Clean input_path like run_pipeline, with runs of pages processed in `jobs`
+    worker processes and the seams between them stitched in order.
+
+    Only a bounded number of page runs is in flight, so memory stays
+    proportional to jobs, not to the document. Output is identical to a
+    sequential run. Returns (lines_read, lines_written).
+    """
+    input_path = Path(input_path)
+    output_path = Path(output_path) if output_path else input_path
+    _check_stages(stage_names)
+    jobs = jobs or os.cpu_count() or 1
+    tokenizer = tokenizer or (default_tokenizer() if TOKENIZED_STAGES.intersection(stage_names) else None)
+    # Enough runs to keep every worker busy, large enough to amortize shipping them
+    task_bytes = max(MIN_TASK_BYTES, input_path.stat().st_size // (jobs * 4))
+
+    chain = StageChain(stage_names, tokenizer)
+    lines_read = lines_written = 0
+    with open(input_path, 'r', encoding='utf-8') as infile, atomic_write(output_path) as outfile, \
+            ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                initargs=(tuple(stage_names), tokenizer)) as pool:
+        pending = deque()
+
+        def write_next():
+            nonlocal lines_written
+            lines, in_glossary, future = pending.popleft()
+            output, line_count = _stitch(chain, lines, in_glossary, future.result(), stage_names, tokenizer)
+            outfile.write(output)
+            lines_written += line_count
+
+        for lines, in_glossary in iter_page_tasks(infile, task_bytes):
+            lines_read += len(lines)
+            pending.append((lines, in_glossary, pool.submit(_clean_task, ''.join(lines), in_glossary)))
+            if len(pending) >= jobs * 2:
+                write_next()
+        while pending:
+            write_next()
+        output = chain.finish()
+        outfile.writelines(output)
+        lines_written += len(output)
+    return lines_read, lines_written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Clean extracted glossary text in one streaming pass.')
+    parser.add_argument('input', nargs='?', help='Text file to clean')
+    parser.add_argument('-o', '--output', help='Output file (default: rewrite the input in place)')
+    parser.add_argument('--stages', default=','.join(DEFAULT_STAGES),
+                        help=f"Comma-separated stages, applied in order (default: {','.join(DEFAULT_STAGES)})")
+    parser.add_argument('--terms', type=Path,
+                        help='Flashcards JSON whose terms mark entry boundaries; other terms split only if title case (default: src/data/flashcards.json)')
+    parser.add_argument('--no-terms', action='store_true',
+                        help='Split entries only at short title-case terms after a sentence end, without a terms index')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Worker processes cleaning pages in parallel (default: 1, sequential streaming)')
+    parser.add_argument('--list-stages', action='store_true', help='List the available stages and exit')
+    args = parser.parse_args()
+
+    if args.list_stages:
+        for name, stage in STAGES.items():
+            summary = ' '.join(stage.__doc__.strip().split('\n\n')[0].split())
+            print(f'{name:<20} {summary}')
+        return
+    if not args.input:
+        parser.error('input is required')
+
+    stage_names = [name.strip() for name in args.stages.split(',') if name.strip()]
+    try:
+        if args.no_terms:
+            tokenizer = DefinitionTokenizer()
+        elif args.terms:
+            tokenizer = DefinitionTokenizer.from_flashcards(args.terms)
+        else:
+            tokenizer = None
+        lines_read, lines_written = run_pipeline(args.input, args.output, stage_names, tokenizer, args.jobs)
+    except (OSError, ValueError) as e:
+        print(f'❌ {e}', file=sys.stderr)
+        sys.exit(1)
+    print(f"✓ {args.input} → {args.output or args.input}: {lines_read} lines in, {lines_written} out "
+          f"({' → '.join(stage_names)})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Up-to-date tracking for the PDF converters (pdf_to_word_cli.py, batch_pdf_to_txt.py).
+
+A small JSON manifest beside the outputs records, for each output file, the
+source PDF it came from with that source's size and mtime (and SHA-256 when
+hashing is enabled), plus the output's size. An output is up to date when it
+still exists with the recorded size and its source is unchanged:
+
+- same size and mtime, or
+- with ``use_hash``, same content hash (e.g. after a checkout touched mtimes).
+
+Outputs converted before the manifest existed count as up to date when they
+are newer than their source, the usual make rule.
+"""
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+from atomic_write import write_json_atomic
+
+MANIFEST_NAME = '.conversions.json'
+MANIFEST_FORMAT = 'pmp-conversions'
+
+
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ConversionManifest:
+    """Manifest of source → output conversions for one output directory tree."""
+
+    def __init__(self, out_dir: Path, use_hash: bool = False, name: str = MANIFEST_NAME):
+        self.out_dir = Path(out_dir)
+        self.path = self.out_dir / name
+        self.use_hash = use_hash
+        self.entries: dict[str, dict] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            print(f'⚠️  Ignoring unreadable conversion manifest {self.path}: {e}')
+            return
+        if data.get('format') == MANIFEST_FORMAT:
+            self.entries = data.get('outputs', {})
+
+    def _key(self, output: Path) -> str:
+        output = Path(output).resolve()
+        try:
+            return output.relative_to(self.out_dir.resolve()).as_posix()
+        except ValueError:
+            return str(output)
+
+    def is_up_to_date(self, source: Path, output: Path) -> bool:
+        """True when ``output`` exists and was converted from the current ``source``."""
+        source, output = Path(source).resolve(), Path(output)
+        try:
+            output_stat = output.stat()
+            source_stat = source.stat()
+        except OSError:
+            return False
+
+        with self._lock:
+            entry = self.entries.get(self._key(output))
+        if entry is None:
+            if output_stat.st_mtime_ns < source_stat.st_mtime_ns:
+                return False
+            # Converted before the manifest existed: adopt it
+            self.record(source, output)
+            return True
+
+        if entry.get('source') != str(source) or entry.get('outputSize') != output_stat.st_size:
+            return False
+        if entry.get('sourceSize') != source_stat.st_size:
+            return False
+        if entry.get('sourceMtimeNs') == source_stat.st_mtime_ns:
+            return True
+        if self.use_hash and entry.get('sourceSha256') == file_sha256(source):
+            # Same bytes, new mtime: refresh the stat so the next check is cheap
+            self.record(source, output)
+            return True
+        return False
+
+    def record(self, source: Path, output: Path) -> None:
+        """Remember that ``output`` was just produced from ``source``."""
+        source, output = Path(source).resolve(), Path(output)
+        source_stat = source.stat()
+        entry = {
+            'source': str(source),
+            'sourceSize': source_stat.st_size,
+            'sourceMtimeNs': source_stat.st_mtime_ns,
+            'outputSize': output.stat().st_size,
+        }
+        if self.use_hash:
+            entry['sourceSha256'] = file_sha256(source)
+        with self._lock:
+            self.entries[self._key(output)] = entry
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write the manifest if anything changed, replacing it atomically and durably."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {'format': MANIFEST_FORMAT, 'version': 1, 'outputs': dict(sorted(self.entries.items()))}
+            write_json_atomic(self.path, data)
+            self._dirty = False
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Entry tokenizer for glossary lines holding several "Term. definition" entries.
+
+The cleanup scripts used to split such lines with ``(\\. )([A-Z][^.]*?\\.)``:
+any capitalized run after a period counted as the next term. That split
+ordinary sentences into separate bullets and broke after abbreviations
+("e.g. Scrum."), and the lazy pattern rescanned text on long lines.
+
+DefinitionTokenizer finds boundaries in one left-to-right scan. At each
+period followed by a space, the text up to the next period is the candidate
+term. It starts a new entry when the period does not end an abbreviation such
+as "e.g." or an initial, and the candidate either:
+
+- is a known term, looked up in an index of the terms in
+  src/data/flashcards.json, or
+- looks like a term: a short title-case phrase ("Definition of Done") that
+  does not open like a sentence ("It", "The", "See"). This is the only test
+  without an index, and it catches new terms that are not flashcards yet.
+
+The period closing an entry's own term never ends it. Each decision depends
+only on the text around its period, so one wrong call does not shift the rest
+of the line. Sentence-final abbreviations ("etc.", "Inc.") still end an entry
+when a known term follows them.
+"""
+
+import functools
+import json
+import re
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_FLASHCARDS = PROJECT_ROOT / 'src' / 'data' / 'flashcards.json'
+
+# Never end a sentence
+ABBREVIATIONS = frozenset({
+    'e.g.', 'i.e.', 'cf.', 'vs.', 'viz.', 'approx.', 'ca.', 'no.', 'nos.', 'fig.', 'figs.', 'vol.', 'ch.',
+    'sec.', 'p.', 'pp.', 'mr.', 'mrs.', 'ms.', 'dr.', 'prof.', 'st.', 'eq.', 'ref.',
+})
+# May end a sentence, so a known term after them still starts an entry
+TERMINAL_ABBREVIATIONS = frozenset({'etc.', 'al.', 'inc.', 'ltd.', 'co.', 'corp.', 'jr.', 'sr.'})
+DOTTED_ACRONYM = re.compile(r'(?:[a-z]\.){2,}')
+FRONT_TERM = re.compile(r'^What is (?:an? |the )?(.*?)\?$')
+# Longest candidate the title-case test accepts as a term
+FALLBACK_MAX_TERM_LENGTH = 60
+FALLBACK_MAX_TERM_WORDS = 6
+# Lowercase words allowed inside a title-case term
+TERM_CONNECTORS = frozenset({'a', 'an', 'and', 'as', 'at', 'by', 'for', 'in', 'of', 'on', 'or', 'per', 'the', 'to', 'vs', 'with'})
+# Capitalized openers of sentences and cross-references rather than terms
+SENTENCE_STARTERS = frozenset({
+    'a', 'an', 'also', 'it', 'its', 'see', 'that', 'the', 'there', 'these', 'they', 'this', 'those', 'we',
+    'when', 'where', 'which', 'while',
+})
+
+
+def normalize_term(term):
+    return ' '.join(term.casefold().split())
+
+
+def load_terms(flashcards_path=DEFAULT_FLASHCARDS):
+    """Return the terms of a flashcards JSON file: original_term, or X from a "What is X?" front."""
+    with open(flashcards_path, 'r', encoding='utf-8') as f:
+        cards = json.load(f)
+    terms = []
+    for card in cards:
+        term = card.get('original_term')
+        if not term:
+            match = FRONT_TERM.match(card.get('front', ''))
+            term = match.group(1) if match else None
+        if term:
+            terms.append(term)
+    return terms
+
+
+class DefinitionTokenizer:
+    """Split text into "Term. definition" entries at known-term boundaries."""
+
+    def __init__(self, terms=None):
+        self.terms = None
+        self.exact_terms = frozenset()
+        self.max_term_length = 0
+        if terms is not None:
+            self.exact_terms = frozenset(' '.join(term.split()) for term in terms)
+            self.terms = frozenset(normalize_term(term) for term in self.exact_terms)
+            self.max_term_length = max(map(len, self.exact_terms), default=0)
+
+    @classmethod
+    def from_flashcards(cls, flashcards_path=DEFAULT_FLASHCARDS):
+        return cls(load_terms(flashcards_path))
+
+    def _period_kind(self, text, period):
+        """Classify the period at text[period]: 'abbreviation', 'terminal' (abbreviation that may end a sentence) or 'sentence'."""
+        token = text[text.rfind(' ', 0, period) + 1:period + 1].lstrip('([{"\'“‘').casefold()
+        if token in ABBREVIATIONS or (len(token) == 2 and token[0].isalpha()):
+            return 'abbreviation'
+        if token in TERMINAL_ABBREVIATIONS or DOTTED_ACRONYM.fullmatch(token):
+            return 'terminal'
+        return 'sentence'
+
+    def _is_known_term(self, candidate):
+        if self.terms is None or len(candidate) > self.max_term_length:
+            return False
+        if candidate in self.exact_terms:
+            return True
+        # Case-insensitive match, but a lowercase start must be the term as written (e.g. "eXtreme Programming")
+        return not candidate[0].islower() and normalize_term(candidate) in self.terms
+
+    @staticmethod
+    def _looks_like_term(candidate):
+        """True for a short title-case phrase that doesn't open like a sentence."""
+        if len(candidate) > FALLBACK_MAX_TERM_LENGTH:
+            return False
+        words = candidate.split()
+        if not words or len(words) > FALLBACK_MAX_TERM_WORDS:
+            return False
+        if not words[0][0].isupper() or words[0].casefold() in SENTENCE_STARTERS:
+            return False
+        return all(not word[0].islower() or word in TERM_CONNECTORS for word in words[1:])
+
+    def _leading_term_end(self, text):
+        """Index of the period closing the term the text starts with, or -1."""
+        period = text.find('. ')
+        if period == -1:
+            return -1
+        head = text[:period].strip()
+        if head.startswith('- '):
+            head = head[2:].lstrip()
+        return period if head and (self._is_known_term(head) or self._looks_like_term(head)) else -1
+
+    def boundaries(self, text):
+        """
+        Yield (end, start) for each entry boundary in text: the previous entry
+        is text[..:end], including its period, and the next starts at text[start:].
+        """
+        find = text.find
+        length = len(text)
+        own_term_end = self._leading_term_end(text)
+        period = find('. ')
+        while period != -1:
+            start = period + 2
+            while start < length and text[start] == ' ':
+                start += 1
+            term_end = find('.', start)
+            # Cheap checks first: most sentences are longer than any term
+            if (period != own_term_end and term_end > start
+                    and (term_end + 1 == length or text[term_end + 1].isspace())):
+                candidate = text[start:term_end]
+                if self._is_known_term(candidate):
+                    is_boundary = self._period_kind(text, period) != 'abbreviation'
+                else:
+                    is_boundary = self._looks_like_term(candidate) and self._period_kind(text, period) == 'sentence'
+                if is_boundary:
+                    yield period + 1, start
+                    own_term_end = term_end
+            period = find('. ', period + 1)
+
+    def split(self, text):
+        """Return text cut into its entries (unstripped slices; the last keeps any line ending)."""
+        pieces = []
+        previous = 0
+        for end, start in self.boundaries(text):
+            pieces.append(text[previous:end])
+            previous = start
+        pieces.append(text[previous:])
+        return pieces
+
+
+@functools.lru_cache(maxsize=None)
+def default_tokenizer():
+    """Tokenizer over the project's flashcard terms, or the capitalization fallback if there are none."""
+    if DEFAULT_FLASHCARDS.exists():
+        return DefinitionTokenizer.from_flashcards(DEFAULT_FLASHCARDS)
+    return DefinitionTokenizer()
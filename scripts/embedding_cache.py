@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Persistent per-chunk embedding cache shared by the vectorizer scripts.
+
+Vectors are keyed by the SHA-256 of the embedded text inside a namespace derived
+from the model name and the chunking parameters, so changing either one starts a
+fresh cache instead of silently reusing incompatible vectors. Each namespace is
+stored as one ``.npz`` holding the keys and the matrix together, so a crash can
+never pair one save's vectors with another save's keys.
+"""
+
+import hashlib
+import json
+import re
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+from atomic_write import atomic_write
+
+
+def content_hash(text):
+    """Return the SHA-256 hex digest of a chunk's text."""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """Embedding cache for one (model, chunk parameters) namespace."""
+
+    def __init__(self, cache_dir, model_name, params):
+        self.cache_dir = Path(cache_dir)
+        self.model_name = model_name
+        self.params = dict(params)
+
+        params_blob = json.dumps({'model': model_name, **self.params}, sort_keys=True)
+        model_slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', model_name)
+        self.namespace = f'{model_slug}-{content_hash(params_blob)[:12]}'
+        self.path = self.cache_dir / f'{self.namespace}.npz'
+
+        self._vectors = {}
+        self._used = set()
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self):
+        if not self.path.exists():
+            return
+        try:
+            with np.load(self.path) as data:
+                keys = data['keys'].tolist()
+                matrix = data['vectors']
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile) as exc:
+            print(f'⚠️  Ignoring unreadable embedding cache {self.path.name}: {exc}')
+            return
+        if len(keys) != len(matrix):
+            print(f'⚠️  Ignoring inconsistent embedding cache {self.path.name}')
+            return
+        self._vectors = {key: matrix[row] for row, key in enumerate(keys)}
+
+    def __len__(self):
+        return len(self._vectors)
+
+    def get(self, text):
+        """Return the cached vector for ``text`` or None, marking the entry as in use."""
+        key = content_hash(text)
+        vector = self._vectors.get(key)
+        if vector is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._used.add(key)
+        return vector
+
+    def put(self, text, vector):
+        """Store a freshly computed vector for ``text``."""
+        key = content_hash(text)
+        self._vectors[key] = np.asarray(vector, dtype=np.float32)
+        self._used.add(key)
+
+    def save(self, prune=True):
+        """
+        Persist the cache. With ``prune`` only entries touched during this run are
+        kept, which drops vectors for chunks that were edited or removed.
+
+        Returns the number of pruned entries.
+        """
+        keys = [key for key in self._vectors if key in self._used] if prune else list(self._vectors)
+        pruned = len(self._vectors) - len(keys)
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if keys:
+            matrix = np.stack([self._vectors[key] for key in keys]).astype(np.float32)
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        with atomic_write(self.path, 'wb') as f:
+            np.savez(f, keys=np.array(keys, dtype=str), vectors=matrix)
+
+        self._vectors = {key: self._vectors[key] for key in keys}
+        return pruned
@@ -1,13 +1,21 @@
-import json
+import argparse
+import contextlib
 from pathlib import Path
-import fitz
+
+from atomic_write import write_json_atomic
+from page_text_cache import PageTextCache, iter_page_texts
 
 ROOT_DIR = Path(__file__).resolve().parent.parent
 OUTLINE_DIR = ROOT_DIR / "data" / "reference" / "exam-outline"
 OUTLINE_PATH = OUTLINE_DIR / "2026_structure.json"
 
-# Open the 2026 PDF
-doc = fitz.open('references/New-PMP-Examination-Content-Outline-2026.pdf')
+# The 2026 PDF
+PDF_PATH = ROOT_DIR / 'references' / 'New-PMP-Examination-Content-Outline-2026.pdf'
+
+parser = argparse.ArgumentParser(description="Extract the 2026 exam content outline into data/reference/exam-outline.")
+parser.add_argument("--no-text-cache", action="store_true",
+                    help="Re-extract the pages instead of using the shared .cache/page-text cache")
+args = parser.parse_args()
 
 # Structure to hold the extracted data
 domains_2026 = {
@@ -16,12 +24,9 @@ domains_2026 = {
     'business': {'name': 'Business Environment', 'percentage': 26, 'tasks': []}
 }
 
-# Extract full text from pages 7-12
-full_text = ""
-for page_num in range(6, 12):  # Pages 7-12 (0-indexed 6-11)
-    full_text += doc[page_num].get_text()
-
-doc.close()
+# Extract full text from pages 7-12, reusing page text other scripts already extracted
+with contextlib.nullcontext() if args.no_text_cache else PageTextCache() as text_cache:
+    full_text = "".join(text for _, text in iter_page_texts(PDF_PATH, 'text', text_cache, first_page=7, last_page=12))
 
 # Manually parse the structure based on the PDF content
 # DOMAIN I - PEOPLE (33%)
@@ -360,8 +365,6 @@ for domain_id, domain_data in domains_2026.items():
         print(f"  {task['id']}: {task['title']} ({len(task['enablers'])} enablers)")
 
 # Save to JSON file for reference
-OUTLINE_DIR.mkdir(parents=True, exist_ok=True)
-with OUTLINE_PATH.open('w', encoding='utf-8') as f:
-    json.dump(domains_2026, f, indent=2)
+write_json_atomic(OUTLINE_PATH, domains_2026)
 
 print(f"\n\nSaved to {OUTLINE_PATH.relative_to(ROOT_DIR)}")
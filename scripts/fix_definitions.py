@@ -5,9 +5,10 @@ Script to process AgilePracticeGuide.md and:
 2. Add bullet points to definitions
 """
 
-import os
 import re
 
+from atomic_write import atomic_write
+
 def process_definitions(input_file, output_file):
     """
     Process the input file to separate combined definitions and add bullet points.
@@ -49,18 +50,14 @@ def process_definitions(input_file, output_file):
             processed_lines.append(line)
 
     # Write the processed content to the output file
-    with open(output_file, 'w', encoding='utf-8') as outfile:
+    with atomic_write(output_file) as outfile:
         outfile.writelines(processed_lines)
 
 def main():
     input_file = "/Users/dustinober/Projects/PMP_Practice_Static/data/txt/AgilePracticeGuide.md"
-    temp_output_file = "/Users/dustinober/Projects/PMP_Practice_Static/data/txt/AgilePracticeGuide.md.tmp"
     
     # Process the file to separate combined entries and add bullet points
-    process_definitions(input_file, temp_output_file)
-    
-    # Replace the original file with the processed one
-    os.replace(temp_output_file, input_file)
+    process_definitions(input_file, input_file)
     
     print(f"Processed {input_file} to separate combined entries and add bullet points to definitions.")
 
@@ -1,6 +1,8 @@
 import json
 from pathlib import Path
 
+from atomic_write import write_json_atomic
+
 ROOT_DIR = Path(__file__).resolve().parent.parent
 OUTLINE_PATH = ROOT_DIR / "data" / "reference" / "exam-outline" / "2026_structure.json"
 TASKS_PATH = ROOT_DIR / "src" / "data" / "tasks.json"
@@ -40,15 +42,9 @@ for domain_id, domain_data in structure_2026.items():
                 "text": enabler_text
             })
 
-# Save tasks.json
-with TASKS_PATH.open('w', encoding='utf-8') as f:
-    json.dump(tasks, f, indent=2)
-    f.write('\n')
-
-# Save enablers.json
-with ENABLERS_PATH.open('w', encoding='utf-8') as f:
-    json.dump(enablers, f, indent=2)
-    f.write('\n')
+# Save tasks.json and enablers.json (each replaced atomically, so the app never imports a partial file)
+write_json_atomic(TASKS_PATH, tasks, trailing_newline=True)
+write_json_atomic(ENABLERS_PATH, enablers, trailing_newline=True)
 
 print(f"✓ Generated tasks.json with {len(tasks)} tasks")
 print(f"✓ Generated enablers.json with {len(enablers)} enablers")
@@ -3,9 +3,10 @@
 Script to process AgilePracticeGuide.txt and join continuation lines in the glossary section only.
 """
 
-import os
 import re
 
+from atomic_write import atomic_write
+
 def join_glossary_continuation_lines(input_file, output_file):
     """
     Process the input file and join lines that don't start with capital letters to the line above,
@@ -55,18 +56,14 @@ def join_glossary_continuation_lines(input_file, output_file):
             processed_lines.append(line)
 
     # Write the processed content to the output file
-    with open(output_file, 'w', encoding='utf-8') as outfile:
+    with atomic_write(output_file) as outfile:
         outfile.writelines(processed_lines)
 
 def main():
     input_file = "/Users/dustinober/Projects/PMP_Practice_Static/data/txt/AgilePracticeGuide.txt"
-    temp_output_file = "/Users/dustinober/Projects/PMP_Practice_Static/data/txt/AgilePracticeGuide.txt.tmp"
     
     # Process the file to join continuation lines in glossary
-    join_glossary_continuation_lines(input_file, temp_output_file)
-    
-    # Replace the original file with the processed one
-    os.replace(temp_output_file, input_file)
+    join_glossary_continuation_lines(input_file, input_file)
     
     print(f"Processed {input_file} and joined continuation lines in the glossary section.")
 
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Batched, connection-pooled Ollama embedding client.
+
+``OllamaEmbedder`` sends lists of texts as the ``input`` array of ``/api/embed``
+over a single keep-alive ``httpx.AsyncClient``. Up to ``concurrency`` requests are
+in flight at once and failed requests are retried with exponential backoff. The
+client runs its event loop on a background thread, so synchronous callers (and
+several embedding threads at once) can share one connection pool via ``embed()``.
+"""
+
+import asyncio
+import random
+import threading
+
+import httpx
+
+DEFAULT_OLLAMA_URL = 'http://localhost:11434'
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+def is_input_error(exc):
+    """True when Ollama rejected the request itself (a non-retryable 4xx), not the transport."""
+    if not isinstance(exc, httpx.HTTPStatusError):
+        return False
+    status = exc.response.status_code
+    return 400 <= status < 500 and status not in RETRY_STATUS
+
+
+class OllamaEmbedder:
+    """Embed texts with Ollama using pooled, concurrent, batched requests."""
+
+    def __init__(self, model, base_url=DEFAULT_OLLAMA_URL, batch_size=16, concurrency=4,
+                 retries=4, backoff=0.5, timeout=120.0, min_interval=0.0):
+        self.model = model
+        self.base_url = base_url.rstrip('/')
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.min_interval = min_interval
+        self.requests_sent = 0
+        self.retries_used = 0
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='ollama-embed', daemon=True)
+        self._thread.start()
+        self._client = None
+        self._semaphore = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    async def _ensure_client(self):
+        if self._client is None:
+            limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+            self._client = httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=self.timeout)
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    async def _post_batch(self, texts):
+        """POST one batch, retrying transport errors and retryable status codes."""
+        payload = {'model': self.model, 'input': texts}
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    self.requests_sent += 1
+                    response = await self._client.post('/api/embed', json=payload)
+                    if self.min_interval > 0:
+                        await asyncio.sleep(self.min_interval)
+                if response.status_code in RETRY_STATUS:
+                    raise httpx.HTTPStatusError(
+                        f'Retryable status {response.status_code}', request=response.request, response=response
+                    )
+                response.raise_for_status()
+                data = response.json()
+                embeddings = data.get('embeddings')
+                if not isinstance(embeddings, list) or len(embeddings) != len(texts):
+                    raise ValueError(f'Unexpected response from Ollama: {str(data)[:200]}')
+                return embeddings
+            except (httpx.TransportError, httpx.HTTPStatusError) as exc:
+                status = exc.response.status_code if isinstance(exc, httpx.HTTPStatusError) else None
+                if attempt >= self.retries or (status is not None and status not in RETRY_STATUS):
+                    raise
+                delay = self.backoff * (2 ** attempt) * (0.5 + random.random())
+                attempt += 1
+                self.retries_used += 1
+                await asyncio.sleep(delay)
+
+    async def embed_async(self, texts):
+        """Embed ``texts`` and return vectors in input order."""
+        await self._ensure_client()
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        results = await asyncio.gather(*(self._post_batch(batch) for batch in batches))
+        return [vector for batch in results for vector in batch]
+
+    def embed(self, texts):
+        """Thread-safe synchronous wrapper around ``embed_async``."""
+        texts = list(texts)
+        if not texts:
+            return []
+        return asyncio.run_coroutine_threadsafe(self.embed_async(texts), self._loop).result()
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        if self._client is not None:
+            asyncio.run_coroutine_threadsafe(self._client.aclose(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Shared on-disk cache of extracted PDF page text.
+
+The PDF-processing scripts (pdf_to_flashcards_agent.py, batch_pdf_to_txt.py,
+vectorize-reference-pdfs.py, extract_2026_structure.py) read the same PMI PDFs.
+Page text is cached by (SHA-256 of the PDF bytes, page number, extraction mode),
+so a document is parsed once no matter how many tools use it, and an edited PDF
+misses the cache automatically.
+
+Entries live in one SQLite database, which is safe to share between the worker
+processes the scripts fan out to. Reads refresh an entry's last-used time, and
+writes evict the least recently used pages once the cached text exceeds
+``max_bytes``.
+
+Modes name the extraction, not the tool: ``text`` is PyMuPDF's plain
+``page.get_text()``, ``text-sorted`` and ``blocks-sorted`` use ``sort=True``.
+Callers with their own extraction (e.g. the flashcard agent's ``layout``) pass
+an ``extract`` callable and a mode name of their own. The PyMuPDF version is
+part of every key, so upgrading it re-extracts instead of mixing outputs.
+
+Usage:
+  python scripts/page_text_cache.py stats
+  python scripts/page_text_cache.py trim --max-mb 128
+  python scripts/page_text_cache.py clear
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_CACHE_DIR = PROJECT_ROOT / '.cache' / 'page-text'
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+PAGE_EXTRACTORS = {
+    'text': lambda page: page.get_text() or '',
+    'text-sorted': lambda page: page.get_text('text', sort=True) or '',
+    'blocks-sorted': lambda page: '\n'.join(
+        block[4].strip() for block in page.get_text('blocks', sort=True) if block[6] == 0 and block[4].strip()
+    ),
+}
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    doc_hash TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS docs (
+    doc_hash TEXT PRIMARY KEY,
+    page_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    doc_hash TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    page INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (doc_hash, mode, page)
+);
+CREATE INDEX IF NOT EXISTS pages_last_used ON pages (last_used);
+'''
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _versioned(mode):
+    version = fitz.VersionBind if fitz is not None else 'none'
+    return f'{mode}@pymupdf-{version}'
+
+
+class PageTextCache:
+    """Size-bounded LRU cache of page text, keyed by PDF content hash, page and mode."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.path = self.cache_dir / 'pages.sqlite3'
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._pid = None
+
+    def __getstate__(self):
+        # Connections do not survive pickling or fork; workers reconnect lazily
+        state = dict(self.__dict__)
+        state['_conn'] = None
+        state['_pid'] = None
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def conn(self):
+        if self._conn is None or self._pid != os.getpid():
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.executescript(_SCHEMA)
+            self._pid = os.getpid()
+        return self._conn
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+        self._pid = None
+
+    def doc_hash(self, pdf_path):
+        """Content hash of a PDF, re-hashing only when its size or mtime changed."""
+        pdf_path = Path(pdf_path).resolve()
+        stat = pdf_path.stat()
+        row = self.conn.execute('SELECT size, mtime_ns, doc_hash FROM files WHERE path = ?', (str(pdf_path),)).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+        digest = file_hash(pdf_path)
+        self.conn.execute(
+            'INSERT OR REPLACE INTO files (path, size, mtime_ns, doc_hash) VALUES (?, ?, ?, ?)',
+            (str(pdf_path), stat.st_size, stat.st_mtime_ns, digest)
+        )
+        return digest
+
+    def page_count(self, doc_hash):
+        row = self.conn.execute('SELECT page_count FROM docs WHERE doc_hash = ?', (doc_hash,)).fetchone()
+        return row[0] if row else None
+
+    def set_page_count(self, doc_hash, page_count):
+        self.conn.execute('INSERT OR REPLACE INTO docs (doc_hash, page_count) VALUES (?, ?)', (doc_hash, page_count))
+
+    def get_pages(self, doc_hash, mode, first_page, last_page):
+        """Return {page: text} for the cached pages in [first_page, last_page] (1-based)."""
+        key = (doc_hash, _versioned(mode), first_page, last_page)
+        conn = self.conn
+        rows = conn.execute(
+            'SELECT page, text FROM pages WHERE doc_hash = ? AND mode = ? AND page BETWEEN ? AND ?', key
+        ).fetchall()
+        if rows:
+            conn.execute(
+                'UPDATE pages SET last_used = ? WHERE doc_hash = ? AND mode = ? AND page BETWEEN ? AND ?',
+                (time.time(), *key)
+            )
+        return dict(rows)
+
+    def put_pages(self, doc_hash, mode, texts):
+        """Store {page: text} for one document and mode, then evict down to ``max_bytes``."""
+        if not texts:
+            return
+        now = time.time()
+        mode = _versioned(mode)
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO pages (doc_hash, mode, page, text, size, last_used) VALUES (?, ?, ?, ?, ?, ?)',
+                [(doc_hash, mode, page, text, len(text.encode('utf-8')), now) for page, text in texts.items()]
+            )
+        self.evict()
+
+    def total_bytes(self):
+        return self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+
+    def evict(self, max_bytes=None):
+        """Drop least recently used pages until the cache holds at most ``max_bytes``. Returns pages removed."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        excess = self.total_bytes() - max_bytes
+        if excess <= 0:
+            return 0
+        doomed, freed = [], 0
+        for rowid, size in self.conn.execute('SELECT rowid, size FROM pages ORDER BY last_used'):
+            doomed.append((rowid,))
+            freed += size
+            if freed >= excess:
+                break
+        with self.conn:
+            self.conn.executemany('DELETE FROM pages WHERE rowid = ?', doomed)
+        return len(doomed)
+
+    def clear(self):
+        with self.conn:
+            for table in ('pages', 'docs', 'files'):
+                self.conn.execute(f'DELETE FROM {table}')
+        self.conn.execute('VACUUM')
+
+    def stats(self):
+        pages, size, docs = self.conn.execute(
+            'SELECT COUNT(*), COALESCE(SUM(size), 0), COUNT(DISTINCT doc_hash) FROM pages'
+        ).fetchone()
+        return {'pages': pages, 'bytes': size, 'documents': docs, 'maxBytes': self.max_bytes, 'path': str(self.path)}
+
+
+def iter_page_texts(pdf_path, mode='text', cache=None, first_page=1, last_page=None, extract=None):
+    """
+    Yield (page_number, text) for pages [first_page, last_page] of a PDF (1-based).
+
+    Cached pages are served without opening the PDF. Missing pages are extracted
+    with ``extract(page)`` (default: ``PAGE_EXTRACTORS[mode]``) and written back.
+    Without a cache this is a plain PyMuPDF extraction.
+    """
+    extract = extract or PAGE_EXTRACTORS[mode]
+    cached, doc_hash, page_count = {}, None, None
+    if cache is not None:
+        doc_hash = cache.doc_hash(pdf_path)
+        page_count = cache.page_count(doc_hash)
+        if page_count is not None:
+            last = min(last_page or page_count, page_count)
+            cached = cache.get_pages(doc_hash, mode, first_page, last)
+            if len(cached) == last - first_page + 1 or last < first_page:
+                cache.hits += len(cached)
+                for page_number in range(first_page, last + 1):
+                    yield page_number, cached[page_number]
+                return
+
+    if fitz is None:
+        raise ImportError('PyMuPDF is required for text extraction. Install with: pip install PyMuPDF')
+
+    fresh = {}
+    try:
+        with fitz.open(pdf_path) as doc:
+            page_count = len(doc)
+            last = min(last_page or page_count, page_count)
+            for page_number in range(first_page, last + 1):
+                text = cached.get(page_number)
+                if text is None:
+                    text = fresh[page_number] = extract(doc.load_page(page_number - 1))
+                yield page_number, text
+    finally:
+        # Also keep what was extracted when the caller stops early
+        if cache is not None and page_count is not None:
+            cache.hits += len(cached)
+            cache.misses += len(fresh)
+            cache.set_page_count(doc_hash, page_count)
+            cache.put_pages(doc_hash, mode, fresh)
+
+
+def pdf_page_count(pdf_path, cache=None):
+    """Page count of a PDF, from the cache when the document has been seen before."""
+    if cache is not None:
+        doc_hash = cache.doc_hash(pdf_path)
+        page_count = cache.page_count(doc_hash)
+        if page_count is not None:
+            return page_count
+    if fitz is None:
+        raise ImportError('PyMuPDF is required for text extraction. Install with: pip install PyMuPDF')
+    with fitz.open(pdf_path) as doc:
+        page_count = len(doc)
+    if cache is not None:
+        cache.set_page_count(doc_hash, page_count)
+    return page_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or trim the shared PDF page-text cache.')
+    parser.add_argument('command', choices=['stats', 'trim', 'clear'])
+    parser.add_argument('--cache-dir', type=Path, default=DEFAULT_CACHE_DIR, help='Cache directory (default: .cache/page-text)')
+    parser.add_argument('--max-mb', type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024), help='Size bound for trim (default: 256)')
+    args = parser.parse_args()
+
+    with PageTextCache(args.cache_dir, int(args.max_mb * 1024 * 1024)) as cache:
+        if args.command == 'clear':
+            cache.clear()
+            print(f'✓ Cleared {cache.path}')
+        elif args.command == 'trim':
+            print(f'✓ Evicted {cache.evict()} pages')
+        stats = cache.stats()
+        print(f"♻️  {stats['pages']} pages from {stats['documents']} documents, "
+              f"{stats['bytes'] / (1024 * 1024):.1f} / {stats['maxBytes'] / (1024 * 1024):.0f} MB in {stats['path']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,39 +8,241 @@ followed by periods and definitions) and non-traditional formats (terms on separ
 followed by definitions).
 
 Features:
-- Extracts text from PDFs using pdftotext
-- Detects glossary/definitions sections automatically
+- Extracts text from PDFs in-process with PyMuPDF (layout-preserving by default)
+- Locates the glossary pages from outline bookmarks or running headings and only
+  parses those, then detects the glossary/definitions section within them
 - Handles both "Term. Definition" and "TERM on line\nDefinition on next lines" formats
 - Creates flashcards in the project's required format
 - Can process various PMI reference documents including Agile Practice Guide, AI Essentials, etc.
+- Directory mode extracts every PDF in a folder in parallel worker processes and
+  writes flashcards.json once
 """
 
+import argparse
+import contextlib
+import io
 import os
 import sys
 import json
 import re
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+try:
+    import fitz  # PyMuPDF, for outline bookmarks
+except ImportError:
+    fitz = None
+
+from atomic_write import write_json_atomic
+from page_text_cache import PageTextCache, iter_page_texts
+
+# "layout" rebuilds visual lines like `pdftotext -layout`, "text" is PyMuPDF's
+# reading-order text, "blocks" yields one paragraph-like layout block per line
+# group, and "pdftotext" shells out to the external binary for comparison.
+TEXT_MODES = ('layout', 'text', 'blocks', 'pdftotext')
+
+# Glossary line patterns, compiled once and shared by every extraction strategy
+_GLOSSARY_START = re.compile(r'glossary|definitions|key terms|terms and definitions')
+_GLOSSARY_END = re.compile(r'bibliography|references|index|appendix|about the author')
+_GLOSSARY_FIRST_TERM = re.compile(r'^[A-Z][A-Za-z\s\-\(\)&,®"]{2,100}\.\s+[A-Z]')
+_AI_TERM_LINE = re.compile(r'^[A-Z][A-Za-z\s\-]+$')
+_AI_SECTION_END = re.compile(r'bibliography|references|index')
+_TOC_LEADER = re.compile(r'\.{3,}|…')
+_TERM_LINE = re.compile(r'^([A-Z][A-Za-z\'\-\s\(\)&,/®"]{2,100}?)\.\s*(.*)')
+_HEADER_LINE = re.compile(r'^[A-Z][A-Za-z\s\-\(\)]{5,50}$')
+_PAGE_NUMBER_LINE = re.compile(r'^\d+\s+')
+_TRAILING_PAGE_NUMBER = re.compile(r'\s+\d{3}\s*$')
+_IS_DEFINITION = re.compile(r'^[A-Z][A-Za-z\s\-\'\"]{3,50}\s*(is|are|was|means|refers to)\s+', re.IGNORECASE)
+_IS_DEFINITION_SPLIT = re.compile(r'\s+(is|are|was|means|refers to)\s+', re.IGNORECASE)
+_COLON_DEFINITION = re.compile(r'^[A-Z][A-Za-z\s\-\'\"]{3,50}:')
+_SECTION_WORDS = re.compile(r'chapter|introduction|section|part|table|figure|appendix|index|bibliography')
+_PHRASE_SKIP_WORDS = re.compile(r'chapter|introduction|section|table of contents|appendix|index|bibliography')
+_CROSS_REFERENCES = ("Also known as", "See also", "Equivalent to")
+_AI_STOP_LINES = frozenset(['', ' ', '©', 'PMI', 'AI Essentials for Project Professionals'])
+_NON_DEFINITION_PREFIXES = ('in this', 'as we', 'the purpose', 'to help', 'when', 'where', 'this section', 'the goal')
+
+
+def _layout_page_text(page):
+    """Rebuild the visual lines of a page from PyMuPDF line boxes, like pdftotext -layout."""
+    rows = []
+    for block in page.get_text('dict', sort=True)['blocks']:
+        if block.get('type') != 0:
+            continue
+        for line in block['lines']:
+            text = ''.join(span['text'] for span in line['spans'])
+            if not text.strip():
+                continue
+            x0, y0, x1, y1 = line['bbox']
+            rows.append(((y0 + y1) / 2, x0, x1, text, max(y1 - y0, 1.0)))
+    rows.sort(key=lambda row: (row[0], row[1]))
+
+    # Lines whose vertical centres are within half a line height share a visual line
+    visual_lines = []
+    for row in rows:
+        if visual_lines and abs(row[0] - visual_lines[-1][0][0]) <= visual_lines[-1][0][4] / 2:
+            visual_lines[-1].append(row)
+        else:
+            visual_lines.append([row])
+
+    lines = []
+    for segments in visual_lines:
+        segments.sort(key=lambda row: row[1])
+        text = segments[0][3]
+        for prev, segment in zip(segments, segments[1:]):
+            char_width = max((prev[2] - prev[1]) / max(len(prev[3]), 1), 1.0)
+            gap = max(1, round((segment[1] - prev[2]) / char_width))
+            text += ' ' * gap + segment[3]
+        lines.append(text.rstrip())
+    return '\n'.join(lines)
+
+
+def iter_pdf_pages(pdf_path, mode='layout', cache=None, first_page=1, last_page=None):
+    """
+    Yield (page_number, text) for pages [first_page, last_page] of the PDF, extracted
+    in-process with PyMuPDF.
+
+    With a PageTextCache, pages already extracted in this mode (by any script)
+    are read from the cache instead.
+    """
+    if mode == 'layout':
+        return iter_page_texts(pdf_path, 'layout', cache, first_page, last_page, extract=_layout_page_text)
+    if mode == 'blocks':
+        return iter_page_texts(pdf_path, 'blocks-sorted', cache, first_page, last_page)
+    return iter_page_texts(pdf_path, 'text-sorted', cache, first_page, last_page)
+
+
+def extract_pages_from_pdf(pdf_path, mode='layout', cache=None, first_page=1, last_page=None):
+    """Extract pages [first_page, last_page] as a list of (page_number, text), or None on failure."""
+    if mode == 'pdftotext':
+        # External binary, kept only to compare extraction quality; output goes to stdout
+        command = ['pdftotext', '-layout', '-f', str(first_page)]
+        if last_page:
+            command += ['-l', str(last_page)]
+        try:
+            result = subprocess.run(command + [str(pdf_path), '-'], capture_output=True, text=True, check=True)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Error running pdftotext: {e}")
+            return None
+        # pdftotext ends every page with a form feed
+        pages = result.stdout.split('\f')
+        if pages and not pages[-1].strip():
+            pages.pop()
+        return list(enumerate(pages, start=first_page))
 
-def extract_text_from_pdf(pdf_path):
-    """Extract text from PDF using pdftotext utility."""
-    output_path = pdf_path.with_suffix('.txt')
-    
     try:
-        # Use pdftotext to extract text with layout preservation
-        result = subprocess.run([
-            'pdftotext', '-layout', str(pdf_path), str(output_path)
-        ], capture_output=True, text=True, check=True)
-        
-        if result.returncode != 0:
-            raise Exception(f"pdftotext failed: {result.stderr}")
-        
-        return output_path
-    except subprocess.CalledProcessError as e:
-        print(f"Error running pdftotext: {e}")
-        # If pdftotext fails, try alternative approach
+        return list(iter_pdf_pages(pdf_path, mode, cache, first_page, last_page))
+    except Exception as e:
+        print(f"Error extracting text with PyMuPDF: {e}")
+        return None
+
+
+def extract_text_from_pdf(pdf_path, mode='layout', cache=None):
+    """Extract the text of a PDF as one string, without temp files."""
+    pages = extract_pages_from_pdf(pdf_path, mode, cache)
+    if pages is None:
         return None
+    return '\n'.join(text for _, text in pages)
+
+
+def outline_glossary_range(pdf_path):
+    """
+    Find a glossary bookmark in the PDF outline.
+
+    Returns (first_page, last_page, title) or None. The range runs to the page
+    of the next bookmark at the same or a higher level, inclusive, since that
+    section may start on the glossary's last page.
+    """
+    if fitz is None:
+        return None
+    try:
+        with fitz.open(pdf_path) as doc:
+            toc = doc.get_toc(simple=True)
+            page_count = len(doc)
+    except Exception:
+        return None
+
+    for index, (level, title, page) in enumerate(toc):
+        if page < 1 or not _GLOSSARY_START.search(title.lower()):
+            continue
+        last_page = page_count
+        for next_level, _, next_page in toc[index + 1:]:
+            if next_level <= level and next_page >= page:
+                last_page = next_page
+                break
+        return page, last_page, title.strip()
+    return None
+
+
+def build_heading_index(pages, top_lines=5, bottom_lines=3):
+    """
+    Index the pages whose headings mention a glossary.
+
+    Only the first and last few non-empty lines of a page are checked, where the
+    section title and running headers/footers sit. Long lines and table-of-contents
+    entries (dot leaders) are ignored. Returns the sorted page numbers with a hit.
+    """
+    hits = []
+    for page_number, text in pages:
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        candidates = lines[:top_lines] + lines[-bottom_lines:]
+        for line in candidates:
+            if len(line.split()) <= 6 and not _TOC_LEADER.search(line) and _GLOSSARY_START.search(line.lower()):
+                hits.append(page_number)
+                break
+    return hits
+
+
+def heading_glossary_range(pages, max_gap=2):
+    """
+    Pick the glossary page range from the heading index.
+
+    Hit pages no more than ``max_gap`` apart form a run. The longest run wins, the
+    later one on ties (glossaries sit at the back). One page past the run is
+    included for entries that continue under another heading. Returns
+    (first_page, last_page) or None.
+    """
+    hits = build_heading_index(pages)
+    if not hits:
+        return None
+    runs = [[hits[0], hits[0]]]
+    for page_number in hits[1:]:
+        if page_number - runs[-1][1] <= max_gap:
+            runs[-1][1] = page_number
+        else:
+            runs.append([page_number, page_number])
+    first_page, last_page = max(reversed(runs), key=lambda run: run[1] - run[0])
+    return first_page, min(last_page + 1, pages[-1][0])
+
+
+def extract_glossary_text(pdf_path, mode='layout', cache=None, locate=True):
+    """
+    Extract the text of the pages most likely to hold the glossary.
+
+    Tries the outline bookmarks first, which needs only the glossary pages
+    extracted, then a heading index over all pages. Without either, or with
+    locate=False, every page is returned. The chosen pages are reported.
+    """
+    outline = outline_glossary_range(pdf_path) if locate else None
+    if outline:
+        first_page, last_page, title = outline
+        pages = extract_pages_from_pdf(pdf_path, mode, cache, first_page, last_page)
+        if pages:
+            print(f"Glossary pages {first_page}-{last_page} (outline bookmark '{title}')")
+            return '\n'.join(text for _, text in pages)
+
+    pages = extract_pages_from_pdf(pdf_path, mode, cache)
+    if not pages:
+        return None
+
+    located = heading_glossary_range(pages) if locate else None
+    if located:
+        first_page, last_page = located
+        print(f"Glossary pages {first_page}-{last_page} of {len(pages)} (page headings)")
+        return '\n'.join(text for page_number, text in pages if first_page <= page_number <= last_page)
+
+    print(f"No glossary pages located; scanning all {len(pages)} pages")
+    return '\n'.join(text for _, text in pages)
 
 
 def detect_glossary_section(text_content, source_name=""):
@@ -52,71 +254,50 @@ def detect_glossary_section(text_content, source_name=""):
         # AI Essentials document has specific terms in the content, look for them
         # Rather than a traditional glossary, look for actual term-definition patterns
         # First, find the actual terms in the document
-        term_start_indices = []
+        start_idx = None
 
-        for i, line in enumerate(lines):
+        for i, line in enumerate(lines[:-1]):
             # Look for the specific pattern in AI Essentials: "TERM" on a line by itself followed by definition
-            if re.match(r'^[A-Z][A-Za-z\s\-]+$', line.strip()) and len(line.strip().split()) <= 4:
-                # Check if the next few lines look like a definition
-                if i + 1 < len(lines):
-                    next_line = lines[i + 1].strip()
-                    # If next line starts with the same term, it's likely a definition
-                    term = line.strip()
-                    if next_line.lower().startswith(term.lower()):
-                        term_start_indices.append(i)
-
-        if term_start_indices:
+            term = line.strip()
+            if _AI_TERM_LINE.match(term) and len(term.split()) <= 4:
+                # If next line starts with the same term, it's likely a definition
+                if lines[i + 1].strip().lower().startswith(term.lower()):
+                    start_idx = i
+                    break
+
+        if start_idx is not None:
             # If we found term patterns, extract from the first occurrence to the end
             # or until we hit a section that's clearly not a term/definition
-            start_idx = term_start_indices[0]
-
-            # Find a reasonable end point
             end_idx = len(lines)
             for i in range(start_idx, len(lines)):
-                line = lines[i].strip()
-                if 'bibliography' in line.lower() or 'references' in line.lower() or 'index' in line.lower():
+                if _AI_SECTION_END.search(lines[i].lower()):
                     end_idx = i
                     break
 
             return '\n'.join(lines[start_idx:end_idx])
 
-    # Try to find common glossary indicators for other documents
-    start_patterns = [
-        r'glossary', r'definitions', r'key terms', r'terms and definitions'
-    ]
-
-    end_patterns = [
-        r'bibliography', r'references', r'index', r'appendix', r'about the author'
-    ]
-
     start_line_idx = -1
     end_line_idx = len(lines)
 
     # Find start of glossary
     for i, line in enumerate(lines):
-        line_lower = line.lower().strip()
-        for pattern in start_patterns:
-            if re.search(pattern, line_lower):
-                start_line_idx = i
-                break
-        if start_line_idx != -1:
+        if _GLOSSARY_START.search(line.lower()):
+            start_line_idx = i
             break
 
     # If no clear start found, try looking for common term-definition patterns
     if start_line_idx == -1:
         for i, line in enumerate(lines):
             # Look for capitalized terms followed by definition patterns
-            if re.match(r'^[A-Z][A-Za-z\s\-\(\)&,®"]{2,100}\.\s+[A-Z]', line.strip()):
+            if _GLOSSARY_FIRST_TERM.match(line.strip()):
                 start_line_idx = i
                 break
 
-    # Find end of glossary
-    for i in range(start_line_idx + 1, len(lines)):
-        line_lower = lines[i].lower().strip()
-        for pattern in end_patterns:
-            if re.search(pattern, line_lower):
-                end_line_idx = i
-                break
+    # The glossary runs to the last end marker (bibliography, index, ...) after its start
+    for i in range(len(lines) - 1, start_line_idx, -1):
+        if _GLOSSARY_END.search(lines[i].lower()):
+            end_line_idx = i
+            break
 
     if start_line_idx != -1:
         return '\n'.join(lines[start_line_idx:end_line_idx])
@@ -126,230 +307,146 @@ def detect_glossary_section(text_content, source_name=""):
 
 
 def extract_terms_from_text(text_path, source_name=""):
-    """Extract terms and definitions from the text content."""
+    """Extract terms and definitions from a text file."""
     with open(text_path, 'r', encoding='utf-8') as f:
         content = f.read()
+    return extract_terms_from_content(content, source_name)
+
+
+def extract_terms_from_content(content, source_name=""):
+    """
+    Extract terms and definitions from the text content.
 
+    Every line is classified once, in a single pass, and fed to four small
+    state machines, one per glossary layout:
+
+    - traditional "Term. Definition" entries (continuation lines appended)
+    - AI Essentials "Term" lines followed by a definition that repeats the term
+    - caps/title-case header lines followed by definition lines
+    - single-line "Term is/are/means/refers to ..." and "Term: ..." phrases
+
+    The first layout that yields entries wins, in that order. Once a
+    traditional entry has been found, the other layouts can no longer win, so
+    they stop consuming lines.
+    """
     # Detect glossary section
     glossary_content = detect_glossary_section(content, source_name)
+    is_ai_essentials = 'ai_essentials' in source_name.lower()
+
+    entries = []          # "Term. Definition"
+    ai_entries = []       # AI Essentials
+    header_terms = []     # header line + definition lines
+    phrase_terms = []     # "Term is ..." / "Term: ..."
+
+    term, parts = None, []
+    ai_term, ai_lines, ai_candidate = None, None, None
+    header_term, header_lines = None, None
+    fallbacks = True
+
+    def finish_entry():
+        definition = ' '.join(parts)
+        if definition[-1:].isdigit():
+            definition = _TRAILING_PAGE_NUMBER.sub('', definition).strip()  # Remove trailing page numbers
+        if definition and not definition.startswith(("See ", "Also known as")):
+            entries.append((term, definition))
+
+    def finish_ai_entry():
+        definition = ' '.join(ai_lines)
+        # Skip the term at the beginning of the definition (it's already the term)
+        if definition.lower().startswith(ai_term.lower()):
+            definition = definition[len(ai_term):].strip()
+            if definition.startswith(('is', 'are', ':')):
+                definition = definition[definition.find(' ') + 1:].strip()
+        if len(definition) > 10:  # Ensure definition has substance
+            ai_entries.append((ai_term, definition))
+
+    def finish_header_term():
+        if not header_lines:
+            return
+        definition = ' '.join(header_lines)
+        if len(definition) > 20 and len(definition.split()) > 5:  # Ensure definition is substantial
+            if not definition.lower().startswith(_NON_DEFINITION_PREFIXES):
+                header_terms.append((header_term, definition))
+
+    for raw_line in glossary_content.split('\n'):
+        line = raw_line.strip()
+        is_header = fallbacks and _HEADER_LINE.match(line) is not None
+
+        # AI Essentials reads the raw lines: blank lines and artifacts end a definition
+        if fallbacks and is_ai_essentials:
+            if ai_lines is not None:
+                if is_header or line in _AI_STOP_LINES or line.isdigit() or _SECTION_WORDS.search(line.lower()):
+                    finish_ai_entry()
+                    ai_lines = None
+                elif line:
+                    ai_lines.append(line)
+            if ai_lines is None:
+                # A header line only starts a term if the next line repeats it
+                if ai_candidate is not None and line.lower().startswith(ai_candidate.lower()):
+                    ai_term, ai_lines = ai_candidate, [line]
+                    ai_candidate = None
+                else:
+                    ai_candidate = line if is_header else None
 
-    lines = glossary_content.split('\n')
-    clean_lines = []
-
-    for line in lines:
-        line = line.strip()
-        # Skip empty lines and common artifacts
-        if not line or line.isdigit() or re.match(r'^\d+\s+.*', line):
+        # Skip empty lines, page numbers and license text for the other layouts
+        if not line or line.isdigit() or _PAGE_NUMBER_LINE.match(line):
             continue
-        # Skip license text if present
         if 'PMI Member benefit' in line or 'Not for distribution' in line:
             continue
-        clean_lines.append(line)
-
-    # First, try to find traditional glossary format (Term. Definition)
-    entries = []
-    i = 0
-
-    # Look for traditional glossary format first
-    while i < len(clean_lines):
-        line = clean_lines[i]
-
-        # Look for a line that starts with a potential term definition (Term. Definition format)
-        term_pattern = r'^([A-Z][A-Za-z\'\-\s\(\)&,/®"]{2,100}?)\.\s*(.*)'
-        match = re.match(term_pattern, line)
 
+        match = _TERM_LINE.match(line)
         if match:
+            if term is not None:
+                finish_entry()
             term = match.group(1).strip()
-            definition = match.group(2).strip() if match.group(2).strip() else ""
-
-            # Look ahead for continuation of the definition
-            j = i + 1
-            while j < len(clean_lines):
-                next_line = clean_lines[j]
-
-                # Check if the next line starts a new term definition
-                next_match = re.match(r'^([A-Z][A-Za-z\'\-\s\(\)&,/®"]{2,100}?)\.\s*(.*)', next_line)
-                if next_match:
-                    break  # This is the start of the next term
-
-                # Skip cross-references
-                if next_line.startswith("Also known as") or next_line.startswith("See also") or next_line.startswith("Equivalent to"):
-                    j += 1
-                    continue
-
-                # Otherwise, this is part of the current definition
-                if next_line.strip():
-                    if definition:
-                        definition += " " + next_line.strip()
-                    else:
-                        definition = next_line.strip()
-
-                j += 1
-
-            # Clean up the definition
-            if definition:
-                definition = re.sub(r'\s+\d{3}\s*$', '', definition).strip()  # Remove trailing page numbers
-
-            # Add entry if it's a valid definition
-            if definition and not definition.startswith("See ") and not definition.startswith("Also known as"):
-                entries.append((term, definition))
-
-            i = j
-        else:
-            i += 1
-
-    # If we found traditional glossary entries, return them
-    if entries:
-        return entries
+            definition = match.group(2).strip()
+            parts = [definition] if definition else []
+        elif term is not None and not line.startswith(_CROSS_REFERENCES):
+            parts.append(line)
+
+        if entries:
+            # Traditional entries always win, so stop feeding the fallbacks
+            fallbacks = False
+        if not fallbacks:
+            continue
 
-    # Specific handling for AI Essentials document
-    if 'ai_essentials' in source_name.lower():
-        ai_entries = []
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-
-            # Look for the AI Essentials pattern: "TERM" on a line by itself followed by definition
-            # The term should be title case with capitalized first letters
-            if re.match(r'^[A-Z][A-Za-z\s\-()]{5,50}$', line.strip()):
-                term = line.strip()
-
-                # Check if the next line starts with the same term (confirming it's a definition)
-                if i + 1 < len(lines):
-                    next_line = lines[i+1].strip()
-                    if next_line.lower().startswith(term.lower()):
-                        # Found a valid term-definition pair
-                        definition_lines = [next_line]
-                        j = i + 2
-
-                        # Collect the rest of the definition
-                        while j < len(lines):
-                            next_line = lines[j].strip()
-
-                            # Stop if we hit another potential term or section header
-                            if re.match(r'^[A-Z][A-Za-z\s\-()]{5,50}$', next_line) or \
-                               next_line in ['', ' ', '©', 'PMI', 'AI Essentials for Project Professionals'] or \
-                               next_line.isdigit() or \
-                               any(skip_word in next_line.lower() for skip_word in
-                                   ['chapter', 'introduction', 'section', 'part', 'table', 'figure', 'appendix', 'index', 'bibliography']):
-                                break
-
-                            if next_line:
-                                definition_lines.append(next_line)
-                            j += 1
-
-                        definition = ' '.join(definition_lines)
-
-                        # Skip the term at the beginning of the definition (it's already the term)
-                        if definition.lower().startswith(term.lower()):
-                            definition = definition[len(term):].strip()
-                            if definition.startswith('is') or definition.startswith('are') or definition.startswith(':'):
-                                definition = definition[definition.find(' ') + 1:].strip()
-
-                        if len(definition) > 10:  # Ensure definition has substance
-                            ai_entries.append((term, definition))
-
-                        i = j
-                    else:
-                        i += 1
-                else:
-                    i += 1
+        if header_lines is not None:
+            if is_header or line.startswith(('©', 'AI Essentials', 'PMI')):
+                finish_header_term()
+                header_lines = None
             else:
-                i += 1
-
-        if ai_entries:
-            return ai_entries
-
-    # For other documents without clear glossary sections, apply more selective criteria
-    potential_terms = []
-
-    # Look for potential term-definition pairs in the content
-    # Pattern: Lines that look like terms followed by explanations
-    i = 0
-    while i < len(clean_lines):
-        line = clean_lines[i]
-
-        # Look for lines that are all caps or title case that might be terms
-        # But be more selective - check if the term has characteristics of an actual term
-        if re.match(r'^[A-Z][A-Z\s\-\(\)]{5,50}$', line.strip()) or \
-           re.match(r'^[A-Z][A-Za-z\s\-\(\)]{5,50}$', line.strip()):
-
-            # More selective: check if the term looks like an actual technical term
-            term_candidate = line.strip()
-
-            # Skip if it looks like a section header or other non-term
-            if any(skip_word in term_candidate.lower() for skip_word in
-                   ['chapter', 'introduction', 'section', 'part', 'table', 'figure', 'appendix', 'index', 'bibliography']):
-                i += 1
-                continue
-
-            # Look for following lines that could be the definition
-            j = i + 1
-            definition_lines = []
+                header_lines.append(line)
+        if header_lines is None and is_header and not _SECTION_WORDS.search(line.lower()):
+            header_term, header_lines = line, []
 
-            # Collect lines that form the definition
-            while j < len(clean_lines):
-                next_line = clean_lines[j].strip()
-
-                # Stop if we hit an empty line or another potential term
-                if not next_line or re.match(r'^[A-Z][A-Z\s\-\(\)]{5,50}$', next_line) or re.match(r'^[A-Z][A-Za-z\s\-\(\)]{5,50}$', next_line):
-                    break
-
-                # Stop if we hit a page number or other artifact
-                if next_line.isdigit() or next_line.startswith('©') or next_line.startswith('AI Essentials') or next_line.startswith('PMI'):
-                    break
-
-                # Add this line to definition
-                if next_line:
-                    definition_lines.append(next_line)
-
-                j += 1
-
-            # Join the definition lines
-            if definition_lines:
-                definition = ' '.join(definition_lines)
-                # Be more selective about what constitutes a good definition
-                if len(definition) > 20 and len(definition.split()) > 5:  # Ensure definition is substantial
-                    # Filter out definitions that start with common non-definition text
-                    if not any(definition.lower().startswith(prefix) for prefix in
-                              ['in this', 'as we', 'the purpose', 'to help', 'when', 'where', 'this section', 'the goal']):
-                        potential_terms.append((term_candidate, definition))
-
-            # Move i to j to continue from where we left off
-            i = j
-        else:
-            i += 1
-
-    # Look for patterns like "Term is/means definition" or "Term: definition"
-    for i, line in enumerate(clean_lines):
-        # Skip if it looks like a header or other non-content
-        if any(skip_word in line.lower() for skip_word in
-               ['chapter', 'introduction', 'section', 'table of contents', 'appendix', 'index', 'bibliography']):
+        line_lower = line.lower()
+        if _PHRASE_SKIP_WORDS.search(line_lower):
             continue
-
-        if re.match(r'^[A-Z][A-Za-z\s\-\'\"]{3,50}\s*(is|are|was|means|refers to)\s+', line, re.IGNORECASE):
-            parts = re.split(r'\s+(is|are|was|means|refers to)\s+', line, maxsplit=1, flags=re.IGNORECASE)
-            if len(parts) >= 3:
-                term = parts[0].strip()
-                definition = parts[2].strip()
-                if len(definition) > 10 and len(definition.split()) > 3:  # Ensure definition is substantial
-                    potential_terms.append((term, definition))
-
-        # Look for "Term:" pattern
-        elif re.match(r'^[A-Z][A-Za-z\s\-\'\"]{3,50}:', line):
-            parts = line.split(':', 1)
-            if len(parts) == 2:
-                term = parts[0].strip()
-                definition = parts[1].strip()
+        if _IS_DEFINITION.match(line):
+            split = _IS_DEFINITION_SPLIT.split(line, maxsplit=1)
+            if len(split) >= 3:
+                definition = split[2].strip()
                 if len(definition) > 10 and len(definition.split()) > 3:  # Ensure definition is substantial
-                    potential_terms.append((term, definition))
+                    phrase_terms.append((split[0].strip(), definition))
+        elif _COLON_DEFINITION.match(line):
+            phrase_term, definition = line.split(':', 1)
+            definition = definition.strip()
+            if len(definition) > 10 and len(definition.split()) > 3:  # Ensure definition is substantial
+                phrase_terms.append((phrase_term.strip(), definition))
+
+    if term is not None:
+        finish_entry()
+    if entries:
+        return entries
 
-    # If we found potential terms from these patterns, return them
-    if potential_terms:
-        return potential_terms
+    if ai_lines is not None:
+        finish_ai_entry()
+    if ai_entries:
+        return ai_entries
 
-    # If no good terms found, return empty list
-    return []
+    if header_lines is not None:
+        finish_header_term()
+    return header_terms + phrase_terms
 
 
 def create_flashcards_in_project_format(terms_list, source_name="PDF"):
@@ -386,24 +483,24 @@ def create_flashcards_in_project_format(terms_list, source_name="PDF"):
     return flashcards
 
 
-def process_pdf_to_flashcards(pdf_path, output_path=None):
+def process_pdf_to_flashcards(pdf_path, output_path=None, text_mode='layout', cache=None):
     """Main function to process a PDF file into flashcards."""
     print(f"Processing PDF: {pdf_path}")
 
-    # Extract text from PDF
-    text_path = extract_text_from_pdf(pdf_path)
-    if not text_path or not text_path.exists():
-        print("Could not extract text from PDF. Attempting alternative method...")
-        # If pdftotext fails, we could try other methods here
-        return []
-
-    print(f"Text extracted to: {text_path}")
-
     # Create source name for detection purposes
     source_name = pdf_path.stem.replace(' ', '_').replace('-', '_')
 
+    # Extract text from the glossary pages of the PDF. AI Essentials defines its
+    # terms in the body, so detect_glossary_section scans the whole document
+    content = extract_glossary_text(pdf_path, text_mode, cache, locate='ai_essentials' not in source_name.lower())
+    if not content:
+        print("Could not extract text from PDF.")
+        return []
+
+    print(f"Extracted {len(content)} characters ({text_mode} mode)")
+
     # Extract terms and definitions
-    terms = extract_terms_from_text(text_path, source_name)
+    terms = extract_terms_from_content(content, source_name)
     print(f"Extracted {len(terms)} terms from the PDF")
 
     # Create flashcards in project format
@@ -411,14 +508,55 @@ def process_pdf_to_flashcards(pdf_path, output_path=None):
 
     print(f"Created {len(flashcards)} flashcards in project format")
 
-    # Clean up temporary text file
-    if text_path and text_path.exists():
-        text_path.unlink()
-        print(f"Cleaned up temporary text file: {text_path}")
-
     return flashcards
 
 
+def _process_pdf_captured(pdf_path, text_mode, cache=None):
+    """Process one PDF in a worker, returning its flashcards and captured log output."""
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        try:
+            flashcards = process_pdf_to_flashcards(pdf_path, text_mode=text_mode, cache=cache)
+        except Exception as e:
+            print(f"Error processing {pdf_path}: {e}")
+            flashcards = []
+    return flashcards, log.getvalue()
+
+
+def process_pdfs_to_flashcards(pdf_paths, text_mode='layout', jobs=None, cache=None):
+    """
+    Process several PDFs, in parallel worker processes when jobs > 1.
+
+    Returns the new flashcards in the order of pdf_paths, so the merged output
+    does not depend on which worker finishes first.
+    """
+    pdf_paths = list(pdf_paths)
+    jobs = min(jobs or os.cpu_count() or 1, len(pdf_paths))
+    if jobs <= 1:
+        results = (_process_pdf_captured(pdf_path, text_mode, cache) for pdf_path in pdf_paths)
+        executor = None
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        results = executor.map(_process_pdf_captured, pdf_paths, [text_mode] * len(pdf_paths), [cache] * len(pdf_paths))
+
+    all_flashcards = []
+    try:
+        for pdf_path, (flashcards, log) in zip(pdf_paths, results):
+            print(log, end='')
+            if not flashcards:
+                print(f"⚠️  No flashcards generated from {pdf_path.name}")
+            all_flashcards.extend(flashcards)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return all_flashcards
+
+
+def collect_pdfs(directory):
+    """Return the PDFs directly inside a directory, sorted by name."""
+    return sorted(path for path in directory.iterdir() if path.is_file() and path.suffix.lower() == '.pdf')
+
+
 def load_existing_flashcards(flashcards_path):
     """Load existing flashcards from the project."""
     if flashcards_path.exists():
@@ -427,20 +565,78 @@ def load_existing_flashcards(flashcards_path):
     return []
 
 
-def save_flashcards(flashcards, flashcards_path):
-    """Save flashcards to the project file."""
-    with open(flashcards_path, 'w', encoding='utf-8') as f:
-        json.dump(flashcards, f, indent=2)
+def normalize_term(term):
+    """Case- and punctuation-insensitive form of a term, used to spot the same card twice."""
+    return ' '.join(re.sub(r'[^\w]+', ' ', term).lower().split())
+
+
+def _card_key(card):
+    term = card.get('original_term')
+    if term is None:
+        match = re.match(r'^What is (?:an? |the )?(.*?)\?$', card.get('front', ''))
+        term = match.group(1) if match else card.get('front', '')
+    return card.get('category'), normalize_term(term)
 
 
-def main(pdf_path_str, project_root=None):
+def merge_flashcards(existing_flashcards, new_flashcards):
+    """
+    Upsert new flashcards into the existing list.
+
+    Existing cards are indexed by id and by (category, normalized term). A new
+    card that matches an existing term replaces that card in place and keeps
+    its id. Otherwise it is appended, with a suffixed id if its generated id
+    already belongs to a different card.
+
+    Returns (merged_flashcards, {'added': n, 'updated': n, 'unchanged': n}).
+    """
+    merged = list(existing_flashcards)
+    by_id = {card.get('id'): index for index, card in enumerate(merged)}
+    by_term = {_card_key(card): index for index, card in enumerate(merged)}
+    stats = {'added': 0, 'updated': 0, 'unchanged': 0}
+
+    for card in new_flashcards:
+        key = _card_key(card)
+        index = by_term.get(key)
+        if index is not None:
+            current = merged[index]
+            updated = {**current, **card, 'id': current.get('id')}
+            if updated == current:
+                stats['unchanged'] += 1
+            else:
+                merged[index] = updated
+                stats['updated'] += 1
+            continue
+
+        card_id = card.get('id')
+        if card_id in by_id:
+            suffix = 2
+            while f'{card_id}-{suffix}' in by_id:
+                suffix += 1
+            card = {**card, 'id': f'{card_id}-{suffix}'}
+        by_id[card['id']] = by_term[key] = len(merged)
+        merged.append(card)
+        stats['added'] += 1
+
+    return merged, stats
+
+
+def save_flashcards(flashcards, flashcards_path, compact=False):
+    """Save flashcards to the project file, replacing it atomically so the app never imports a partial file."""
+    write_json_atomic(flashcards_path, flashcards, compact=compact)
+
+
+def main(pdf_path_str, project_root=None, text_mode='layout', jobs=None, use_cache=True, compact=False):
     """
     Main entry point for the PDF to flashcards agent.
 
     Args:
-        pdf_path_str (str): Path to the PDF file to process
+        pdf_path_str (str): Path to the PDF file to process, or a directory of PDFs
         project_root (str, optional): Path to the project root directory.
                                     If None, will be inferred from PDF location.
+        text_mode (str, optional): Extraction mode, one of TEXT_MODES (default: 'layout').
+        jobs (int, optional): Worker processes for directory mode (default: CPU count).
+        use_cache (bool, optional): Read/write page text through the shared PageTextCache.
+        compact (bool, optional): Write flashcards.json without indentation.
 
     Returns:
         int: Exit code (0 for success, 1 for error)
@@ -451,9 +647,17 @@ def main(pdf_path_str, project_root=None):
         print(f"Error: PDF file does not exist: {pdf_path}")
         return 1
 
+    if pdf_path.is_dir():
+        pdf_paths = collect_pdfs(pdf_path)
+        if not pdf_paths:
+            print(f"Error: No PDF files found in {pdf_path}")
+            return 1
+    else:
+        pdf_paths = [pdf_path]
+
     # Determine project root
     if project_root is None:
-        project_root = pdf_path.parent.parent  # Go up two levels from references
+        project_root = pdf_paths[0].parent.parent  # Go up two levels from references
 
     # Define the flashcards file path
     flashcards_path = project_root / 'src' / 'data' / 'flashcards.json'
@@ -461,8 +665,15 @@ def main(pdf_path_str, project_root=None):
     print(f"Project root: {project_root}")
     print(f"Flashcards will be saved to: {flashcards_path}")
 
-    # Process the PDF to generate flashcards
-    new_flashcards = process_pdf_to_flashcards(pdf_path)
+    # Process the PDF(s) to generate flashcards
+    cache = PageTextCache() if use_cache and text_mode != 'pdftotext' else None
+    if len(pdf_paths) == 1:
+        new_flashcards = process_pdf_to_flashcards(pdf_paths[0], text_mode=text_mode, cache=cache)
+    else:
+        print(f"Processing {len(pdf_paths)} PDFs from {pdf_path}")
+        new_flashcards = process_pdfs_to_flashcards(pdf_paths, text_mode=text_mode, jobs=jobs, cache=cache)
+    if cache is not None:
+        cache.close()
 
     if not new_flashcards:
         print("No flashcards were generated from the PDF.")
@@ -472,25 +683,38 @@ def main(pdf_path_str, project_root=None):
     existing_flashcards = load_existing_flashcards(flashcards_path)
     print(f"Loaded {len(existing_flashcards)} existing flashcards")
 
-    # Combine existing and new flashcards
-    all_flashcards = existing_flashcards + new_flashcards
-    print(f"Total flashcards after combining: {len(all_flashcards)}")
+    # Upsert new flashcards by id / normalized term instead of appending duplicates
+    all_flashcards, stats = merge_flashcards(existing_flashcards, new_flashcards)
+    print(f"Merged flashcards: {stats['added']} added, {stats['updated']} updated, "
+          f"{stats['unchanged']} unchanged ({len(all_flashcards)} total)")
+
+    if not stats['added'] and not stats['updated']:
+        print(f"✓ {flashcards_path} is already up to date; not rewriting it")
+        return 0
 
     # Save all flashcards to the project file
-    save_flashcards(all_flashcards, flashcards_path)
+    save_flashcards(all_flashcards, flashcards_path, compact=compact)
     print(f"Successfully saved {len(all_flashcards)} flashcards to {flashcards_path}")
 
     return 0
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python pdf_to_flashcards_agent.py <pdf_path> [project_root]")
-        print("Example: python pdf_to_flashcards_agent.py '/path/to/references/my_pdf.pdf'")
-        sys.exit(1)
-    
-    pdf_path = sys.argv[1]
-    project_root = sys.argv[2] if len(sys.argv) > 2 else None
-    
-    exit_code = main(pdf_path, project_root)
-    sys.exit(exit_code)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Extract glossary terms from a PDF into src/data/flashcards.json.")
+    parser.add_argument("pdf_path", help="Path to a PDF file or a directory of PDFs, e.g. references/my_pdf.pdf")
+    parser.add_argument("project_root", nargs="?", default=None, help="Project root (default: two levels above the PDF)")
+    parser.add_argument("--text-mode", choices=TEXT_MODES, default="layout",
+                        help="Text extraction mode (default: layout)")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Worker processes when pdf_path is a directory (default: CPU count)")
+    parser.add_argument("--no-text-cache", action="store_true",
+                        help="Re-extract page text instead of using the shared .cache/page-text cache")
+    parser.add_argument("--compact", action="store_true",
+                        help="Write flashcards.json without indentation (smaller, faster to write and parse)")
+    args = parser.parse_args()
+
+    project_root = Path(args.project_root) if args.project_root else None
+
+    exit_code = main(args.pdf_path, project_root, text_mode=args.text_mode, jobs=args.jobs,
+                     use_cache=not args.no_text_cache, compact=args.compact)
+    sys.exit(exit_code)
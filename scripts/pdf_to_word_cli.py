@@ -1,10 +1,18 @@
 #!/usr/bin/env python3
 import argparse
+import os
+import queue
+import signal
 import subprocess
 import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import shutil
 
+from conversion_manifest import ConversionManifest
+
 
 def find_soffice(explicit_path: str | None = None) -> str:
     """
@@ -37,20 +45,65 @@ def find_soffice(explicit_path: str | None = None) -> str:
     )
 
 
+def log(message: str, file=None) -> None:
+    """Print a message with one write, so lines from pool threads don't interleave."""
+    (file or sys.stdout).write(f"{message}\n")
+
+
+def run_with_timeout(cmd: list[str], timeout: float | None) -> subprocess.CompletedProcess:
+    """
+    Run a command, killing its whole process group if it exceeds the timeout.
+
+    soffice forks soffice.bin, so killing only the launcher would leave the
+    office process running and holding its profile.
+    """
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        start_new_session=(os.name == "posix"),
+    )
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        if os.name == "posix":
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+        proc.communicate()
+        raise
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
+
 def convert_single_pdf(
     input_pdf: Path,
     output_dir: Path,
     soffice_path: str,
+    profile_dir: Path | None = None,
+    timeout: float | None = None,
+    manifest: ConversionManifest | None = None,
+    force: bool = False,
 ) -> Path:
     """
     Convert a single PDF to DOCX using LibreOffice.
 
+    profile_dir gives the office instance its own user profile
+    (-env:UserInstallation), so concurrent conversions don't lock each other.
+    timeout (seconds) aborts a conversion that hangs. With a manifest, a DOCX
+    that is up to date with its PDF is kept as is unless force is set.
+
     Returns the path to the output DOCX.
     """
     input_pdf = input_pdf.resolve()
     if not input_pdf.is_file():
         raise FileNotFoundError(f"Input PDF not found: {input_pdf}")
 
+    output_docx = output_dir / f"{input_pdf.stem}.docx"
+    if manifest is not None and not force and manifest.is_up_to_date(input_pdf, output_docx):
+        log(f"[SKIP] {input_pdf.name} (up to date)")
+        return output_docx
+
     output_dir.mkdir(parents=True, exist_ok=True)
 
     # Use an explicit filter for DOCX (MS Word 2007 XML)
@@ -63,19 +116,19 @@ def convert_single_pdf(
         str(output_dir),
         str(input_pdf),
     ]
+    if profile_dir is not None:
+        cmd.insert(1, f"-env:UserInstallation={profile_dir.resolve().as_uri()}")
 
-    result = subprocess.run(
-        cmd,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-    )
+    try:
+        result = run_with_timeout(cmd, timeout)
+    except subprocess.TimeoutExpired:
+        raise TimeoutError(f"Conversion of {input_pdf.name} timed out after {timeout:g}s") from None
 
     # Always show what LibreOffice said when debugging
     if result.stdout.strip():
-        print(f"[soffice STDOUT] for {input_pdf.name}:\n{result.stdout}")
+        log(f"[soffice STDOUT] for {input_pdf.name}:\n{result.stdout}")
     if result.stderr.strip():
-        print(f"[soffice STDERR] for {input_pdf.name}:\n{result.stderr}", file=sys.stderr)
+        log(f"[soffice STDERR] for {input_pdf.name}:\n{result.stderr}", file=sys.stderr)
 
     if result.returncode != 0:
         raise RuntimeError(
@@ -85,7 +138,6 @@ def convert_single_pdf(
         )
 
     # Look for the expected DOCX
-    output_docx = output_dir / f"{input_pdf.stem}.docx"
     if not output_docx.is_file():
         raise FileNotFoundError(
             f"Expected output DOCX not found after conversion: {output_docx}\n"
@@ -93,6 +145,8 @@ def convert_single_pdf(
             "LibreOffice may have produced a different file type or encountered a hidden error."
         )
 
+    if manifest is not None:
+        manifest.record(input_pdf, output_docx)
     return output_docx
 
 
@@ -107,6 +161,58 @@ def collect_pdfs(root: Path, recursive: bool) -> list[Path]:
         return sorted(p for p in root.glob("*.pdf") if p.is_file())
 
 
+def convert_many(
+    jobs: list[tuple[Path, Path]],
+    soffice_path: str,
+    workers: int,
+    timeout: float | None,
+    profile_root: Path,
+    manifest: ConversionManifest | None = None,
+    force: bool = False,
+) -> list[tuple[Path, Path | None, str | None, float]]:
+    """
+    Convert (pdf, out_dir) pairs on a pool of `workers` concurrent soffice processes.
+
+    Every pool slot owns one user profile under profile_root, handed out through
+    a queue, so no two running instances share a profile. Results are returned
+    in input order as (pdf, docx_or_none, error_or_none, seconds).
+    """
+    profiles: queue.Queue[Path] = queue.Queue()
+    for slot in range(workers):
+        profile_dir = profile_root / f"worker-{slot}"
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        profiles.put(profile_dir)
+
+    def convert(job: tuple[Path, Path]) -> tuple[Path, Path | None, str | None, float]:
+        pdf, out_dir = job
+        profile_dir = profiles.get()
+        started = time.perf_counter()
+        try:
+            docx = convert_single_pdf(pdf, out_dir, soffice_path, profile_dir, timeout, manifest, force)
+            return pdf, docx, None, time.perf_counter() - started
+        except Exception as e:
+            return pdf, None, str(e), time.perf_counter() - started
+        finally:
+            profiles.put(profile_dir)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(convert, jobs))
+
+
+def print_summary(converted: list[tuple[Path, Path | None, str | None, float]], wall_seconds: float) -> None:
+    """Print per-file durations (slowest first) and overall throughput."""
+    total = sum(seconds for *_, seconds in converted)
+    ok = sum(1 for _, _, error, _ in converted if error is None)
+    print(f"\nDurations ({ok}/{len(converted)} converted):")
+    for pdf, _, error, seconds in sorted(converted, key=lambda row: row[3], reverse=True):
+        status = "OK  " if error is None else "FAIL"
+        print(f"  {seconds:8.1f}s  {status}  {pdf.name}")
+    if total >= 1.0 and wall_seconds > 0:
+        print(f"  {wall_seconds:8.1f}s  wall clock ({total:.1f}s of conversions, {total / wall_seconds:.1f}x parallel speedup)")
+    else:
+        print(f"  {wall_seconds:8.1f}s  wall clock")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Convert PDF to Word (DOCX) using LibreOffice headless."
@@ -132,6 +238,34 @@ def main() -> None:
         "--soffice",
         help="Optional explicit path to the 'soffice' binary.",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Concurrent LibreOffice conversions in directory mode (default: 1).",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Seconds after which a single conversion is killed and reported as failed.",
+    )
+    parser.add_argument(
+        "--profile-dir",
+        help="Directory for the per-worker LibreOffice profiles used with --jobs > 1. "
+             "Reusing it across runs skips profile initialisation. Default: a temporary directory.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Convert every PDF, even when its DOCX is up to date.",
+    )
+    parser.add_argument(
+        "--hash",
+        action="store_true",
+        help="Also compare source content hashes, so PDFs whose mtime changed but bytes did not are skipped.",
+    )
 
     args = parser.parse_args()
 
@@ -155,47 +289,71 @@ def main() -> None:
         # Default: same folder as source if file, or the folder itself if directory
         base_out_dir = source_path.parent if source_path.is_file() else source_path
 
-    converted: list[tuple[Path, Path | None, str | None]] = []  # (pdf, docx_or_none, error_or_none)
-
-    if source_path.is_file():
-        if source_path.suffix.lower() != ".pdf":
-            print(f"Source is a file but not a PDF: {source_path}", file=sys.stderr)
-            sys.exit(1)
-
-        try:
-            out_docx = convert_single_pdf(source_path, base_out_dir, soffice_path)
-            converted.append((source_path, out_docx, None))
-        except Exception as e:
-            converted.append((source_path, None, str(e)))
+    converted: list[tuple[Path, Path | None, str | None, float]] = []  # (pdf, docx_or_none, error_or_none, seconds)
+    manifest = ConversionManifest(base_out_dir, use_hash=args.hash)
+    started = time.perf_counter()
 
-    else:
-        # Directory mode
-        pdfs = collect_pdfs(source_path, args.recursive)
-        if not pdfs:
-            print("No PDF files found.", file=sys.stderr)
-            sys.exit(1)
-
-        for pdf in pdfs:
-            # Keep the relative structure when recursive
-            if args.recursive:
-                rel_parent = pdf.parent.relative_to(source_path)
-                out_dir = base_out_dir / rel_parent
-            else:
-                out_dir = base_out_dir
+    # Record finished conversions even if the run is interrupted (Ctrl-C) or a worker raises
+    try:
+        if source_path.is_file():
+            if source_path.suffix.lower() != ".pdf":
+                print(f"Source is a file but not a PDF: {source_path}", file=sys.stderr)
+                sys.exit(1)
 
             try:
-                out_docx = convert_single_pdf(pdf, out_dir, soffice_path)
-                converted.append((pdf, out_docx, None))
+                out_docx = convert_single_pdf(
+                    source_path, base_out_dir, soffice_path, timeout=args.timeout, manifest=manifest, force=args.force
+                )
+                converted.append((source_path, out_docx, None, time.perf_counter() - started))
             except Exception as e:
-                converted.append((pdf, None, str(e)))
+                converted.append((source_path, None, str(e), time.perf_counter() - started))
+
+        else:
+            # Directory mode
+            pdfs = collect_pdfs(source_path, args.recursive)
+            if not pdfs:
+                print("No PDF files found.", file=sys.stderr)
+                sys.exit(1)
+
+            jobs: list[tuple[Path, Path]] = []
+            for pdf in pdfs:
+                # Keep the relative structure when recursive
+                if args.recursive:
+                    rel_parent = pdf.parent.relative_to(source_path)
+                    out_dir = base_out_dir / rel_parent
+                else:
+                    out_dir = base_out_dir
+                jobs.append((pdf, out_dir))
+
+            workers = max(1, min(args.jobs, len(jobs)))
+            if workers == 1:
+                for pdf, out_dir in jobs:
+                    file_started = time.perf_counter()
+                    try:
+                        out_docx = convert_single_pdf(
+                            pdf, out_dir, soffice_path, timeout=args.timeout, manifest=manifest, force=args.force
+                        )
+                        converted.append((pdf, out_docx, None, time.perf_counter() - file_started))
+                    except Exception as e:
+                        converted.append((pdf, None, str(e), time.perf_counter() - file_started))
+            elif args.profile_dir:
+                profile_root = Path(args.profile_dir).expanduser().resolve()
+                converted = convert_many(jobs, soffice_path, workers, args.timeout, profile_root, manifest, args.force)
+            else:
+                with tempfile.TemporaryDirectory(prefix="soffice-profiles-") as profile_root:
+                    converted = convert_many(jobs, soffice_path, workers, args.timeout, Path(profile_root), manifest, args.force)
+    finally:
+        manifest.save()
 
     # Report results
-    for pdf, docx, error in converted:
+    for pdf, docx, error, _ in converted:
         if error is None:
             print(f"[OK] {pdf} -> {docx}")
         else:
             print(f"[FAIL] {pdf}\n       {error}", file=sys.stderr)
 
+    print_summary(converted, time.perf_counter() - started)
+
 
 if __name__ == "__main__":
     main()
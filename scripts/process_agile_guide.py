@@ -3,7 +3,7 @@
 Script to process AgilePracticeGuide.txt and remove lines that only contain numbers.
 """
 
-import os
+from atomic_write import atomic_write
 
 def remove_number_lines(input_file, output_file):
     """
@@ -24,18 +24,14 @@ def remove_number_lines(input_file, output_file):
             filtered_lines.append(line)
 
     # Write the filtered content to the output file
-    with open(output_file, 'w', encoding='utf-8') as outfile:
+    with atomic_write(output_file) as outfile:
         outfile.writelines(filtered_lines)
 
 def main():
     input_file = "/Users/dustinober/Projects/PMP_Practice_Static/data/txt/AgilePracticeGuide.txt"
-    temp_output_file = "/Users/dustinober/Projects/PMP_Practice_Static/data/txt/AgilePracticeGuide.txt.tmp"
     
     # Process the file to remove number-only lines
-    remove_number_lines(input_file, temp_output_file)
-    
-    # Replace the original file with the processed one
-    os.replace(temp_output_file, input_file)
+    remove_number_lines(input_file, input_file)
     
     print(f"Processed {input_file} and removed lines that only contained numbers.")
 
@@ -4,9 +4,10 @@ Script to process AgilePracticeGuide.md and properly separate combined definitio
 and ensure each definition has a bullet point.
 """
 
-import os
 import re
 
+from atomic_write import atomic_write
+
 def fix_definitions(input_file, output_file):
     """
     Process the input file to properly separate combined definitions and add bullet points.
@@ -20,18 +21,14 @@ def fix_definitions(input_file, output_file):
     separated_content = re.sub(r'(\. )([A-Z][^.]*?\.)', r'.\n- \2', content)
 
     # Write the processed content to the output file
-    with open(output_file, 'w', encoding='utf-8') as outfile:
+    with atomic_write(output_file) as outfile:
         outfile.write(separated_content)
 
 def main():
     input_file = "/Users/dustinober/Projects/PMP_Practice_Static/data/txt/AgilePracticeGuide.md"
-    temp_output_file = "/Users/dustinober/Projects/PMP_Practice_Static/data/txt/AgilePracticeGuide.md.tmp"
     
     # Process the file to separate combined entries
-    fix_definitions(input_file, temp_output_file)
-    
-    # Replace the original file with the processed one
-    os.replace(temp_output_file, input_file)
+    fix_definitions(input_file, input_file)
     
     print(f"Processed {input_file} to separate combined entries.")
 
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Approximate nearest-neighbour (IVF) index for the reference vectors.
+
+The index clusters the L2-normalized vectors with spherical k-means into
+``n_lists`` inverted lists. A query scores the centroids, then only the rows of
+the ``n_probe`` closest lists, so search cost drops from O(rows) to roughly
+O(n_lists + rows * n_probe / n_lists). Pure NumPy, so it builds offline.
+
+Serialized next to the vector store as:
+- ``ann-ivf.json``            manifest (dim, list offsets, build parameters and a
+                              digest of the store file it was built from)
+- ``ann-ivf.centroids.bin``   float32 little-endian (n_lists, dim)
+- ``ann-ivf.rows.bin``        int32 little-endian store row numbers grouped by list
+
+Usage:
+  python scripts/vector_ann.py build --lists 64
+  python scripts/vector_ann.py report --k 10 --probes 1,2,4,8,16
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from atomic_write import write_bytes_atomic, write_json_atomic
+from vector_search import VECTOR_DIR, VectorSearchIndex, load_vectors, normalize_rows, store_path
+
+ANN_MANIFEST = 'ann-ivf.json'
+ANN_FORMAT = 'pmp-ivf-index'
+ANN_VERSION = 2
+
+
+def store_digest(path):
+    """SHA-256 of a store file (manifest or embeddings.json), which changes with every rebuild."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def default_list_count(rows):
+    return max(1, int(round(np.sqrt(rows))))
+
+
+def spherical_kmeans(vectors, n_lists, iterations=20, seed=0, block=8192):
+    """Cluster unit vectors by cosine similarity. Returns (centroids, assignments)."""
+    rng = np.random.default_rng(seed)
+    n_lists = min(n_lists, len(vectors))
+    centroids = vectors[rng.choice(len(vectors), size=n_lists, replace=False)].copy()
+    assignments = np.zeros(len(vectors), dtype=np.int64)
+
+    for _ in range(iterations):
+        for start in range(0, len(vectors), block):
+            assignments[start:start + block] = np.argmax(vectors[start:start + block] @ centroids.T, axis=1)
+
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, vectors)
+        counts = np.bincount(assignments, minlength=n_lists)
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            sums[empty] = vectors[rng.choice(len(vectors), size=len(empty), replace=False)]
+        new_centroids = normalize_rows(sums)
+        if np.allclose(new_centroids, centroids, atol=1e-6):
+            centroids = new_centroids
+            break
+        centroids = new_centroids
+
+    for start in range(0, len(vectors), block):
+        assignments[start:start + block] = np.argmax(vectors[start:start + block] @ centroids.T, axis=1)
+    return centroids.astype(np.float32), assignments
+
+
+class IVFIndex:
+    """Inverted-file index over a normalized vector matrix."""
+
+    def __init__(self, vectors, centroids, rows, offsets, params=None):
+        self.vectors = vectors
+        self.centroids = centroids
+        self.rows = rows
+        self.offsets = offsets
+        self.params = params or {}
+        # Rows re-ordered by list, so probing a list reads one contiguous block
+        self._grouped = vectors[rows]
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, vectors, n_lists=None, iterations=20, seed=0):
+        vectors = normalize_rows(vectors)
+        n_lists = n_lists or default_list_count(len(vectors))
+        centroids, assignments = spherical_kmeans(vectors, n_lists, iterations, seed)
+        rows = np.argsort(assignments, kind='stable').astype(np.int32)
+        counts = np.bincount(assignments, minlength=len(centroids))
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        params = {'nLists': int(len(centroids)), 'iterations': iterations, 'seed': seed}
+        return cls(vectors, centroids, rows, offsets, params)
+
+    def search(self, queries, k=5, n_probe=4):
+        """Return, per query, ``(row, score)`` tuples for the approximate top ``k``."""
+        query_matrix = normalize_rows(queries)
+        n_probe = min(n_probe, self.n_lists)
+        centroid_scores = query_matrix @ self.centroids.T
+        probes = np.argpartition(-centroid_scores, n_probe - 1, axis=1)[:, :n_probe]
+
+        results = []
+        for query, lists in zip(query_matrix, probes):
+            spans = [(self.offsets[lst], self.offsets[lst + 1]) for lst in lists]
+            candidates = np.concatenate([self._grouped[start:end] for start, end in spans])
+            candidate_rows = np.concatenate([self.rows[start:end] for start, end in spans])
+            if len(candidates) == 0:
+                results.append([])
+                continue
+            scores = candidates @ query
+            top_k = min(k, len(scores))
+            top = np.argpartition(-scores, top_k - 1)[:top_k]
+            top = top[np.argsort(-scores[top])]
+            results.append([(int(candidate_rows[i]), float(scores[i])) for i in top])
+        return results
+
+    def save(self, out_dir, store_manifest=None):
+        """Write the index to ``out_dir``, fingerprinting ``store_manifest`` (a file name in ``out_dir``)."""
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        write_bytes_atomic(out_dir / 'ann-ivf.centroids.bin', self.centroids.astype('<f4').tobytes())
+        write_bytes_atomic(out_dir / 'ann-ivf.rows.bin', self.rows.astype('<i4').tobytes())
+        manifest = {
+            'format': ANN_FORMAT,
+            'version': ANN_VERSION,
+            'dim': int(self.centroids.shape[1]),
+            'rows': int(len(self.rows)),
+            'nLists': self.n_lists,
+            'offsets': [int(offset) for offset in self.offsets],
+            'centroidsFile': 'ann-ivf.centroids.bin',
+            'rowsFile': 'ann-ivf.rows.bin',
+            'store': store_manifest,
+            'storeDigest': store_digest(out_dir / store_manifest) if store_manifest else None,
+            'params': self.params
+        }
+        path = out_dir / ANN_MANIFEST
+        write_json_atomic(path, manifest, indent=None)
+        return path
+
+    @classmethod
+    def load(cls, out_dir, vectors):
+        """Load the index for ``vectors``, refusing one built from another version of the store."""
+        out_dir = Path(out_dir)
+        manifest = json.loads((out_dir / ANN_MANIFEST).read_text(encoding='utf-8'))
+        if manifest.get('format') != ANN_FORMAT:
+            raise ValueError(f'{out_dir / ANN_MANIFEST} is not an {ANN_FORMAT} manifest')
+        store = manifest.get('store')
+        if manifest.get('version') != ANN_VERSION or not manifest.get('storeDigest'):
+            raise ValueError('ANN index does not record which store it was built from; rebuild it')
+        if not (out_dir / store).exists() or store_digest(out_dir / store) != manifest['storeDigest']:
+            raise ValueError(f'ANN index was built from an earlier {store}; rebuild it')
+        centroids = np.fromfile(out_dir / manifest['centroidsFile'], dtype='<f4').reshape(manifest['nLists'], manifest['dim'])
+        rows = np.fromfile(out_dir / manifest['rowsFile'], dtype='<i4')
+        if len(rows) != len(vectors):
+            raise ValueError(f'ANN index covers {len(rows)} rows but the store has {len(vectors)}; rebuild it')
+        return cls(normalize_rows(vectors), centroids, rows, np.array(manifest['offsets'], dtype=np.int64), manifest['params'])
+
+
+def build_and_save(out_dir, ids, matrix, n_lists=None, store_manifest=None):
+    """Build an IVF index for ``matrix`` and write it to ``out_dir``. Returns the manifest path."""
+    started = time.perf_counter()
+    index = IVFIndex.build(matrix, n_lists)
+    path = index.save(out_dir, store_manifest)
+    print(f'  ✓ Wrote {path} ({index.n_lists} lists over {len(ids)} vectors in {time.perf_counter() - started:.1f}s)')
+    return path
+
+
+def sample_queries(vectors, count, noise=0.05, seed=1):
+    """Perturbed corpus rows stand in for real queries when none are supplied."""
+    rng = np.random.default_rng(seed)
+    picks = vectors[rng.choice(len(vectors), size=min(count, len(vectors)), replace=False)]
+    return normalize_rows(picks + rng.normal(scale=noise, size=picks.shape).astype(np.float32))
+
+
+def recall_report(exact, ivf, queries, k, probes):
+    """Measure recall@k and per-query latency of IVF search against exact search."""
+    started = time.perf_counter()
+    truth = exact.search(queries, k=k)
+    exact_ms = (time.perf_counter() - started) * 1000 / len(queries)
+    truth_sets = [{row for row, _ in hits} for hits in truth]
+
+    report = [{'nProbe': None, 'recall': 1.0, 'msPerQuery': exact_ms, 'speedup': 1.0}]
+    for n_probe in probes:
+        started = time.perf_counter()
+        approx = ivf.search(queries, k=k, n_probe=n_probe)
+        ms = (time.perf_counter() - started) * 1000 / len(queries)
+        recall = np.mean([len(truth_set & {row for row, _ in hits}) / max(1, len(truth_set))
+                          for truth_set, hits in zip(truth_sets, approx)])
+        report.append({'nProbe': n_probe, 'recall': float(recall), 'msPerQuery': ms,
+                       'speedup': exact_ms / ms if ms > 0 else float('inf')})
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build and evaluate an IVF ANN index over the vector store.')
+    parser.add_argument('command', choices=['build', 'report'], help='build: write the index; report: recall@k vs. latency')
+    parser.add_argument('--vectors', type=Path, default=VECTOR_DIR, help='Vector store directory (default: src/data/vectors)')
+    parser.add_argument('--lists', type=int, default=None, help='Inverted lists (default: sqrt(rows))')
+    parser.add_argument('--k', type=int, default=10, help='Neighbours per query for the report (default: 10)')
+    parser.add_argument('--probes', default='1,2,4,8,16', help='Comma-separated n_probe values for the report')
+    parser.add_argument('--queries', type=int, default=200, help='Sampled queries for the report (default: 200)')
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    ids, matrix = load_vectors(args.vectors)
+    if args.command == 'build':
+        build_and_save(args.vectors, ids, matrix, args.lists, store_manifest=store_path(args.vectors).name)
+        return
+
+    exact = VectorSearchIndex(ids, matrix)
+    ivf = None
+    if (args.vectors / ANN_MANIFEST).exists() and args.lists is None:
+        try:
+            ivf = IVFIndex.load(args.vectors, matrix)
+        except ValueError as exc:
+            print(f'⚠️  {exc}; building a fresh index for the report')
+    if ivf is None:
+        ivf = IVFIndex.build(matrix, args.lists)
+    queries = sample_queries(exact.vectors, args.queries)
+    probes = [int(value) for value in args.probes.split(',') if value]
+    report = recall_report(exact, ivf, queries, args.k, probes)
+
+    if args.json:
+        print(json.dumps({'rows': len(ids), 'nLists': ivf.n_lists, 'k': args.k, 'results': report}, indent=2))
+        return
+
+    print(f'\n📐 {len(ids)} vectors, {ivf.n_lists} lists, {len(queries)} queries, recall@{args.k}\n')
+    print(f"{'nProbe':>8}{'recall':>9}{'ms/query':>11}{'speedup':>9}")
+    for row in report:
+        label = 'exact' if row['nProbe'] is None else str(row['nProbe'])
+        print(f"{label:>8}{row['recall']:>9.3f}{row['msPerQuery']:>11.3f}{row['speedup']:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
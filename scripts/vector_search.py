@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Exact top-k semantic search over the reference vector store.
+
+Loads the store written by the vectorizer scripts once (binary manifest or
+embeddings.json), keeps every vector L2-normalized in a single float32 matrix and
+answers one or many queries with a single matrix multiply plus ``argpartition``.
+Results can be restricted to a ``source`` file and/or ``chapter``.
+
+Usage:
+    python scripts/vector_search.py "stakeholder engagement" --k 5
+    python scripts/vector_search.py --queries-file queries.txt --source AgilePracticeGuide.pdf --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from vector_store import SHARDS_MANIFEST, load_sharded_store, load_vector_store, manifest_path_for
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+VECTOR_DIR = PROJECT_ROOT / 'src' / 'data' / 'vectors'
+FILTER_FIELDS = ('source', 'chapter')
+
+
+def normalize_rows(matrix):
+    """Return a float32 copy of ``matrix`` with every row scaled to unit L2 norm."""
+    matrix = np.array(matrix, dtype=np.float32, ndmin=2)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def store_path(vector_dir: Path) -> Path:
+    """The file ``load_vectors`` reads the store from: shards.json, the binary manifest or embeddings.json."""
+    if (vector_dir / SHARDS_MANIFEST).exists():
+        return vector_dir / SHARDS_MANIFEST
+    if manifest_path_for(vector_dir).exists():
+        return manifest_path_for(vector_dir)
+    return vector_dir / 'embeddings.json'
+
+
+def load_vectors(vector_dir: Path):
+    """Load ``(ids, matrix)`` from shards, the binary store or embeddings.json, in that order."""
+    if (vector_dir / SHARDS_MANIFEST).exists():
+        ids, matrix, _ = load_sharded_store(vector_dir)
+        return ids, matrix
+    if manifest_path_for(vector_dir).exists():
+        return load_vector_store(vector_dir)
+
+    embeddings_path = vector_dir / 'embeddings.json'
+    rows = json.loads(embeddings_path.read_text(encoding='utf-8'))
+    ids = [row['id'] for row in rows]
+    matrix = np.array([row['embedding'] for row in rows], dtype=np.float32)
+    return ids, matrix
+
+
+class VectorSearchIndex:
+    """Exact cosine-similarity index over pre-normalized vectors."""
+
+    def __init__(self, ids, matrix, metadata=None):
+        self.ids = list(ids)
+        self.vectors = normalize_rows(matrix)
+        by_id = {}
+        for chunk in metadata or []:
+            by_id[chunk.get('embeddingId') or chunk.get('id')] = chunk
+        self.metadata = [by_id.get(chunk_id, {'id': chunk_id}) for chunk_id in self.ids]
+
+        # value -> row numbers, so filters select a sub-matrix instead of masking every score
+        self._rows_by_field = {}
+        for field in FILTER_FIELDS:
+            groups = {}
+            for row, chunk in enumerate(self.metadata):
+                groups.setdefault(chunk.get(field), []).append(row)
+            self._rows_by_field[field] = {value: np.array(rows, dtype=np.int64) for value, rows in groups.items()}
+
+    @classmethod
+    def load(cls, vector_dir: Path = VECTOR_DIR, sources=None) -> 'VectorSearchIndex':
+        """Load the store; for a sharded store ``sources`` limits loading to those shards."""
+        if (vector_dir / SHARDS_MANIFEST).exists():
+            return cls(*load_sharded_store(vector_dir, sources))
+        ids, matrix = load_vectors(vector_dir)
+        metadata_path = vector_dir / 'chunks-metadata.json'
+        metadata = json.loads(metadata_path.read_text(encoding='utf-8')) if metadata_path.exists() else []
+        return cls(ids, matrix, metadata)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def dim(self):
+        return self.vectors.shape[1]
+
+    def candidate_rows(self, source=None, chapter=None):
+        """Row numbers allowed by the filters, or None when no filter is set."""
+        rows = None
+        for field, value in (('source', source), ('chapter', chapter)):
+            if value is None:
+                continue
+            matches = self._rows_by_field[field].get(value, np.array([], dtype=np.int64))
+            rows = matches if rows is None else np.intersect1d(rows, matches, assume_unique=True)
+        return rows
+
+    def search(self, queries, k=5, source=None, chapter=None):
+        """
+        Return the top ``k`` matches for each query vector.
+
+        ``queries`` may be a single vector or a (n_queries, dim) matrix. The result is a
+        list (one per query) of ``(row, score)`` tuples ordered by descending score.
+        """
+        query_matrix = normalize_rows(queries)
+        rows = self.candidate_rows(source, chapter)
+        vectors = self.vectors if rows is None else self.vectors[rows]
+        if len(vectors) == 0:
+            return [[] for _ in range(len(query_matrix))]
+
+        scores = query_matrix @ vectors.T
+        k = min(k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        if rows is not None:
+            top = rows[top]
+
+        return [
+            [(int(row), float(score)) for row, score in zip(query_rows, query_scores)]
+            for query_rows, query_scores in zip(top, top_scores)
+        ]
+
+    def results(self, queries, k=5, source=None, chapter=None):
+        """Like ``search`` but returns metadata dicts with a ``similarity`` field."""
+        return [
+            [{**self.metadata[row], 'similarity': score} for row, score in hits]
+            for hits in self.search(queries, k, source, chapter)
+        ]
+
+
+def embedding_settings(vector_dir: Path) -> tuple[str | None, str]:
+    """Return ``(model, backend)`` the store was built with; stores predating the backend field used sbert."""
+    summary_path = vector_dir / 'index-summary.json'
+    if summary_path.exists():
+        summary = json.loads(summary_path.read_text(encoding='utf-8'))
+        return summary.get('embeddingModel'), summary.get('embeddingBackend') or 'sbert'
+    return None, 'sbert'
+
+
+def embed_queries(queries, model_name: str, backend: str, ollama_url: str | None = None):
+    """Embed the query texts with the same backend and model as the store."""
+    if backend == 'ollama':
+        from ollama_embed import DEFAULT_OLLAMA_URL, OllamaEmbedder
+        with OllamaEmbedder(model_name, base_url=ollama_url or DEFAULT_OLLAMA_URL) as embedder:
+            return np.array(embedder.embed(queries), dtype=np.float32)
+
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        print('❌ sentence-transformers is not installed. Install with: pip install sentence-transformers', file=sys.stderr)
+        sys.exit(1)
+    model = SentenceTransformer(model_name)
+    return model.encode(queries, convert_to_numpy=True, show_progress_bar=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Top-k semantic search over the reference vector store.')
+    parser.add_argument('queries', nargs='*', help='Query text (each argument is one query)')
+    parser.add_argument('--queries-file', type=Path, help='File with one query per line')
+    parser.add_argument('--vectors', type=Path, default=VECTOR_DIR, help='Vector store directory (default: src/data/vectors)')
+    parser.add_argument('--model', default=None, help='Query embedding model (default: embeddingModel from index-summary.json)')
+    parser.add_argument('--backend', choices=['sbert', 'ollama'], default=None, help='Query embedding backend (default: embeddingBackend from index-summary.json)')
+    parser.add_argument('--ollama-url', default=None, help='Ollama base URL for an ollama-built store (default: http://localhost:11434)')
+    parser.add_argument('--offline', action='store_true', help='Load sentence-transformers models from the local cache only')
+    parser.add_argument('--k', type=int, default=5, help='Results per query (default: 5)')
+    parser.add_argument('--source', default=None, help='Only return chunks from this source file')
+    parser.add_argument('--chapter', default=None, help='Only return chunks from this chapter')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    queries = list(args.queries)
+    if args.queries_file:
+        queries.extend(line.strip() for line in args.queries_file.read_text(encoding='utf-8').splitlines() if line.strip())
+    if not queries:
+        parser.error('provide at least one query or --queries-file')
+
+    started = time.perf_counter()
+    index = VectorSearchIndex.load(args.vectors, [args.source] if args.source else None)
+    load_time = time.perf_counter() - started
+
+    stored_model, stored_backend = embedding_settings(args.vectors)
+    model_name = args.model or stored_model
+    if not model_name:
+        print('❌ Could not determine the embedding model; pass --model', file=sys.stderr)
+        sys.exit(1)
+
+    if args.offline:
+        os.environ['HF_HUB_OFFLINE'] = '1'
+        os.environ['TRANSFORMERS_OFFLINE'] = '1'
+    query_vectors = embed_queries(queries, model_name, args.backend or stored_backend, args.ollama_url)
+    if query_vectors.shape[1] != index.dim:
+        print(f'❌ Query vectors have {query_vectors.shape[1]} dimensions but the store has {index.dim}; '
+              'check --model/--backend', file=sys.stderr)
+        sys.exit(1)
+
+    started = time.perf_counter()
+    results = index.results(query_vectors, k=args.k, source=args.source, chapter=args.chapter)
+    search_time = time.perf_counter() - started
+
+    if args.json:
+        print(json.dumps([{'query': query, 'results': hits} for query, hits in zip(queries, results)], indent=2))
+        return
+
+    for query, hits in zip(queries, results):
+        print(f'\n🔎 {query}')
+        for rank, hit in enumerate(hits, 1):
+            preview = (hit.get('content') or '')[:80].replace('\n', ' ')
+            print(f"  {rank}. {hit['similarity']:.3f}  {hit.get('source')} · {hit.get('section') or hit.get('chapter')}  {preview}")
+
+    print(f'\n⏱  Loaded {len(index)} vectors in {load_time * 1000:.0f} ms, '
+          f'searched {len(queries)} queries in {search_time * 1000:.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
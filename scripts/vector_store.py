@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Binary vector store shared by the vectorizer scripts.
+
+Embeddings are written as one contiguous little-endian row-major matrix
+(``embeddings.bin``) next to a small JSON manifest (``embeddings.manifest.json``)
+that records the dtype, shape and the chunk id of every row. The matrix can be
+opened zero-copy with ``numpy.memmap`` and in the browser as a typed array over
+the fetched ``ArrayBuffer`` (see ``src/utils/vectorStore.js``).
+
+Supported precisions:
+- float32: exact vectors
+- float16: half the size, ~3 significant digits
+- int8:    symmetric scalar quantization, ``value = int8 * scale``
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+from atomic_write import atomic_write, fsync_directory, write_json_atomic
+
+STORE_FORMAT = 'pmp-vector-store'
+STORE_VERSION = 1
+DTYPES = ('float32', 'float16', 'int8')
+MANIFEST_SUFFIX = '.manifest.json'
+SHARDS_FORMAT = 'pmp-vector-shards'
+SHARDS_MANIFEST = 'shards.json'
+
+_NUMPY_DTYPES = {
+    'float32': np.dtype('<f4'),
+    'float16': np.dtype('<f2'),
+    'int8': np.dtype('i1'),
+}
+# Bookkeeping VectorStoreWriter adds to each line of <name>.rows.jsonl
+_ROW_STAMP_KEYS = ('dim', 'dtype', 'model', 'textHash')
+
+
+def quantize_int8(matrix):
+    """Scalar-quantize a float matrix to int8 with one symmetric scale. Returns (codes, scale)."""
+    peak = float(np.max(np.abs(matrix))) if matrix.size else 0.0
+    scale = peak / 127.0 if peak > 0 else 1.0
+    codes = np.clip(np.rint(matrix / scale), -127, 127).astype(np.int8)
+    return codes, scale
+
+
+def encode_matrix(matrix, dtype):
+    """Convert a float matrix to the on-disk dtype. Returns (array, quantization info or None)."""
+    if dtype not in DTYPES:
+        raise ValueError(f'Unsupported vector dtype: {dtype} (expected one of {", ".join(DTYPES)})')
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if dtype == 'int8':
+        codes, scale = quantize_int8(matrix)
+        return codes, {'scheme': 'symmetric', 'scale': scale}
+    return np.ascontiguousarray(matrix, dtype=_NUMPY_DTYPES[dtype]), None
+
+
+def manifest_path_for(out_dir, name='embeddings'):
+    return Path(out_dir) / f'{name}{MANIFEST_SUFFIX}'
+
+
+def remove_other_layouts(out_dir, layout, name='embeddings'):
+    """
+    Delete the files of every vector layout in ``out_dir`` except ``layout``
+    ('json', 'binary' or 'sharded').
+
+    Loaders take the first layout they find (shards, then binary, then JSON),
+    so one left by an earlier build would shadow the new output.
+    """
+    out_dir = Path(out_dir)
+    layouts = {
+        'json': [out_dir / f'{name}.json'],
+        'binary': [out_dir / f'{name}.bin', manifest_path_for(out_dir, name)],
+        'sharded': [out_dir / SHARDS_MANIFEST],
+    }
+    if layout not in layouts:
+        raise ValueError(f'Unknown vector layout: {layout} (expected one of {", ".join(layouts)})')
+    for other, paths in layouts.items():
+        if other != layout:
+            for path in paths:
+                path.unlink(missing_ok=True)
+    if layout == 'sharded':
+        # Each shard carries its own metadata
+        (out_dir / 'chunks-metadata.json').unlink(missing_ok=True)
+    else:
+        shutil.rmtree(out_dir / 'shards', ignore_errors=True)
+
+
+def write_vector_store(out_dir, ids, matrix, dtype='float32', name='embeddings', model=None):
+    """
+    Write ``matrix`` (rows aligned with ``ids``) as ``<name>.bin`` plus ``<name>.manifest.json``,
+    removing the files of an earlier JSON or sharded build.
+
+    Returns the manifest path.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+        raise ValueError(f'Expected a 2-D matrix with {len(ids)} rows, got shape {matrix.shape}')
+
+    data, quantization = encode_matrix(matrix, dtype)
+    bin_path = out_dir / f'{name}.bin'
+    with atomic_write(bin_path, 'wb') as f:
+        f.write(data.tobytes(order='C'))
+
+    manifest = {
+        'format': STORE_FORMAT,
+        'version': STORE_VERSION,
+        'file': bin_path.name,
+        'dtype': dtype,
+        'byteOrder': 'little',
+        'rows': int(matrix.shape[0]),
+        'dim': int(matrix.shape[1]),
+        'model': model,
+        'quantization': quantization,
+        'createdAt': datetime.now(timezone.utc).isoformat(),
+        'ids': list(ids)
+    }
+    manifest_path = manifest_path_for(out_dir, name)
+    write_json_atomic(manifest_path, manifest, indent=None)
+    # Only once the new store is complete, so a failed write leaves the old one usable
+    remove_other_layouts(out_dir, 'binary', name)
+    return manifest_path
+
+
+def read_manifest(path):
+    """Read a store manifest from a manifest file or from the directory containing ``embeddings``."""
+    path = Path(path)
+    if path.is_dir():
+        path = manifest_path_for(path)
+    manifest = json.loads(path.read_text(encoding='utf-8'))
+    if manifest.get('format') != STORE_FORMAT:
+        raise ValueError(f'{path} is not a {STORE_FORMAT} manifest')
+    manifest['_path'] = str(path)
+    return manifest
+
+
+def open_vector_store(path):
+    """
+    Open a store without copying it into memory.
+
+    Returns ``(manifest, matrix)`` where ``matrix`` is a read-only ``numpy.memmap``
+    in the stored dtype. Use ``dequantize`` to obtain float32 values.
+    """
+    manifest = read_manifest(path)
+    bin_path = Path(manifest['_path']).parent / manifest['file']
+    shape = (manifest['rows'], manifest['dim'])
+    if manifest['rows'] == 0:
+        return manifest, np.zeros(shape, dtype=_NUMPY_DTYPES[manifest['dtype']])
+    expected = manifest['rows'] * manifest['dim'] * _NUMPY_DTYPES[manifest['dtype']].itemsize
+    actual = bin_path.stat().st_size
+    if actual != expected:
+        raise ValueError(f'{bin_path} holds {actual} bytes but its manifest describes {expected}; rebuild the store')
+    matrix = np.memmap(bin_path, dtype=_NUMPY_DTYPES[manifest['dtype']], mode='r', shape=shape)
+    return manifest, matrix
+
+
+def dequantize(matrix, manifest):
+    """Return ``matrix`` as float32, undoing int8 quantization if needed."""
+    if manifest['dtype'] == 'int8':
+        return matrix.astype(np.float32) * np.float32(manifest['quantization']['scale'])
+    return np.asarray(matrix, dtype=np.float32)
+
+
+def load_vector_store(path):
+    """Load a store fully as ``(ids, float32 matrix)``."""
+    manifest, matrix = open_vector_store(path)
+    return manifest['ids'], dequantize(matrix, manifest)
+
+
+def shard_slug(source):
+    """Directory-safe name for a source file's shard."""
+    return re.sub(r'[^A-Za-z0-9_.-]+', '-', source).strip('-') or 'source'
+
+
+def shard_fingerprint(chunks, dtype, model):
+    """Hash of everything that determines a shard's bytes: model, dtype, chunk ids and text."""
+    digest = hashlib.sha256(f'{model}\0{dtype}'.encode('utf-8'))
+    for chunk in chunks:
+        digest.update(b'\0' + chunk['id'].encode('utf-8') + b'\0' + chunk['content'].encode('utf-8'))
+    return digest.hexdigest()
+
+
+def write_sharded_store(out_dir, chunks, vectors_by_id, dtype='float32', model=None):
+    """
+    Write one store per ``source`` under ``<out_dir>/shards/<slug>/`` plus a top-level
+    ``shards.json``. Each shard holds ``chunks-metadata.json`` and an embeddings store.
+
+    Shards whose fingerprint matches the previous ``shards.json`` are left untouched,
+    and shards for sources that disappeared are deleted, as are the top-level files
+    of an earlier non-sharded build. Returns ``(manifest_path, written, reused, removed)``.
+    """
+    out_dir = Path(out_dir)
+    manifest_path = out_dir / SHARDS_MANIFEST
+    previous = {}
+    if manifest_path.exists():
+        previous = {entry['source']: entry for entry in json.loads(manifest_path.read_text(encoding='utf-8'))['shards']}
+
+    groups = {}
+    for chunk in chunks:
+        if chunk['id'] in vectors_by_id:
+            groups.setdefault(chunk['source'], []).append(chunk)
+
+    entries = []
+    written = reused = 0
+    dim = None
+    for source, rows in groups.items():
+        slug = shard_slug(source)
+        shard_dir = out_dir / 'shards' / slug
+        fingerprint = shard_fingerprint(rows, dtype, model)
+        prior = previous.get(source)
+        up_to_date = (
+            prior is not None
+            and prior.get('fingerprint') == fingerprint
+            and manifest_path_for(shard_dir).exists()
+            and (shard_dir / 'chunks-metadata.json').exists()
+        )
+        matrix = None
+        if not up_to_date:
+            matrix = np.array([vectors_by_id[chunk['id']] for chunk in rows], dtype=np.float32)
+            shard_dir.mkdir(parents=True, exist_ok=True)
+            write_json_atomic(shard_dir / 'chunks-metadata.json', rows)
+            write_vector_store(shard_dir, [chunk['id'] for chunk in rows], matrix, dtype=dtype, model=model)
+            written += 1
+        else:
+            reused += 1
+        dim = dim or (matrix.shape[1] if matrix is not None else prior.get('dim'))
+        entries.append({
+            'source': source,
+            'dir': f'shards/{slug}',
+            'chunks': len(rows),
+            'dim': dim,
+            'fingerprint': fingerprint
+        })
+
+    removed = 0
+    live_dirs = {entry['dir'] for entry in entries}
+    for source, entry in previous.items():
+        if source not in groups and entry['dir'] not in live_dirs:
+            shutil.rmtree(out_dir / entry['dir'], ignore_errors=True)
+            removed += 1
+
+    manifest = {
+        'format': SHARDS_FORMAT,
+        'version': 1,
+        'model': model,
+        'dtype': dtype,
+        'dim': dim,
+        'createdAt': datetime.now(timezone.utc).isoformat(),
+        'shards': entries
+    }
+    write_json_atomic(manifest_path, manifest)
+    remove_other_layouts(out_dir, 'sharded')
+    return manifest_path, written, reused, removed
+
+
+def load_sharded_store(out_dir, sources=None):
+    """
+    Load shards from ``shards.json``, optionally only those for ``sources``.
+
+    Returns ``(ids, float32 matrix, metadata)`` with rows in shard order.
+    """
+    out_dir = Path(out_dir)
+    manifest = json.loads((out_dir / SHARDS_MANIFEST).read_text(encoding='utf-8'))
+    if manifest.get('format') != SHARDS_FORMAT:
+        raise ValueError(f'{out_dir / SHARDS_MANIFEST} is not a {SHARDS_FORMAT} manifest')
+    wanted = set(sources) if sources else None
+
+    ids, matrices, metadata = [], [], []
+    for entry in manifest['shards']:
+        if wanted is not None and entry['source'] not in wanted:
+            continue
+        shard_dir = out_dir / entry['dir']
+        shard_ids, matrix = load_vector_store(shard_dir)
+        ids.extend(shard_ids)
+        matrices.append(matrix)
+        metadata.extend(json.loads((shard_dir / 'chunks-metadata.json').read_text(encoding='utf-8')))
+
+    dim = manifest.get('dim') or 0
+    matrix = np.concatenate(matrices) if matrices else np.zeros((0, dim), dtype=np.float32)
+    return ids, matrix, metadata
+
+
+class VectorStoreWriter:
+    """
+    Append-only writer for streaming builds.
+
+    Rows are appended to ``<name>.bin`` and their metadata to ``<name>.rows.jsonl``
+    and both are flushed after every batch, so an interrupted run keeps everything
+    embedded so far. The previous manifest is deleted on open, so no reader ever
+    pairs it with the half-written files; ``close()`` fsyncs them and atomically
+    writes the new one. With ``resume=True`` an existing partial store is reopened
+    and its rows are reported via ``done_hashes``; resuming with a different dtype
+    or model raises ``ValueError``. Appending an id that is already stored replaces
+    the earlier row when the store is closed.
+    """
+
+    def __init__(self, out_dir, dtype='float32', name='embeddings', model=None, resume=False):
+        if dtype not in ('float32', 'float16'):
+            raise ValueError('Streaming stores support float32 or float16; int8 needs the full matrix to pick its scale')
+        self.out_dir = Path(out_dir)
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        self.dtype = dtype
+        self.name = name
+        self.model = model
+        self.bin_path = self.out_dir / f'{name}.bin'
+        self.rows_path = self.out_dir / f'{name}.rows.jsonl'
+        self.manifest_path = manifest_path_for(self.out_dir, name)
+        self.dim = None
+        self.ids = []
+        self._hashes = []
+
+        self.manifest_path.unlink(missing_ok=True)
+        fsync_directory(self.out_dir)
+        if resume and self.rows_path.exists() and self.bin_path.exists():
+            self._reopen()
+        else:
+            self.bin_path.write_bytes(b'')
+            self.rows_path.write_text('', encoding='utf-8')
+
+        self._bin = open(self.bin_path, 'ab')
+        self._rows = open(self.rows_path, 'a', encoding='utf-8')
+
+    def _reopen(self):
+        """Keep only rows present in both files, dropping a torn final batch."""
+        rows = []
+        with open(self.rows_path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except ValueError:
+                    break
+        if rows:
+            stored = (rows[0].get('dtype'), rows[0].get('model'))
+            if stored != (self.dtype, self.model):
+                raise ValueError(
+                    f'Cannot resume {self.bin_path.name}: it holds {stored[0]} vectors from {stored[1]}, '
+                    f'not {self.dtype} from {self.model}; rebuild without --resume'
+                )
+            self.dim = rows[0]['dim']
+        row_bytes = (self.dim or 0) * _NUMPY_DTYPES[self.dtype].itemsize
+        complete = min(len(rows), self.bin_path.stat().st_size // row_bytes) if row_bytes else 0
+        rows = rows[:complete]
+
+        with open(self.bin_path, 'r+b') as f:
+            f.truncate(complete * row_bytes)
+        with atomic_write(self.rows_path) as f:
+            for row in rows:
+                f.write(json.dumps(row) + '\n')
+        self.ids = [row['id'] for row in rows]
+        self._hashes = [row.get('textHash') for row in rows]
+
+    @property
+    def done_hashes(self):
+        """Map each stored id to the text hash it was appended with."""
+        return dict(zip(self.ids, self._hashes))
+
+    def append(self, rows, matrix, text_hashes=None):
+        """Append metadata dicts (each with an ``id``), their vectors and optionally the hash of each embedded text."""
+        if not rows:
+            return
+        data, _ = encode_matrix(np.atleast_2d(np.asarray(matrix, dtype=np.float32)), self.dtype)
+        if self.dim is None:
+            self.dim = int(data.shape[1])
+        elif data.shape[1] != self.dim:
+            raise ValueError(f'Vector dimension changed from {self.dim} to {data.shape[1]}')
+
+        self._bin.write(data.tobytes(order='C'))
+        self._bin.flush()
+        text_hashes = text_hashes or [None] * len(rows)
+        for row, text_hash in zip(rows, text_hashes):
+            stamp = {'dim': self.dim, 'dtype': self.dtype, 'model': self.model, 'textHash': text_hash}
+            self._rows.write(json.dumps({**row, **stamp}) + '\n')
+        self._rows.flush()
+        self.ids.extend(row['id'] for row in rows)
+        self._hashes.extend(text_hashes)
+
+    def iter_rows(self):
+        """Yield the metadata of every appended row, in row order."""
+        if not self._rows.closed:
+            self._rows.flush()
+        with open(self.rows_path, encoding='utf-8') as f:
+            for line in f:
+                row = json.loads(line)
+                for key in _ROW_STAMP_KEYS:
+                    row.pop(key, None)
+                yield row
+
+    def _drop_replaced_rows(self):
+        """Rewrite both files keeping only the last row appended for each id."""
+        last = {row_id: i for i, row_id in enumerate(self.ids)}
+        if len(last) == len(self.ids):
+            return
+        keep = sorted(last.values())
+        row_bytes = self.dim * _NUMPY_DTYPES[self.dtype].itemsize
+        with open(self.bin_path, 'rb') as src, atomic_write(self.bin_path, mode='wb') as dst:
+            for i in keep:
+                src.seek(i * row_bytes)
+                dst.write(src.read(row_bytes))
+        with open(self.rows_path, encoding='utf-8') as src:
+            lines = src.readlines()
+        with atomic_write(self.rows_path) as dst:
+            dst.writelines(lines[i] for i in keep)
+        self.ids = [self.ids[i] for i in keep]
+        self._hashes = [self._hashes[i] for i in keep]
+
+    def close(self):
+        """Close the data files and write the manifest. Returns the manifest path."""
+        # The manifest must never describe rows that a crash could still lose
+        for f in (self._bin, self._rows):
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+        self._drop_replaced_rows()
+        manifest = {
+            'format': STORE_FORMAT,
+            'version': STORE_VERSION,
+            'file': self.bin_path.name,
+            'dtype': self.dtype,
+            'byteOrder': 'little',
+            'rows': len(self.ids),
+            'dim': self.dim or 0,
+            'model': self.model,
+            'quantization': None,
+            'createdAt': datetime.now(timezone.utc).isoformat(),
+            'ids': self.ids
+        }
+        write_json_atomic(self.manifest_path, manifest, indent=None)
+        remove_other_layouts(self.out_dir, 'binary', self.name)
+        return self.manifest_path
@@ -11,16 +11,21 @@ metadata/embeddings/summary JSON files consumed by useVectorSearch.
 from __future__ import annotations
 
 import argparse
+import contextlib
 import json
 import os
+import queue
 import re
 import sys
+import threading
 import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Dict, Iterable, Iterator, List, Tuple
 
-import requests
+import numpy as np
 
 # Force offline model loading so we rely on cached weights
 os.environ.setdefault('HF_HUB_OFFLINE', '1')
@@ -35,13 +40,22 @@ try:
   import fitz  # PyMuPDF
 except ImportError:
   print('❌ Missing dependency: PyMuPDF')
-  print('Install with: pip install PyMuPDF requests sentence-transformers')
+  print('Install with: pip install PyMuPDF httpx sentence-transformers')
   sys.exit(1)
 
+from atomic_write import COMPACT_SEPARATORS, atomic_write, write_json_atomic
+from embedding_cache import EmbeddingCache, content_hash
+from ollama_embed import DEFAULT_OLLAMA_URL, OllamaEmbedder, is_input_error
+from page_text_cache import DEFAULT_CACHE_DIR as TEXT_CACHE_DIR, PageTextCache, iter_page_texts
+from page_text_cache import pdf_page_count as cached_page_count
+from vector_ann import build_and_save as build_ann_index
+from vector_store import DTYPES, VectorStoreWriter, load_vector_store, remove_other_layouts, write_sharded_store, write_vector_store
+
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 REFERENCES_DIR = PROJECT_ROOT / 'references'
 OUTPUT_DIR = PROJECT_ROOT / 'src' / 'data' / 'vectors'
+CACHE_DIR = PROJECT_ROOT / '.cache' / 'embeddings'
 DEFAULT_SBERT_MODEL = 'all-MiniLM-L6-v2'
 DEFAULT_OLLAMA_MODEL = 'nomic-embed-text'
 
@@ -74,86 +88,276 @@ def chunk_text(text: str, chunk_size: int, overlap: int, min_words: int) -> Iter
     start = end - overlap
 
 
-def extract_chunks_from_pdf(pdf_path: Path, chunk_size: int, overlap: int, min_words: int, max_pages: int | None) -> List[Dict]:
-  """Extract cleaned, chunked text from a single PDF."""
-  doc = fitz.open(pdf_path)
-  page_count = len(doc)
-  if max_pages:
-    page_count = min(page_count, max_pages)
+def page_chunks(pdf_path: Path, page_number: int, raw_text: str, chunk_size: int, overlap: int, min_words: int) -> List[Dict]:
+  """Normalize and chunk the text of one page (0-based page_number)."""
+  normalized = normalize_text(raw_text)
+  if not normalized:
+    return []
 
   chunks = []
-
-  for page_number in range(page_count):
-    page = doc.load_page(page_number)
-    raw_text = page.get_text() or ''
-    normalized = normalize_text(raw_text)
-    if not normalized:
-      continue
-
-    for idx, chunk in enumerate(chunk_text(normalized, chunk_size, overlap, min_words)):
-      chunk_id = f'{pdf_path.stem}-p{page_number + 1}-c{idx + 1}'
-      chunks.append({
-        'id': chunk_id,
-        'source': pdf_path.name,
-        'chapter': pdf_path.stem,
-        'section': f'Page {page_number + 1}',
-        'page': page_number + 1,
-        'chunk': idx + 1,
-        'content': chunk,
-        'tokens': len(chunk.split()),
-        'embeddingId': chunk_id
-      })
-
-  doc.close()
+  for idx, chunk in enumerate(chunk_text(normalized, chunk_size, overlap, min_words)):
+    chunk_id = f'{pdf_path.stem}-p{page_number + 1}-c{idx + 1}'
+    chunks.append({
+      'id': chunk_id,
+      'source': pdf_path.name,
+      'chapter': pdf_path.stem,
+      'section': f'Page {page_number + 1}',
+      'page': page_number + 1,
+      'chunk': idx + 1,
+      'content': chunk,
+      'tokens': len(chunk.split()),
+      'embeddingId': chunk_id
+    })
   return chunks
 
 
-def get_embedding_ollama(text: str, model: str) -> List[float]:
-  """Call the Ollama embedding API for a single chunk of text."""
-  payload = {
-    'model': model,
-    'prompt': text,
-    'stream': False
-  }
+def extract_page_range(pdf_path: Path, first_page: int, last_page: int, chunk_size: int, overlap: int, min_words: int,
+                       text_cache: PageTextCache | None = None) -> List[Dict]:
+  """Extract cleaned, chunked text from pages [first_page, last_page) of a PDF, via the page-text cache if given."""
+  chunks = []
+  for page_number, raw_text in iter_page_texts(pdf_path, 'text', text_cache, first_page + 1, last_page):
+    chunks.extend(page_chunks(pdf_path, page_number - 1, raw_text, chunk_size, overlap, min_words))
+  return chunks
 
-  response = requests.post('http://localhost:11434/api/embed', json=payload, timeout=60)
-  response.raise_for_status()
 
-  data = response.json()
-  if 'embedding' in data:
-    return data['embedding']
-  if data.get('embeddings') and isinstance(data['embeddings'], list):
-    return data['embeddings'][0]
+def pdf_page_count(pdf_path: Path, max_pages: int | None, text_cache: PageTextCache | None = None) -> int:
+  page_count = cached_page_count(pdf_path, text_cache)
+  return min(page_count, max_pages) if max_pages else page_count
 
-  raise ValueError(f'Unexpected response from Ollama: {data}')
 
+def extract_chunks_from_pdf(pdf_path: Path, chunk_size: int, overlap: int, min_words: int, max_pages: int | None,
+                            text_cache: PageTextCache | None = None) -> List[Dict]:
+  """Extract cleaned, chunked text from a single PDF."""
+  page_count = pdf_page_count(pdf_path, max_pages, text_cache)
+  return extract_page_range(pdf_path, 0, page_count, chunk_size, overlap, min_words, text_cache)
 
-def vectorize_chunks(chunks: List[Dict], embed_fn, rate_limit: float) -> List[Dict]:
-  """Embed all chunks and return embedding rows."""
-  embeddings = []
 
-  for i, chunk in enumerate(chunks):
-    preview = chunk['content'][:60].replace('\n', ' ')
-    print(f"  [{i + 1}/{len(chunks)}] {chunk['id']} … {preview}...")
+def plan_page_ranges(pdfs: List[Path], max_pages: int | None, pages_per_task: int,
+                     text_cache: PageTextCache | None = None) -> List[tuple]:
+  """Split every PDF into (pdf_path, first_page, last_page) tasks in document/page order."""
+  tasks = []
+  for pdf_path in pdfs:
+    page_count = pdf_page_count(pdf_path, max_pages, text_cache)
+    for first_page in range(0, page_count, pages_per_task):
+      tasks.append((pdf_path, first_page, min(first_page + pages_per_task, page_count)))
+  return tasks
+
+
+def iter_extracted_chunks(pdfs: List[Path], chunk_size: int, overlap: int, min_words: int, max_pages: int | None,
+                          workers: int, pages_per_task: int,
+                          text_cache: PageTextCache | None = None) -> Iterator[Tuple[Path, List[Dict]]]:
+  """
+  Yield (pdf_path, chunks) for every page range in document/page order.
+
+  Page ranges are fanned out over a process pool with at most two ranges per
+  worker in flight, so results are yielded in a deterministic order (keeping
+  chunk ids stable) without materializing the whole corpus.
+  """
+  tasks = plan_page_ranges(pdfs, max_pages, pages_per_task, text_cache)
+
+  if workers <= 1 or len(tasks) <= 1:
+    for pdf_path, first_page, last_page in tasks:
+      yield pdf_path, extract_page_range(pdf_path, first_page, last_page, chunk_size, overlap, min_words, text_cache)
+    return
 
+  with ProcessPoolExecutor(max_workers=workers) as pool:
+    remaining = iter(tasks)
+    pending = deque()
+
+    def submit_next() -> None:
+      task = next(remaining, None)
+      if task is not None:
+        pdf_path, first_page, last_page = task
+        future = pool.submit(extract_page_range, pdf_path, first_page, last_page, chunk_size, overlap, min_words, text_cache)
+        pending.append((pdf_path, future))
+
+    for _ in range(workers * 2):
+      submit_next()
+    while pending:
+      pdf_path, future = pending.popleft()
+      chunks = future.result()
+      submit_next()
+      yield pdf_path, chunks
+
+
+def extract_all_chunks(pdfs: List[Path], chunk_size: int, overlap: int, min_words: int, max_pages: int | None,
+                       workers: int, pages_per_task: int, text_cache: PageTextCache | None = None) -> Dict[Path, List[Dict]]:
+  """Extract chunks from every PDF, grouped by document in page order."""
+  chunks_by_pdf: Dict[Path, List[Dict]] = {pdf_path: [] for pdf_path in pdfs}
+  chunk_groups = iter_extracted_chunks(pdfs, chunk_size, overlap, min_words, max_pages, workers, pages_per_task, text_cache)
+  for pdf_path, chunks in chunk_groups:
+    chunks_by_pdf[pdf_path].extend(chunks)
+  return chunks_by_pdf
+
+
+def embed_texts(texts: List[str], embed_batch_fn) -> List:
+  """Embed a batch; if Ollama rejects it as bad input, retry text by text and return None for rejected texts.
+
+  Transport errors and exhausted retries are re-raised so the run stops instead of
+  backing off once per text against a server that is down.
+  """
+  try:
+    return list(embed_batch_fn(texts))
+  except Exception as exc:
+    if not is_input_error(exc):
+      raise
+    if len(texts) == 1:
+      print(f'    ⚠️  Skipped ({exc})')
+      return [None]
+    print(f'    ⚠️  Batch rejected ({exc}); retrying chunk by chunk')
+
+  vectors = []
+  for text in texts:
     try:
-      embedding = embed_fn(chunk['content'])
-      embeddings.append({
-        'id': chunk['id'],
-        'embedding': embedding
-      })
+      vectors.extend(embed_batch_fn([text]))
     except Exception as exc:
-      print(f"    ⚠️  Skipped ({exc})")
-
-    if rate_limit > 0:
-      time.sleep(rate_limit)
-
-  return embeddings
+      if not is_input_error(exc):
+        raise
+      print(f'    ⚠️  Skipped ({exc})')
+      vectors.append(None)
+  return vectors
+
+
+def vectorize_chunks(chunks: List[Dict], embed_batch_fn, batch_size: int, cache: EmbeddingCache | None = None) -> List[Dict]:
+  """Embed all chunks in batches and return embedding rows in chunk order, reusing cached vectors when available."""
+  vectors: Dict[str, object] = {}
+  pending = []
+  for chunk in chunks:
+    cached = cache.get(chunk['content']) if cache is not None else None
+    if cached is not None:
+      vectors[chunk['id']] = cached
+    else:
+      pending.append(chunk)
+
+  for start in range(0, len(pending), batch_size):
+    batch = pending[start:start + batch_size]
+    print(f"  [{start + len(batch)}/{len(pending)}] {batch[0]['id']} … {batch[-1]['id']}")
+    for chunk, vector in zip(batch, embed_texts([chunk['content'] for chunk in batch], embed_batch_fn)):
+      if vector is None:
+        continue
+      vectors[chunk['id']] = vector
+      if cache is not None:
+        cache.put(chunk['content'], vector)
+
+  return [
+    {'id': chunk['id'], 'embedding': np.asarray(vectors[chunk['id']], dtype=np.float32).tolist()}
+    for chunk in chunks
+    if chunk['id'] in vectors
+  ]
+
+
+def stream_vectorize(chunk_groups: Iterator[Tuple[Path, List[Dict]]], embed_batch_fn, writer: VectorStoreWriter,
+                     cache: EmbeddingCache | None, batch_size: int, queue_size: int, embed_workers: int) -> Dict:
+  """
+  Overlap extraction and embedding through a bounded queue.
+
+  A producer thread pushes extracted chunks into the queue (blocking when it is
+  full, which bounds peak memory); ``embed_workers`` consumer threads embed them
+  in batches and append each finished batch to ``writer``. Chunks already present
+  in a resumed store with the same text are not re-embedded; changed ones are, and
+  replace their old row. Returns counters for the summary.
+  """
+  chunk_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+  done_hashes = writer.done_hashes
+  lock = threading.Lock()
+  stats = {'totalChunks': 0, 'resumed': 0, 'failed': 0, 'sourceFiles': set(), 'chapters': set()}
+  errors: List[BaseException] = []
+  sentinel = None
+
+  def produce() -> None:
+    current_pdf = None
+    try:
+      for pdf_path, chunks in chunk_groups:
+        if pdf_path != current_pdf:
+          current_pdf = pdf_path
+          print(f'   📖 Extracting {pdf_path.name}...')
+        for chunk in chunks:
+          stats['totalChunks'] += 1
+          stats['sourceFiles'].add(chunk['source'])
+          if chunk.get('chapter'):
+            stats['chapters'].add(chunk['chapter'])
+          if done_hashes.get(chunk['id']) == content_hash(chunk['content']):
+            stats['resumed'] += 1
+            continue
+          chunk_queue.put(chunk)
+    except BaseException as exc:
+      errors.append(exc)
+    finally:
+      for _ in range(embed_workers):
+        chunk_queue.put(sentinel)
+
+  def embed_and_append(batch: List[Dict]) -> None:
+    vectors: List = [None] * len(batch)
+    if cache is not None:
+      with lock:
+        vectors = [cache.get(chunk['content']) for chunk in batch]
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+
+    if missing:
+      fresh = embed_texts([batch[i]['content'] for i in missing], embed_batch_fn)
+      for i, vector in zip(missing, fresh):
+        vectors[i] = vector
+
+    rows = [chunk for chunk, vector in zip(batch, vectors) if vector is not None]
+    kept = [vector for vector in vectors if vector is not None]
+    hashes = [content_hash(chunk['content']) for chunk in rows]
+    with lock:
+      if cache is not None:
+        for i in missing:
+          if vectors[i] is not None:
+            cache.put(batch[i]['content'], vectors[i])
+      stats['failed'] += len(batch) - len(rows)
+      writer.append(rows, kept, hashes)
+      print(f'  ✓ {len(writer.ids)} vectors written (last: {batch[-1]["id"]})')
+
+  def consume() -> None:
+    batch: List[Dict] = []
+    try:
+      while True:
+        chunk = chunk_queue.get()
+        if chunk is sentinel:
+          break
+        batch.append(chunk)
+        if len(batch) >= batch_size:
+          embed_and_append(batch)
+          batch = []
+      if batch:
+        embed_and_append(batch)
+    except BaseException as exc:
+      errors.append(exc)
+      # Keep draining so the producer never blocks on a full queue
+      while chunk_queue.get() is not sentinel:
+        pass
+
+  producer = threading.Thread(target=produce, name='extract', daemon=True)
+  consumers = [threading.Thread(target=consume, name=f'embed-{i}', daemon=True) for i in range(embed_workers)]
+  producer.start()
+  for consumer in consumers:
+    consumer.start()
+  producer.join()
+  for consumer in consumers:
+    consumer.join()
+
+  if errors:
+    raise errors[0]
+  return stats
+
+
+def write_json_rows(path: Path, rows: Iterable[Dict], compact: bool = False) -> None:
+  """Write an iterable of dicts as a JSON array without holding it in memory, replacing path atomically."""
+  separators = COMPACT_SEPARATORS if compact else None
+  first, between, end = ('', ',', ']\n') if compact else ('\n  ', ',\n  ', '\n]\n')
+  with atomic_write(path) as f:
+    f.write('[')
+    for i, row in enumerate(rows):
+      f.write(between if i else first)
+      f.write(json.dumps(row, separators=separators))
+    f.write(end)
+  print(f'  ✓ Wrote {path}')
 
 
-def write_json(path: Path, data) -> None:
-  path.parent.mkdir(parents=True, exist_ok=True)
-  path.write_text(json.dumps(data, indent=2))
+def write_json(path: Path, data, compact: bool = False) -> None:
+  write_json_atomic(path, data, compact=compact)
   print(f'  ✓ Wrote {path}')
 
 
@@ -165,9 +369,34 @@ def main():
   parser.add_argument('--overlap', type=int, default=60, help='Word overlap between sequential chunks')
   parser.add_argument('--min-words', type=int, default=40, help='Minimum words required to keep a chunk')
   parser.add_argument('--max-pages', type=int, default=None, help='Optional page limit per PDF for quick runs')
-  parser.add_argument('--rate-limit', type=float, default=0.0, help='Seconds to sleep between embedding requests (set >0 for Ollama)')
+  parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Processes for PDF text extraction (default: CPU count)')
+  parser.add_argument('--pages-per-task', type=int, default=16, help='Pages handed to an extraction worker at a time')
+  parser.add_argument('--rate-limit', type=float, default=0.0, help='Seconds each Ollama request slot waits after a request (throttling)')
+  parser.add_argument('--ollama-url', default=DEFAULT_OLLAMA_URL, help=f'Ollama base URL (default: {DEFAULT_OLLAMA_URL})')
+  parser.add_argument('--concurrency', type=int, default=4, help='Concurrent Ollama requests over the pooled client (default: 4)')
+  parser.add_argument('--retries', type=int, default=4, help='Retries with exponential backoff per Ollama request (default: 4)')
+  parser.add_argument('--cache-dir', type=Path, default=CACHE_DIR, help='Embedding cache directory (default: .cache/embeddings)')
+  parser.add_argument('--no-cache', action='store_true', help='Re-embed every chunk and leave the cache untouched')
+  parser.add_argument('--text-cache-dir', type=Path, default=TEXT_CACHE_DIR, help='Shared page-text cache directory (default: .cache/page-text)')
+  parser.add_argument('--no-text-cache', action='store_true', help='Re-extract every page instead of using the page-text cache')
+  parser.add_argument('--format', choices=['json', 'binary'], default='json', help='Embedding output: embeddings.json or embeddings.bin + manifest (default: json)')
+  parser.add_argument('--compact-json', action='store_true', help='Write chunks-metadata.json and embeddings.json without indentation (smaller, faster to write and parse)')
+  parser.add_argument('--dtype', choices=DTYPES, default='float32', help='Precision for --format binary (default: float32)')
+  parser.add_argument('--shard-by-source', action='store_true', help='Write one binary store per source PDF under shards/ plus shards.json. Unchanged shards are not rewritten, but every source is still extracted and embedded (the page-text and embedding caches keep that cheap)')
+  parser.add_argument('--ann', action='store_true', help='Also build an IVF approximate nearest-neighbour index (ann-ivf.*)')
+  parser.add_argument('--ann-lists', type=int, default=None, help='IVF inverted lists for --ann (default: sqrt(chunks))')
+  parser.add_argument('--stream', action='store_true', help='Overlap extraction and embedding, appending batches to a binary store as they finish')
+  parser.add_argument('--resume', action='store_true', help='With --stream, keep vectors from an interrupted run (same --dtype and --model) and embed only new or changed chunks')
+  parser.add_argument('--batch-size', type=int, default=32, help='Chunks per embedding batch (one model.encode() call or one Ollama request)')
+  parser.add_argument('--queue-size', type=int, default=256, help='Max extracted chunks waiting for embedding in --stream mode')
+  parser.add_argument('--embed-workers', type=int, default=1, help='Embedding threads in --stream mode')
   args = parser.parse_args()
 
+  if args.stream and args.dtype == 'int8':
+    parser.error('--stream writes incrementally and supports --dtype float32 or float16')
+  if args.stream and args.shard_by_source:
+    parser.error('--shard-by-source cannot be combined with --stream')
+
   model_name = args.model or (DEFAULT_SBERT_MODEL if args.backend == 'sbert' else DEFAULT_OLLAMA_MODEL)
 
   if not REFERENCES_DIR.exists():
@@ -185,6 +414,17 @@ def main():
   print(f'   Backend: {args.backend}')
   print(f'   Model:   {model_name}\n')
 
+  cache = None
+  if not args.no_cache:
+    cache_params = {
+      'backend': args.backend,
+      'chunkSize': args.chunk_size,
+      'overlap': args.overlap,
+      'minWords': args.min_words
+    }
+    cache = EmbeddingCache(args.cache_dir, model_name, cache_params)
+    print(f'♻️  Embedding cache: {len(cache)} vectors in {cache.path.name}\n')
+
   if args.backend == 'sbert':
     if not SentenceTransformer:
       print('❌ sentence-transformers is not installed. Install with: pip install sentence-transformers')
@@ -194,25 +434,65 @@ def main():
     except Exception as exc:
       print(f'❌ Failed to load embedding model {model_name}: {exc}')
       sys.exit(1)
-    embed_fn = lambda text: embed_model.encode(text, convert_to_numpy=False).tolist()
-    rate_limit = 0.0
+    embed_batch_fn = lambda texts: embed_model.encode(texts, batch_size=len(texts), convert_to_numpy=True, show_progress_bar=False)
+    group_size = args.batch_size
+    embedder = None
   else:
-    embed_fn = lambda text: get_embedding_ollama(text, model_name)
-    rate_limit = args.rate_limit
+    embedder = OllamaEmbedder(
+      model_name,
+      base_url=args.ollama_url,
+      batch_size=args.batch_size,
+      concurrency=args.concurrency,
+      retries=args.retries,
+      min_interval=args.rate_limit
+    )
+    embed_batch_fn = embedder.embed
+    # Hand the client enough texts per call to keep every connection busy
+    group_size = args.batch_size * args.concurrency
+
+  try:
+    run_build(args, pdfs, model_name, embed_batch_fn, group_size, cache)
+  finally:
+    if embedder is not None:
+      print(f'   Ollama: {embedder.requests_sent} requests, {embedder.retries_used} retries')
+      embedder.close()
+
+
+def open_text_cache(args):
+  """Context manager yielding the shared page-text cache, or None with --no-text-cache."""
+  return contextlib.nullcontext() if args.no_text_cache else PageTextCache(args.text_cache_dir)
+
+
+def run_build(args, pdfs: List[Path], model_name: str, embed_batch_fn, group_size: int, cache: EmbeddingCache | None) -> None:
+  """Extract, embed and write the vector assets."""
+  if args.stream:
+    run_streaming(args, pdfs, model_name, embed_batch_fn, group_size, cache)
+    return
 
+  print(f'📖 Extracting {len(pdfs)} PDFs with {args.workers} worker(s)...')
+  started = time.perf_counter()
+  with open_text_cache(args) as text_cache:
+    chunks_by_pdf = extract_all_chunks(
+      pdfs, args.chunk_size, args.overlap, args.min_words, args.max_pages,
+      args.workers, max(1, args.pages_per_task), text_cache
+    )
   all_chunks: List[Dict] = []
-  for pdf_path in pdfs:
-    print(f'📖 Extracting from {pdf_path.name}...')
-    pdf_chunks = extract_chunks_from_pdf(pdf_path, args.chunk_size, args.overlap, args.min_words, args.max_pages)
-    print(f'   → {len(pdf_chunks)} chunks\n')
+  for pdf_path, pdf_chunks in chunks_by_pdf.items():
+    print(f'   {pdf_path.name} → {len(pdf_chunks)} chunks')
     all_chunks.extend(pdf_chunks)
+  print(f'   Extraction took {time.perf_counter() - started:.1f}s\n')
 
   if not all_chunks:
     print('❌ No chunks extracted. Check PDF text extraction.')
     sys.exit(1)
 
   print(f'🧠 Embedding {len(all_chunks)} chunks with {model_name}...\n')
-  embeddings = vectorize_chunks(all_chunks, embed_fn, rate_limit)
+  embeddings = vectorize_chunks(all_chunks, embed_batch_fn, group_size, cache)
+
+  if cache is not None:
+    # A --max-pages trial only sees part of each PDF, so keep the vectors it didn't touch
+    pruned = cache.save(prune=not args.max_pages)
+    print(f'\n♻️  Reused {cache.hits} cached vectors, embedded {cache.misses} new or changed chunks, pruned {pruned} orphans')
 
   if not embeddings:
     print('❌ Embedding failed for all chunks.')
@@ -223,16 +503,50 @@ def main():
     'totalChunks': len(all_chunks),
     'totalVectorized': len(embeddings),
     'embeddingModel': model_name,
+    'embeddingBackend': args.backend,
     'embeddingDimension': embedding_dim,
     'sourceFiles': sorted({chunk['source'] for chunk in all_chunks}),
     'chapters': sorted({chunk['chapter'] for chunk in all_chunks if chunk.get('chapter')}),
+    'vectorFormat': 'sharded' if args.shard_by_source else args.format,
+    'vectorDtype': args.dtype if args.format == 'binary' or args.shard_by_source else None,
     'createdAt': datetime.now(timezone.utc).isoformat(),
     'status': 'complete'
   }
 
   print('💾 Writing vector assets...\n')
-  write_json(OUTPUT_DIR / 'chunks-metadata.json', all_chunks)
-  write_json(OUTPUT_DIR / 'embeddings.json', embeddings)
+  if args.shard_by_source:
+    manifest_path, written, reused, removed = write_sharded_store(
+      OUTPUT_DIR,
+      all_chunks,
+      {row['id']: row['embedding'] for row in embeddings},
+      dtype=args.dtype,
+      model=model_name
+    )
+    print(f'  ✓ Wrote {manifest_path} ({written} shards rewritten, {reused} unchanged, {removed} removed)')
+  elif args.format == 'binary':
+    write_json(OUTPUT_DIR / 'chunks-metadata.json', all_chunks, args.compact_json)
+    manifest_path = write_vector_store(
+      OUTPUT_DIR,
+      [row['id'] for row in embeddings],
+      [row['embedding'] for row in embeddings],
+      dtype=args.dtype,
+      model=model_name
+    )
+    print(f'  ✓ Wrote {manifest_path} ({args.dtype})')
+  else:
+    write_json(OUTPUT_DIR / 'chunks-metadata.json', all_chunks, args.compact_json)
+    write_json(OUTPUT_DIR / 'embeddings.json', embeddings, args.compact_json)
+    remove_other_layouts(OUTPUT_DIR, 'json')
+  if args.ann:
+    build_ann_index(
+      OUTPUT_DIR,
+      [row['id'] for row in embeddings],
+      np.array([row['embedding'] for row in embeddings], dtype=np.float32),
+      args.ann_lists,
+      store_manifest='shards.json' if args.shard_by_source else (
+        'embeddings.manifest.json' if args.format == 'binary' else 'embeddings.json'
+      )
+    )
   write_json(OUTPUT_DIR / 'index-summary.json', summary)
 
   print('\n✅ Done')
@@ -242,5 +556,71 @@ def main():
   print(f"   Sources:    {len(summary['sourceFiles'])}")
 
 
+def run_streaming(args, pdfs: List[Path], model_name: str, embed_batch_fn, group_size: int, cache: EmbeddingCache | None) -> None:
+  """--stream: extract, embed and append concurrently, then finalize the store."""
+  # Written again from the rows file at the end; until then it would describe the previous build
+  (OUTPUT_DIR / 'chunks-metadata.json').unlink(missing_ok=True)
+  try:
+    writer = VectorStoreWriter(OUTPUT_DIR, dtype=args.dtype, model=model_name, resume=args.resume)
+  except ValueError as exc:
+    print(f'❌ {exc}')
+    sys.exit(1)
+  if writer.ids:
+    print(f'↩️  Resuming: {len(writer.ids)} vectors already in {writer.bin_path.name}\n')
+
+  print(f'🌊 Streaming {len(pdfs)} PDFs → {model_name} '
+        f'(batch {group_size}, queue {args.queue_size}, {args.embed_workers} embed worker(s))\n')
+  started = time.perf_counter()
+  with open_text_cache(args) as text_cache:
+    chunk_groups = iter_extracted_chunks(
+      pdfs, args.chunk_size, args.overlap, args.min_words, args.max_pages,
+      args.workers, max(1, args.pages_per_task), text_cache
+    )
+    stats = stream_vectorize(
+      chunk_groups, embed_batch_fn, writer, cache,
+      max(1, group_size), max(1, args.queue_size), max(1, args.embed_workers)
+    )
+  elapsed = time.perf_counter() - started
+
+  if cache is not None:
+    pruned = cache.save(prune=not (args.resume or args.max_pages))
+    print(f'\n♻️  Reused {cache.hits} cached vectors, embedded {cache.misses} new or changed chunks, pruned {pruned} orphans')
+
+  if not writer.ids:
+    writer.close()
+    print('❌ No chunks were embedded.')
+    sys.exit(1)
+
+  print('\n💾 Finalizing vector assets...\n')
+  manifest_path = writer.close()
+  print(f'  ✓ Wrote {manifest_path} ({args.dtype})')
+  write_json_rows(OUTPUT_DIR / 'chunks-metadata.json', writer.iter_rows(), args.compact_json)
+  writer.rows_path.unlink()
+  if args.ann:
+    ids, matrix = load_vector_store(manifest_path)
+    build_ann_index(OUTPUT_DIR, ids, matrix, args.ann_lists, store_manifest=manifest_path.name)
+
+  summary = {
+    'totalChunks': stats['totalChunks'],
+    'totalVectorized': len(writer.ids),
+    'embeddingModel': model_name,
+    'embeddingBackend': args.backend,
+    'embeddingDimension': writer.dim,
+    'sourceFiles': sorted(stats['sourceFiles']),
+    'chapters': sorted(stats['chapters']),
+    'vectorFormat': 'binary',
+    'vectorDtype': args.dtype,
+    'createdAt': datetime.now(timezone.utc).isoformat(),
+    'status': 'complete'
+  }
+  write_json(OUTPUT_DIR / 'index-summary.json', summary)
+
+  print('\n✅ Done')
+  print(f"   Chunks:     {stats['totalChunks']} ({stats['resumed']} resumed, {stats['failed']} failed)")
+  print(f"   Vectorized: {len(writer.ids)}")
+  print(f"   Dimensions: {writer.dim}")
+  print(f"   Throughput: {len(writer.ids) / elapsed if elapsed > 0 else 0:.1f} chunks/sec over {elapsed:.1f}s")
+
+
 if __name__ == '__main__':
   main()
@@ -4,9 +4,11 @@ Vector database creation script using Python sentence-transformers
 More reliable than Ollama for local embedding generation
 """
 
+import argparse
 import json
 import os
 import sys
+import time
 from pathlib import Path
 
 try:
@@ -16,12 +18,23 @@ except ImportError:
     print("Install with: pip install sentence-transformers")
     sys.exit(1)
 
+import numpy as np
+
+from atomic_write import write_json_atomic
+from embedding_cache import EmbeddingCache
+from vector_ann import build_and_save as build_ann_index
+from vector_store import DTYPES, remove_other_layouts, write_vector_store
+
 # Setup paths
 script_dir = Path(__file__).parent.absolute()
 project_root = script_dir.parent
 data_dir = project_root / 'src' / 'data'
 reference_dir = project_root / 'data' / 'reference'
 vector_db_dir = data_dir / 'vectors'
+default_cache_dir = project_root / '.cache' / 'embeddings'
+
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+MAX_EMBED_CHARS = 512
 
 # Create vector database directory
 vector_db_dir.mkdir(parents=True, exist_ok=True)
@@ -149,7 +162,67 @@ def process_directory(dir_path):
     return all_chunks
 
 
+def encode_batch(model, texts, batch_size):
+    """Encode one batch; if it fails, retry text by text and return None for texts that still fail."""
+    try:
+        return list(model.encode(texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False))
+    except Exception as e:
+        print(f"  ⚠️  Batch failed ({e}); retrying chunk by chunk")
+
+    vectors = []
+    for text in texts:
+        try:
+            vectors.append(model.encode([text], convert_to_numpy=True, show_progress_bar=False)[0])
+        except Exception as e:
+            print(f"  ❌ Skipped chunk ({e})")
+            vectors.append(None)
+    return vectors
+
+
+def embed_texts(model, texts, batch_size=64, processes=0):
+    """
+    Embed texts in length-sorted batches, optionally across a pool of worker processes.
+
+    Sorting by length keeps similarly sized texts in the same batch so less padding is
+    computed. Vectors are returned in the original order of ``texts``, with None for
+    texts that could not be embedded.
+    """
+    order = sorted(range(len(texts)), key=lambda idx: len(texts[idx]))
+    sorted_texts = [texts[idx] for idx in order]
+
+    vectors = None
+    if processes and processes > 1:
+        pool = model.start_multi_process_pool(target_devices=['cpu'] * processes)
+        try:
+            vectors = list(model.encode_multi_process(sorted_texts, pool, batch_size=batch_size))
+        except Exception as e:
+            print(f"  ⚠️  Multi-process encoding failed ({e}); encoding in-process batch by batch")
+        finally:
+            model.stop_multi_process_pool(pool)
+    if vectors is None:
+        vectors = []
+        for start in range(0, len(sorted_texts), batch_size):
+            vectors.extend(encode_batch(model, sorted_texts[start:start + batch_size], batch_size))
+
+    embeddings = [None] * len(texts)
+    for position, idx in enumerate(order):
+        embeddings[idx] = vectors[position]
+    return embeddings
+
+
 def main():
+    parser = argparse.ArgumentParser(description='Vectorize data/reference with sentence-transformers.')
+    parser.add_argument('--batch-size', type=int, default=64, help='Chunks per model.encode() batch (default: 64)')
+    parser.add_argument('--processes', type=int, default=0, help='Worker processes for encoding; 0 or 1 encodes in-process (default: 0)')
+    parser.add_argument('--cache-dir', default=str(default_cache_dir), help='Embedding cache directory (default: .cache/embeddings)')
+    parser.add_argument('--no-cache', action='store_true', help='Re-embed every chunk and leave the cache untouched')
+    parser.add_argument('--format', choices=['json', 'binary'], default='json', help='Embedding output: embeddings.json or embeddings.bin + manifest (default: json)')
+    parser.add_argument('--compact-json', action='store_true', help='Write chunks-metadata.json and embeddings.json without indentation (smaller, faster to write and parse)')
+    parser.add_argument('--ann', action='store_true', help='Also build an IVF approximate nearest-neighbour index (ann-ivf.*)')
+    parser.add_argument('--ann-lists', type=int, default=None, help='IVF inverted lists for --ann (default: sqrt(chunks))')
+    parser.add_argument('--dtype', choices=DTYPES, default='float32', help='Precision for --format binary (default: float32)')
+    args = parser.parse_args()
+
     print("\n🚀 Vector Database Creation (Python + sentence-transformers)\n")
 
     # Step 1: Extract chunks
@@ -161,77 +234,128 @@ def main():
         print("❌ No chunks found to vectorize")
         return
 
-    # Step 2: Load embedding model
-    print("🔄 Step 2: Loading embedding model...")
-    print("  This may take a minute on first run...")
-    try:
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        print(f"✓ Model loaded: all-MiniLM-L6-v2\n")
-    except Exception as e:
-        print(f"❌ Failed to load model: {e}")
-        return
-
-    # Step 3: Vectorize chunks
-    print(f"🔄 Step 3: Vectorizing {len(all_chunks)} chunks...")
-    embeddings = []
-    metadata = []
-
-    for i, chunk in enumerate(all_chunks):
+    # Truncate content for embedding
+    texts = [chunk['content'][:MAX_EMBED_CHARS] for chunk in all_chunks]
+
+    # Step 2: Reuse cached vectors for unchanged chunks
+    cache = None
+    vectors = [None] * len(texts)
+    if not args.no_cache:
+        cache = EmbeddingCache(args.cache_dir, EMBEDDING_MODEL, {'maxChars': MAX_EMBED_CHARS})
+        for i, text in enumerate(texts):
+            vectors[i] = cache.get(text)
+        print(f"♻️  Step 2: Reused {cache.hits} cached vectors ({cache.misses} new or changed chunks)\n")
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+
+    # Step 3: Vectorize new or changed chunks
+    if missing:
+        print("🔄 Step 3: Loading embedding model...")
+        print("  This may take a minute on first run...")
         try:
-            # Truncate content for embedding
-            text_to_embed = chunk['content'][:512]
-            embedding = model.encode(text_to_embed, convert_to_tensor=False)
-
-            embeddings.append({
-                'id': f'chunk_{i}',
-                'embedding': embedding.tolist()
-            })
-
-            metadata.append({
-                'id': f'chunk_{i}',
-                **chunk,
-                'embeddingId': f'chunk_{i}'
-            })
-
-            if (i + 1) % 10 == 0:
-                print(f"  [{i+1}/{len(all_chunks)}] ✓ {chunk['source']} → {chunk.get('chapter', 'unknown')}")
+            model = SentenceTransformer(EMBEDDING_MODEL)
+            print(f"✓ Model loaded: {EMBEDDING_MODEL}\n")
         except Exception as e:
-            print(f"  [{i+1}/{len(all_chunks)}] ❌ {chunk['source']}: {e}")
-
-    print()
+            print(f"❌ Failed to load model: {e}")
+            return
+
+        workers = args.processes if args.processes > 1 else 1
+        print(f"🔄 Vectorizing {len(missing)} chunks (batch size {args.batch_size}, {workers} process(es))...")
+        started = time.perf_counter()
+        new_vectors = embed_texts(model, [texts[i] for i in missing], batch_size=args.batch_size, processes=args.processes)
+        elapsed = time.perf_counter() - started
+
+        for i, vector in zip(missing, new_vectors):
+            vectors[i] = vector
+            if cache is not None and vector is not None:
+                cache.put(texts[i], vector)
+
+        embedded = sum(vector is not None for vector in new_vectors)
+        rate = embedded / elapsed if elapsed > 0 else float('inf')
+        print(f"✓ Embedded {embedded} chunks in {elapsed:.2f}s ({rate:.1f} chunks/sec)")
+        if embedded < len(missing):
+            print(f"⚠️  Skipped {len(missing) - embedded} chunks that failed to embed")
+        print()
+    else:
+        print("✓ Step 3: All chunks up to date, skipping model load\n")
+
+    if cache is not None:
+        pruned = cache.save()
+        print(f"✓ Embedding cache: {len(cache)} vectors ({pruned} orphaned pruned)\n")
+
+    # Chunks that failed to embed are left out, keeping the ids of the rest stable
+    embedded_rows = [i for i, vector in enumerate(vectors) if vector is not None]
+    if not embedded_rows:
+        print("❌ No chunks were embedded")
+        return
+    metadata = []
+    for i in embedded_rows:
+        metadata.append({
+            'id': f'chunk_{i}',
+            **all_chunks[i],
+            'embeddingId': f'chunk_{i}'
+        })
+    vectors = [vectors[i] for i in embedded_rows]
 
     # Step 4: Save vector database
     print("💾 Step 4: Saving vector database...")
 
     # Save metadata
     metadata_path = vector_db_dir / 'chunks-metadata.json'
-    metadata_path.write_text(json.dumps(metadata, indent=2))
+    write_json_atomic(metadata_path, metadata, compact=args.compact_json)
     print(f"✓ Metadata: {metadata_path}")
 
     # Save embeddings
-    embeddings_path = vector_db_dir / 'embeddings.json'
-    embeddings_path.write_text(json.dumps(embeddings, indent=2))
-    print(f"✓ Embeddings: {embeddings_path}")
+    if args.format == 'binary':
+        manifest_path = write_vector_store(
+            vector_db_dir,
+            [item['id'] for item in metadata],
+            np.stack(vectors),
+            dtype=args.dtype,
+            model=EMBEDDING_MODEL
+        )
+        print(f"✓ Embeddings ({args.dtype}): {manifest_path}")
+    else:
+        embeddings = [
+            {'id': item['id'], 'embedding': vector.tolist()}
+            for item, vector in zip(metadata, vectors)
+        ]
+        embeddings_path = vector_db_dir / 'embeddings.json'
+        write_json_atomic(embeddings_path, embeddings, compact=args.compact_json)
+        remove_other_layouts(vector_db_dir, 'json')
+        print(f"✓ Embeddings: {embeddings_path}")
+
+    # Optional ANN index
+    if args.ann:
+        build_ann_index(
+            vector_db_dir,
+            [item['id'] for item in metadata],
+            np.stack(vectors),
+            args.ann_lists,
+            store_manifest='embeddings.manifest.json' if args.format == 'binary' else 'embeddings.json'
+        )
 
     # Save index summary
     summary_path = vector_db_dir / 'index-summary.json'
     summary = {
         'totalChunks': len(all_chunks),
-        'totalVectorized': len(embeddings),
-        'embeddingModel': 'all-MiniLM-L6-v2',
-        'embeddingDimension': len(embeddings[0]['embedding']) if embeddings else 384,
+        'totalVectorized': len(vectors),
+        'embeddingModel': EMBEDDING_MODEL,
+        'embeddingBackend': 'sbert',
+        'embeddingDimension': len(vectors[0]) if vectors else 384,
+        'vectorFormat': args.format,
+        'vectorDtype': args.dtype if args.format == 'binary' else None,
         'sourceFiles': list(set(chunk['source'] for chunk in all_chunks)),
         'chapters': list(set(chunk.get('chapter') for chunk in all_chunks if chunk.get('chapter'))),
         'createdAt': __import__('datetime').datetime.now().isoformat(),
         'status': 'complete'
     }
-    summary_path.write_text(json.dumps(summary, indent=2))
+    write_json_atomic(summary_path, summary)
     print(f"✓ Summary: {summary_path}\n")
 
     # Step 5: Summary
     print("📊 Vector Database Summary:")
     print(f"  Total chunks: {len(all_chunks)}")
-    print(f"  Vectorized: {len(embeddings)}")
+    print(f"  Vectorized: {len(vectors)}")
     print(f"  Model: {summary['embeddingModel']}")
     print(f"  Dimensions: {summary['embeddingDimension']}")
     print(f"  Source files: {len(summary['sourceFiles'])}")
@@ -1,10 +1,102 @@
 import { useEffect, useState } from 'react'
+import { loadBinaryVectors } from '../utils/vectorStore'
+
+// Embedding files are optional build outputs; glob imports resolve to {} when absent
+const binaryManifests = import.meta.glob('../data/vectors/embeddings.manifest.json')
+const binaryFiles = import.meta.glob('../data/vectors/embeddings.bin', { query: '?url', import: 'default' })
+const jsonEmbeddings = import.meta.glob('../data/vectors/embeddings.json')
+const jsonMetadata = import.meta.glob('../data/vectors/chunks-metadata.json')
+const shardIndex = import.meta.glob('../data/vectors/shards.json')
+const shardMetadata = import.meta.glob('../data/vectors/shards/*/chunks-metadata.json')
+const shardManifests = import.meta.glob('../data/vectors/shards/*/embeddings.manifest.json')
+const shardFiles = import.meta.glob('../data/vectors/shards/*/embeddings.bin', { query: '?url', import: 'default' })
+
+/**
+ * Load embeddings as an id -> vector map
+ * Prefers the binary store (scripts/vector_store.py) over embeddings.json
+ */
+const loadEmbeddingMap = async () => {
+  const manifestLoader = binaryManifests['../data/vectors/embeddings.manifest.json']
+  const binLoader = binaryFiles['../data/vectors/embeddings.bin']
+
+  if (manifestLoader && binLoader) {
+    const [manifestRes, binUrl] = await Promise.all([manifestLoader(), binLoader()])
+    return loadBinaryVectors(manifestRes.default || manifestRes, binUrl)
+  }
+
+  const jsonLoader = jsonEmbeddings['../data/vectors/embeddings.json']
+  if (!jsonLoader) {
+    throw new Error('No embeddings found in src/data/vectors')
+  }
+
+  const embeddingsRes = await jsonLoader()
+  const embeddings = embeddingsRes.default || embeddingsRes
+
+  // Create embedding map for quick lookup
+  const embeddingMap = {}
+  if (Array.isArray(embeddings)) {
+    embeddings.forEach((item) => {
+      embeddingMap[item.id] = item.embedding
+    })
+  }
+  return embeddingMap
+}
+
+/**
+ * Load only the per-source shards listed in shards.json (all when sources is empty)
+ * @param {string[]} sources - Source file names to load
+ * @returns {Promise<Object>} Merged { metadata, embeddings }
+ */
+const loadShards = async (sources) => {
+  const indexRes = await shardIndex['../data/vectors/shards.json']()
+  const index = indexRes.default || indexRes
+  const wanted = sources.length ? index.shards.filter((shard) => sources.includes(shard.source)) : index.shards
+
+  const shards = await Promise.all(
+    wanted.map(async (shard) => {
+      const base = `../data/vectors/${shard.dir}`
+      const [metadataRes, manifestRes, binUrl] = await Promise.all([
+        shardMetadata[`${base}/chunks-metadata.json`](),
+        shardManifests[`${base}/embeddings.manifest.json`](),
+        shardFiles[`${base}/embeddings.bin`]()
+      ])
+      const embeddings = await loadBinaryVectors(manifestRes.default || manifestRes, binUrl)
+      return { metadata: metadataRes.default || metadataRes, embeddings }
+    })
+  )
+
+  return {
+    metadata: shards.flatMap((shard) => shard.metadata),
+    embeddings: Object.assign({}, ...shards.map((shard) => shard.embeddings))
+  }
+}
+
+/**
+ * Load metadata and embeddings from whichever layout the vectorizer produced
+ */
+const loadStore = async (sources) => {
+  if (shardIndex['../data/vectors/shards.json']) {
+    return loadShards(sources)
+  }
+
+  const metadataLoader = jsonMetadata['../data/vectors/chunks-metadata.json']
+  if (!metadataLoader) {
+    throw new Error('No chunk metadata found in src/data/vectors')
+  }
+
+  const [metadataRes, embeddings] = await Promise.all([metadataLoader(), loadEmbeddingMap()])
+  return { metadata: metadataRes.default || metadataRes, embeddings }
+}
 
 /**
  * Vector similarity search hook for RAG pipeline
  * Loads vector database and provides semantic search capabilities
+ * @param {Object} options
+ * @param {string[]} options.sources - With a sharded store, only load these source files
  */
-export const useVectorSearch = () => {
+export const useVectorSearch = ({ sources = [] } = {}) => {
+  const sourceKey = sources.join('\n')
+
   const [state, setState] = useState({
     metadata: null,
     embeddings: null,
@@ -17,24 +109,13 @@ export const useVectorSearch = () => {
     const loadVectorDB = async () => {
       try {
         // Load metadata and embeddings
-        const [metadataRes, embeddingsRes, summaryRes] = await Promise.all([
-          import('../data/vectors/chunks-metadata.json'),
-          import('../data/vectors/embeddings.json'),
+        const [{ metadata, embeddings: embeddingMap }, summaryRes] = await Promise.all([
+          loadStore(sourceKey ? sourceKey.split('\n') : []),
           import('../data/vectors/index-summary.json')
         ])
 
-        const metadata = metadataRes.default || metadataRes
-        const embeddings = embeddingsRes.default || embeddingsRes
         const summary = summaryRes.default || summaryRes
 
-        // Create embedding map for quick lookup
-        const embeddingMap = {}
-        if (Array.isArray(embeddings)) {
-          embeddings.forEach((item) => {
-            embeddingMap[item.id] = item.embedding
-          })
-        }
-
         setState({
           metadata,
           embeddings: embeddingMap,
@@ -52,7 +133,7 @@ export const useVectorSearch = () => {
     }
 
     loadVectorDB()
-  }, [])
+  }, [sourceKey])
 
   /**
    * Compute cosine similarity between two vectors
@@ -0,0 +1,93 @@
+/**
+ * Binary vector store helpers
+ * Decodes the embeddings.bin + embeddings.manifest.json pair written by
+ * scripts/vector_store.py into typed arrays without per-element JSON parsing.
+ */
+
+/**
+ * Convert one IEEE 754 half-precision value to a JS number
+ */
+const halfToFloat = (half) => {
+  const sign = half & 0x8000 ? -1 : 1
+  const exponent = (half >> 10) & 0x1f
+  const fraction = half & 0x03ff
+
+  if (exponent === 0) return sign * 2 ** -14 * (fraction / 1024)
+  if (exponent === 0x1f) return fraction ? NaN : sign * Infinity
+  return sign * 2 ** (exponent - 15) * (1 + fraction / 1024)
+}
+
+/**
+ * Decode a stored matrix into a Float32Array of rows * dim values
+ * float32 stores are viewed in place; float16 and int8 stores are expanded
+ * Typed arrays use platform byte order, which is little-endian on every supported browser
+ * @param {ArrayBuffer} buffer - Raw contents of the .bin file
+ * @param {Object} manifest - Parsed manifest JSON
+ * @returns {Float32Array}
+ */
+export const decodeVectorMatrix = (buffer, manifest) => {
+  const length = manifest.rows * manifest.dim
+  const itemSize = { float32: 4, float16: 2, int8: 1 }[manifest.dtype]
+
+  // A manifest left over from another build would read past (or short of) the data
+  if (itemSize && buffer.byteLength !== length * itemSize) {
+    throw new Error(
+      `Vector store size mismatch: ${buffer.byteLength} bytes for ${manifest.rows} x ${manifest.dim} ${manifest.dtype}; rebuild the store`
+    )
+  }
+
+  if (manifest.dtype === 'float32') {
+    return new Float32Array(buffer, 0, length)
+  }
+
+  const values = new Float32Array(length)
+
+  if (manifest.dtype === 'float16') {
+    const halves = new Uint16Array(buffer, 0, length)
+    for (let i = 0; i < length; i++) {
+      values[i] = halfToFloat(halves[i])
+    }
+    return values
+  }
+
+  if (manifest.dtype === 'int8') {
+    const codes = new Int8Array(buffer, 0, length)
+    const scale = manifest.quantization?.scale ?? 1
+    for (let i = 0; i < length; i++) {
+      values[i] = codes[i] * scale
+    }
+    return values
+  }
+
+  throw new Error(`Unsupported vector dtype: ${manifest.dtype}`)
+}
+
+/**
+ * Build an id -> row view map over a decoded matrix (rows share the underlying buffer)
+ * @param {Float32Array} matrix - Decoded matrix
+ * @param {Object} manifest - Parsed manifest JSON
+ * @returns {Object} Map of chunk id to Float32Array row
+ */
+export const rowsById = (matrix, manifest) => {
+  const rows = {}
+  manifest.ids.forEach((id, row) => {
+    rows[id] = matrix.subarray(row * manifest.dim, (row + 1) * manifest.dim)
+  })
+  return rows
+}
+
+/**
+ * Fetch and decode a binary vector store
+ * @param {Object} manifest - Parsed manifest JSON
+ * @param {string} binUrl - URL of the matching .bin file
+ * @returns {Promise<Object>} Map of chunk id to Float32Array row
+ */
+export async function loadBinaryVectors(manifest, binUrl) {
+  const response = await fetch(binUrl)
+  if (!response.ok) {
+    throw new Error(`Failed to load vectors: ${response.statusText}`)
+  }
+
+  const buffer = await response.arrayBuffer()
+  return rowsById(decodeVectorMatrix(buffer, manifest), manifest)
+}